@@ -3,7 +3,44 @@
 # * If caller supplies `openai_api_key` (arg or ENV), we use OpenAIProvider.
 # * Else we fallback to a local Ollama model.
 # * If neither is available, we raise -> ProviderError.
+# * Providers are long-lived and shared through the app-scoped `provider_pool`.
+# * Embeddings are cached by (model, normalized text) in `embedding_cache`.
+# * Deterministic extraction responses are cached per task in `response_cache`.
+# * Compatibility analyses are cached per document pair in `compatibility_cache`.
+# * Model calls are bounded per backend/model and queued by priority in `provider_scheduler`.
+# * A call's `deadline` bounds its queueing and its run; past it -> DeadlineExceededError.
 
+from .pool import ProviderPool, provider_pool
+from .cache import (
+    EmbeddingCache,
+    ResponseCache,
+    embedding_cache,
+    response_cache,
+    compatibility_cache,
+    content_hash,
+    normalize_text,
+)
+from .scheduler import Priority, ProviderScheduler, provider_scheduler, remaining
+from .exceptions import DeadlineExceededError
 from .manager import AgentManager, EmbeddingManager
+from .metrics import agent_metrics
 
-__all__ = ["AgentManager", "EmbeddingManager"]
+__all__ = [
+    "AgentManager",
+    "EmbeddingManager",
+    "ProviderPool",
+    "provider_pool",
+    "EmbeddingCache",
+    "embedding_cache",
+    "ResponseCache",
+    "response_cache",
+    "compatibility_cache",
+    "content_hash",
+    "normalize_text",
+    "Priority",
+    "ProviderScheduler",
+    "provider_scheduler",
+    "remaining",
+    "DeadlineExceededError",
+    "agent_metrics",
+]
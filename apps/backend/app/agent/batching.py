@@ -0,0 +1,100 @@
+import asyncio
+import logging
+
+from typing import Dict, List, Optional, Tuple
+
+from .providers.base import EmbeddingProvider
+
+logger = logging.getLogger(__name__)
+
+
+class EmbeddingBatcher:
+    """
+    Collects concurrent `embed` calls into a single `embed_many` provider call.
+
+    A batch is dispatched as soon as it holds `max_batch_size` texts, or
+    `max_wait_ms` after its first text arrived, whichever comes first.
+    Identical texts within a batch are embedded once. A dispatched batch
+    whose callers have all been cancelled is cancelled as well.
+    """
+
+    def __init__(
+        self,
+        provider: EmbeddingProvider,
+        max_batch_size: int = 32,
+        max_wait_ms: float = 5.0,
+    ) -> None:
+        self._provider = provider
+        self._max_batch_size = max(1, max_batch_size)
+        self._max_wait = max(0.0, max_wait_ms) / 1000
+        self._pending: List[Tuple[str, asyncio.Future]] = []
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._inflight: set[asyncio.Task] = set()
+        self.batches = 0
+        self.texts = 0
+
+    async def embed(self, text: str) -> List[float]:
+        """
+        Queue `text` for the next batch and wait for its embedding.
+        """
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((text, future))
+
+        if len(self._pending) >= self._max_batch_size:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self._max_wait, self._flush)
+
+        return await future
+
+    def _flush(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+
+        batch = [item for item in self._pending if not item[1].done()]
+        self._pending = []
+        if not batch:
+            return
+
+        for start in range(0, len(batch), self._max_batch_size):
+            chunk = batch[start : start + self._max_batch_size]
+            task = asyncio.create_task(self._dispatch(chunk))
+            self._inflight.add(task)
+            task.add_done_callback(self._inflight.discard)
+            for _, future in chunk:
+                future.add_done_callback(
+                    lambda _, task=task, chunk=chunk: self._abandon(task, chunk)
+                )
+
+    def _abandon(self, task: asyncio.Task, batch: List[Tuple[str, asyncio.Future]]) -> None:
+        if not task.done() and all(future.cancelled() for _, future in batch):
+            task.cancel()
+
+    async def _dispatch(self, batch: List[Tuple[str, asyncio.Future]]) -> None:
+        unique_texts = list(dict.fromkeys(text for text, _ in batch))
+        self.batches += 1
+        self.texts += len(batch)
+        try:
+            vectors = await self._provider.embed_many(unique_texts)
+            by_text: Dict[str, List[float]] = dict(zip(unique_texts, vectors))
+            for text, future in batch:
+                if not future.done():
+                    future.set_result(by_text[text])
+        except Exception as e:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+        finally:
+            # Only reached with pending futures if the dispatch itself was cancelled.
+            for _, future in batch:
+                if not future.done():
+                    future.cancel()
+
+    def stats(self) -> Dict[str, float]:
+        return {
+            "batches": self.batches,
+            "texts": self.texts,
+            "avg_batch_size": self.texts / self.batches if self.batches else 0.0,
+        }
@@ -0,0 +1,382 @@
+import os
+import re
+import json
+import time
+import sqlite3
+import hashlib
+import logging
+import threading
+import numpy as np
+
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Sequence
+
+from fastapi.concurrency import run_in_threadpool
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+_WHITESPACE = re.compile(r"\s+")
+
+# SQLite's default SQLITE_MAX_VARIABLE_NUMBER on older builds is 999.
+_MAX_SQL_VARIABLES = 500
+
+
+def normalize_text(text: str) -> str:
+    """
+    Collapse whitespace runs and trim, so formatting-only differences share a key.
+    """
+    return _WHITESPACE.sub(" ", text or "").strip()
+
+
+def content_hash(*parts: str) -> str:
+    """
+    Stable sha256 hex digest over the given parts.
+    """
+    digest = hashlib.sha256()
+    for part in parts:
+        digest.update(part.encode("utf-8"))
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+def request_key(*parts: Any) -> str:
+    """
+    Content hash over strings and JSON-serialisable values (dict keys sorted).
+    """
+    return content_hash(
+        *(
+            part if isinstance(part, str) else json.dumps(part, sort_keys=True, default=str)
+            for part in parts
+        )
+    )
+
+
+class SQLiteTier:
+    """
+    Size-bounded key/blob table in a local SQLite file.
+
+    The connection is opened lazily and shared across threads behind a lock;
+    callers run the blocking methods through the threadpool. Once the table
+    holds more than `max_entries` rows, the least recently accessed ones are
+    evicted.
+    """
+
+    def __init__(self, path: str, table: str, max_entries: int) -> None:
+        self._path = path
+        self._table = table
+        self._max_entries = max_entries
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+        self.evictions = 0
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            os.makedirs(os.path.dirname(os.path.abspath(self._path)), exist_ok=True)
+            conn = sqlite3.connect(self._path, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL;")
+            conn.execute(
+                f"CREATE TABLE IF NOT EXISTS {self._table} ("
+                "key TEXT PRIMARY KEY, value BLOB NOT NULL, "
+                "created_at REAL NOT NULL, accessed_at REAL NOT NULL)"
+            )
+            conn.execute(
+                f"CREATE INDEX IF NOT EXISTS ix_{self._table}_accessed_at "
+                f"ON {self._table} (accessed_at)"
+            )
+            self._conn = conn
+        return self._conn
+
+    def get_many(self, keys: Sequence[str]) -> Dict[str, tuple[bytes, float]]:
+        """
+        Return {key: (value, created_at)} for the keys present, touching their access time.
+        """
+        rows = []
+        with self._lock:
+            conn = self._connect()
+            for start in range(0, len(keys), _MAX_SQL_VARIABLES):
+                chunk = list(keys[start : start + _MAX_SQL_VARIABLES])
+                placeholders = ",".join("?" for _ in chunk)
+                found = conn.execute(
+                    f"SELECT key, value, created_at FROM {self._table} WHERE key IN ({placeholders})",
+                    chunk,
+                ).fetchall()
+                if found:
+                    conn.execute(
+                        f"UPDATE {self._table} SET accessed_at = ? WHERE key IN ({placeholders})",
+                        [time.time(), *chunk],
+                    )
+                rows.extend(found)
+            conn.commit()
+        return {key: (value, created_at) for key, value, created_at in rows}
+
+    def put_many(self, items: Dict[str, bytes]) -> None:
+        if not items:
+            return
+        now = time.time()
+        with self._lock:
+            conn = self._connect()
+            conn.executemany(
+                f"INSERT OR REPLACE INTO {self._table} (key, value, created_at, accessed_at) "
+                "VALUES (?, ?, ?, ?)",
+                [(key, value, now, now) for key, value in items.items()],
+            )
+            (count,) = conn.execute(f"SELECT COUNT(*) FROM {self._table}").fetchone()
+            overflow = count - self._max_entries
+            if overflow > 0:
+                conn.execute(
+                    f"DELETE FROM {self._table} WHERE key IN ("
+                    f"SELECT key FROM {self._table} ORDER BY accessed_at LIMIT ?)",
+                    (overflow,),
+                )
+                self.evictions += overflow
+            conn.commit()
+
+    def delete(self, keys: Sequence[str]) -> None:
+        with self._lock:
+            conn = self._connect()
+            for start in range(0, len(keys), _MAX_SQL_VARIABLES):
+                chunk = list(keys[start : start + _MAX_SQL_VARIABLES])
+                placeholders = ",".join("?" for _ in chunk)
+                conn.execute(
+                    f"DELETE FROM {self._table} WHERE key IN ({placeholders})", chunk
+                )
+            conn.commit()
+
+    def count(self) -> int:
+        with self._lock:
+            if self._conn is None and not os.path.exists(self._path):
+                return 0
+            (count,) = self._connect().execute(
+                f"SELECT COUNT(*) FROM {self._table}"
+            ).fetchone()
+        return count
+
+    def close(self) -> None:
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+
+class EmbeddingCache:
+    """
+    Two-tier, content-addressed embedding cache.
+
+    Keys are a hash of the model name, its version (if the backend reports
+    one) and the normalized text, so re-pulling a model under the same name
+    does not serve the old model's vectors. Lookups hit an
+    in-memory LRU first and fall back to a persistent SQLite tier, where
+    vectors are stored as float32 blobs; disk hits are promoted to memory.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        memory_size: int = 2048,
+        max_entries: int = 100_000,
+    ) -> None:
+        self._memory: OrderedDict[str, List[float]] = OrderedDict()
+        self._memory_size = memory_size
+        self._disk = SQLiteTier(path, "embeddings", max_entries)
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def key(model: str, text: str, version: Optional[str] = None) -> str:
+        return content_hash(model, version or "", normalize_text(text))
+
+    def _remember(self, key: str, vector: List[float]) -> None:
+        self._memory[key] = vector
+        self._memory.move_to_end(key)
+        while len(self._memory) > self._memory_size:
+            self._memory.popitem(last=False)
+
+    async def get_many(
+        self, model: str, texts: Sequence[str], version: Optional[str] = None
+    ) -> List[Optional[List[float]]]:
+        """
+        Look up embeddings for `texts`; missing entries are returned as None.
+        """
+        keys = [self.key(model, text, version) for text in texts]
+        results: List[Optional[List[float]]] = [None] * len(keys)
+        cold: Dict[str, List[int]] = {}
+
+        for index, key in enumerate(keys):
+            vector = self._memory.get(key)
+            if vector is not None:
+                self._memory.move_to_end(key)
+                self.memory_hits += 1
+                results[index] = vector
+            else:
+                cold.setdefault(key, []).append(index)
+
+        if cold:
+            try:
+                rows = await run_in_threadpool(self._disk.get_many, list(cold))
+            except sqlite3.Error as e:
+                logger.warning(f"embedding cache read failed: {e}")
+                rows = {}
+            for key, indexes in cold.items():
+                row = rows.get(key)
+                if row is None:
+                    self.misses += len(indexes)
+                    continue
+                vector = np.frombuffer(row[0], dtype=np.float32).tolist()
+                self._remember(key, vector)
+                self.disk_hits += len(indexes)
+                for index in indexes:
+                    results[index] = vector
+
+        return results
+
+    async def put_many(
+        self,
+        model: str,
+        texts: Sequence[str],
+        vectors: Sequence[List[float]],
+        version: Optional[str] = None,
+    ) -> None:
+        blobs: Dict[str, bytes] = {}
+        for text, vector in zip(texts, vectors):
+            key = self.key(model, text, version)
+            self._remember(key, list(vector))
+            blobs[key] = np.asarray(vector, dtype=np.float32).tobytes()
+        try:
+            await run_in_threadpool(self._disk.put_many, blobs)
+        except sqlite3.Error as e:
+            logger.warning(f"embedding cache write failed: {e}")
+
+    def clear_memory(self) -> None:
+        self._memory.clear()
+
+    def close(self) -> None:
+        self._disk.close()
+
+    def stats(self) -> Dict[str, int | float]:
+        lookups = self.memory_hits + self.disk_hits + self.misses
+        return {
+            "memory_entries": len(self._memory),
+            "memory_hits": self.memory_hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "hit_rate": (self.memory_hits + self.disk_hits) / lookups if lookups else 0.0,
+            "disk_evictions": self._disk.evictions,
+        }
+
+
+class ResponseCache:
+    """
+    Persistent TTL cache for raw LLM responses.
+
+    Entries live in an in-memory LRU and a SQLite tier; both honour `ttl`
+    seconds, and the SQLite tier is bounded to `max_entries` rows. Only calls
+    whose `task` is in `cacheable_tasks` and that run at temperature 0 are
+    eligible, so creative generations always reach the model.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        table: str = "responses",
+        ttl: float = 7 * 24 * 3600,
+        memory_size: int = 256,
+        max_entries: int = 10_000,
+        cacheable_tasks: Sequence[str] = (),
+    ) -> None:
+        self._memory: OrderedDict[str, tuple[str, float]] = OrderedDict()
+        self._memory_size = memory_size
+        self._ttl = ttl
+        self._disk = SQLiteTier(path, table, max_entries)
+        self.cacheable_tasks = set(cacheable_tasks)
+        self.hits = 0
+        self.misses = 0
+        self.expired = 0
+
+    def allows(self, task: Optional[str], generation_args: Dict[str, Any]) -> bool:
+        return task in self.cacheable_tasks and not generation_args.get("temperature")
+
+    @staticmethod
+    def key(*parts: Any) -> str:
+        return request_key(*parts)
+
+    def _fresh(self, created_at: float) -> bool:
+        return time.time() - created_at <= self._ttl
+
+    def _remember(self, key: str, value: str, created_at: float) -> None:
+        self._memory[key] = (value, created_at)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self._memory_size:
+            self._memory.popitem(last=False)
+
+    async def get(self, key: str) -> Optional[str]:
+        entry = self._memory.get(key)
+        if entry is None:
+            try:
+                row = (await run_in_threadpool(self._disk.get_many, [key])).get(key)
+            except sqlite3.Error as e:
+                logger.warning(f"response cache read failed: {e}")
+                row = None
+            if row is not None:
+                entry = (row[0].decode("utf-8"), row[1])
+
+        if entry is not None and not self._fresh(entry[1]):
+            self.expired += 1
+            self._memory.pop(key, None)
+            await run_in_threadpool(self._disk.delete, [key])
+            entry = None
+
+        if entry is None:
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        self._remember(key, *entry)
+        return entry[0]
+
+    async def put(self, key: str, value: str) -> None:
+        self._remember(key, value, time.time())
+        try:
+            await run_in_threadpool(self._disk.put_many, {key: value.encode("utf-8")})
+        except sqlite3.Error as e:
+            logger.warning(f"response cache write failed: {e}")
+
+    def close(self) -> None:
+        self._disk.close()
+
+    def stats(self) -> Dict[str, int | float]:
+        lookups = self.hits + self.misses
+        return {
+            "memory_entries": len(self._memory),
+            "hits": self.hits,
+            "misses": self.misses,
+            "expired": self.expired,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "disk_evictions": self._disk.evictions,
+        }
+
+
+embedding_cache = EmbeddingCache(
+    path=os.path.join(settings.CACHE_DIR, "embeddings.sqlite3"),
+    memory_size=settings.EMBEDDING_CACHE_MEMORY_SIZE,
+    max_entries=settings.EMBEDDING_CACHE_MAX_ENTRIES,
+)
+
+response_cache = ResponseCache(
+    path=os.path.join(settings.CACHE_DIR, "responses.sqlite3"),
+    ttl=settings.RESPONSE_CACHE_TTL,
+    memory_size=settings.RESPONSE_CACHE_MEMORY_SIZE,
+    max_entries=settings.RESPONSE_CACHE_MAX_ENTRIES,
+    cacheable_tasks=settings.RESPONSE_CACHE_TASKS,
+)
+
+compatibility_cache = ResponseCache(
+    path=os.path.join(settings.CACHE_DIR, "compatibility.sqlite3"),
+    table="compatibility",
+    ttl=settings.COMPATIBILITY_CACHE_TTL,
+    memory_size=settings.RESPONSE_CACHE_MEMORY_SIZE,
+    max_entries=settings.RESPONSE_CACHE_MAX_ENTRIES,
+    cacheable_tasks=["compatibility"],
+)
@@ -0,0 +1,61 @@
+import re
+import numpy as np
+
+from typing import List, Sequence
+
+POOLING_MODES = ("mean", "max")
+
+# Words and single punctuation marks; the spans between them are whitespace.
+_PIECE = re.compile(r"\w+|[^\w\s]")
+
+
+def estimate_tokens(piece: str) -> int:
+    """
+    Conservative subword-token estimate for one word or punctuation mark:
+    about one token per four characters, and at least one.
+    """
+    return max(1, -(-len(piece) // 4))
+
+
+def chunk_text(text: str, max_tokens: int, overlap: int = 0) -> List[str]:
+    """
+    Split `text` into sliding windows of at most `max_tokens` estimated
+    tokens, each repeating the last `overlap` tokens of the previous one.
+    Windows are cut at word boundaries and are verbatim slices of `text`;
+    a text that fits in one window is returned unchanged.
+    """
+    pieces = [(m.start(), m.end(), estimate_tokens(m.group())) for m in _PIECE.finditer(text)]
+    if max_tokens <= 0 or sum(cost for _, _, cost in pieces) <= max_tokens:
+        return [text]
+
+    overlap = min(max(0, overlap), max_tokens // 2)
+    chunks: List[str] = []
+    start = 0
+    while True:
+        end, used = start, 0
+        while end < len(pieces) and (end == start or used + pieces[end][2] <= max_tokens):
+            used += pieces[end][2]
+            end += 1
+        chunks.append(text[pieces[start][0] : pieces[end - 1][1]])
+        if end == len(pieces):
+            return chunks
+        # Step back over up to `overlap` tokens, always moving forward.
+        back, kept = end, 0
+        while back > start + 1 and kept + pieces[back - 1][2] <= overlap:
+            back -= 1
+            kept += pieces[back][2]
+        start = back
+
+
+def pool(vectors: Sequence[Sequence[float]], mode: str = "mean") -> List[float]:
+    """
+    Combine chunk embeddings into one document embedding. Chunks are
+    L2-normalized first so long and short chunks weigh the same.
+    """
+    if len(vectors) == 1:
+        return list(vectors[0])
+    matrix = np.asarray(vectors, dtype=np.float32)
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    matrix = matrix / np.where(norms == 0, 1.0, norms)
+    pooled = matrix.max(axis=0) if mode == "max" else matrix.mean(axis=0)
+    return pooled.tolist()
@@ -4,3 +4,11 @@ class ProviderError(RuntimeError):
 
 class StrategyError(RuntimeError):
     """Raised when a Strategy cannot parse/return expected output"""
+
+
+class DeadlineExceededError(ProviderError):
+    """Raised when a model call cannot finish before its deadline"""
+
+
+class QueueTimeoutError(DeadlineExceededError):
+    """Raised when a queued model call cannot start before its deadline"""
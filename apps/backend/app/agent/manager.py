@@ -1,65 +1,327 @@
 import os
-from typing import Dict, Any
+import asyncio
+from typing import Dict, Any, List, Tuple
 
-from .exceptions import ProviderError
+from app.core.config import settings
+
+from .pool import provider_pool
+from .cache import (
+    EmbeddingCache,
+    ResponseCache,
+    embedding_cache,
+    response_cache,
+    normalize_text,
+    request_key,
+)
+from .chunking import POOLING_MODES, chunk_text, pool
+from .singleflight import SingleFlight
+from .scheduler import (
+    Priority,
+    ScheduledProvider,
+    ScheduledEmbeddingProvider,
+    provider_scheduler,
+    remaining,
+    within,
+)
+from .strategies.base import DeltaCallback
 from .strategies.wrapper import JSONWrapper, MDWrapper
-from .providers.ollama import OllamaProvider, OllamaEmbeddingProvider
-from .providers.openai import OpenAIProvider, OpenAIEmbeddingProvider
+from .providers.base import EmbeddingProvider
+
+# App-scoped, so identical calls from different requests share one provider call.
+generation_flight = SingleFlight("generate")
+embedding_flight = SingleFlight("embed")
+
+# Args that do not change the response and so must not split coalesced calls.
+# The resolved priority is keyed separately, so a call never waits behind a
+# lower-priority one; deadlines bound each waiter, not the shared call.
+_UNKEYED_ARGS = {"openai_api_key", "priority", "deadline"}
 
 
 class AgentManager:
-    def __init__(self, strategy: str | None = None, model: str = "gemma3:4b") -> None:
+    def __init__(
+        self,
+        strategy: str | None = None,
+        model: str = "gemma3:4b",
+        cache: ResponseCache | None = None,
+        priority: Priority = Priority.DEFAULT,
+        deadline: float | None = None,
+    ) -> None:
+        if cache is None and settings.RESPONSE_CACHE_ENABLED:
+            cache = response_cache
         match strategy:
             case "md":
-                self.strategy = MDWrapper()
+                self.strategy = MDWrapper(cache=cache)
             case "json":
-                self.strategy = JSONWrapper()
+                self.strategy = JSONWrapper(cache=cache)
             case _:
-                self.strategy = JSONWrapper()
+                self.strategy = JSONWrapper(cache=cache)
         self.model = model
+        self.priority = priority
+        self.deadline = deadline
 
-    async def _get_provider(self, **kwargs: Any) -> OllamaProvider | OpenAIProvider:
+    async def _resolve_backend(self, **kwargs: Any) -> Tuple[str, str | None, str | None]:
+        """
+        Resolve (backend, model, api_key) for a generation call.
+        """
         api_key = kwargs.get("openai_api_key", os.getenv("OPENAI_API_KEY"))
         if api_key:
-            return OpenAIProvider(api_key=api_key)
+            return "openai", None, api_key
 
         model = kwargs.get("model", self.model)
-        installed_ollama_models = await OllamaProvider.get_installed_models()
-        if model not in installed_ollama_models:
-            raise ProviderError(
-                f"Ollama Model '{model}' is not found. Run `ollama pull {model} or pick from any available models {installed_ollama_models}"
-            )
-        return OllamaProvider(model_name=model)
+        await provider_pool.ensure_ollama_model(model)
+        return "ollama", model, None
+
+    async def resolve_model(self, **kwargs: Any) -> str:
+        """
+        Name of the model a `run` with the same kwargs would use.
+        """
+        backend, model, api_key = await self._resolve_backend(**kwargs)
+        return provider_pool.get_provider(backend, model=model, api_key=api_key).model
 
     async def run(self, prompt: str, **kwargs: Any) -> Dict[str, Any]:
         """
         Run the agent with the given prompt and generation arguments.
+
+        Pass `task=<prompt name>` to let the response cache policy decide
+        whether a deterministic response may be reused, and `priority` to
+        control how the call is queued by the provider scheduler. `deadline`
+        (absolute `time.monotonic()`, defaulting to the manager's) bounds the
+        wait, queueing included; past it DeadlineExceededError is raised.
+        Concurrent identical calls of the same priority are coalesced into a
+        single provider call, which runs until the last of its callers has
+        its result or gives up.
+        """
+        backend, model, api_key = await self._resolve_backend(**kwargs)
+        provider = provider_pool.get_provider(backend, model=model, api_key=api_key)
+        priority = kwargs.get("priority", self.priority)
+        scheduled = ScheduledProvider(provider, provider_scheduler, backend, priority=priority)
+        args = {k: v for k, v in kwargs.items() if k not in _UNKEYED_ARGS}
+        key = request_key(
+            type(self.strategy).__name__, id(provider), int(priority), prompt, args
+        )
+        return await generation_flight.do(
+            key,
+            lambda: self.strategy(prompt, scheduled, **kwargs),
+            timeout=remaining(kwargs.get("deadline", self.deadline)),
+        )
+
+    async def stream(
+        self, prompt: str, on_delta: DeltaCallback, **kwargs: Any
+    ) -> Dict[str, Any]:
+        """
+        Run the agent like `run`, handing text deltas to `on_delta` while the
+        model generates. Streamed calls are not coalesced, since every caller
+        needs its own deltas.
         """
-        provider = await self._get_provider(**kwargs)
-        return await self.strategy(prompt, provider, **kwargs)
+        backend, model, api_key = await self._resolve_backend(**kwargs)
+        provider = provider_pool.get_provider(backend, model=model, api_key=api_key)
+        scheduled = ScheduledProvider(
+            provider,
+            provider_scheduler,
+            backend,
+            priority=kwargs.get("priority", self.priority),
+            deadline=kwargs.get("deadline", self.deadline),
+        )
+        return await self.strategy.stream(prompt, scheduled, on_delta, **kwargs)
 
 
 class EmbeddingManager:
-    def __init__(self, model: str = "nomic-embed-text:137m-v1.5-fp16") -> None:
+    def __init__(
+        self,
+        model: str = "nomic-embed-text:137m-v1.5-fp16",
+        batching: bool | None = None,
+        cache: EmbeddingCache | None = None,
+        priority: Priority = Priority.DEFAULT,
+        chunk_tokens: int | None = None,
+        chunk_overlap: int | None = None,
+        pooling: str | None = None,
+        deadline: float | None = None,
+    ) -> None:
         self._model = model
+        self._priority = priority
+        self._deadline = deadline
+        self._batching = settings.EMBEDDING_MICROBATCH if batching is None else batching
+        self._chunk_tokens = (
+            settings.EMBEDDING_CHUNK_TOKENS if chunk_tokens is None else chunk_tokens
+        )
+        self._chunk_overlap = (
+            settings.EMBEDDING_CHUNK_OVERLAP if chunk_overlap is None else chunk_overlap
+        )
+        self._pooling = settings.EMBEDDING_POOLING if pooling is None else pooling
+        if self._pooling not in POOLING_MODES:
+            raise ValueError(
+                f"unknown pooling mode {self._pooling!r}, expected one of {POOLING_MODES}"
+            )
+        if cache is None and settings.EMBEDDING_CACHE_ENABLED:
+            cache = embedding_cache
+        self._cache = cache
 
-    async def _get_embedding_provider(
-        self, **kwargs: Any
-    ) -> OllamaEmbeddingProvider | OpenAIEmbeddingProvider:
+    async def _resolve_backend(self, **kwargs: Any) -> Tuple[str, str | None, str | None]:
+        """
+        Resolve (backend, model, api_key) for an embedding call.
+        """
         api_key = kwargs.get("openai_api_key", os.getenv("OPENAI_API_KEY"))
         if api_key:
-            return OpenAIEmbeddingProvider(api_key=api_key)
+            return "openai", None, api_key
         model = kwargs.get("embedding_model", self._model)
-        installed_ollama_models = await OllamaProvider.get_installed_models()
-        if model not in installed_ollama_models:
-            raise ProviderError(
-                f"Ollama Model '{model}' is not found. Run `ollama pull {model} or pick from any available models {installed_ollama_models}"
-            )
-        return OllamaEmbeddingProvider(embedding_model=model)
+        await provider_pool.ensure_ollama_model(model)
+        return "ollama", model, None
+
+    async def resolve_model(self, **kwargs: Any) -> str:
+        """
+        Name of the embedding model an `embed` with the same kwargs would use.
+        """
+        backend, model, api_key = await self._resolve_backend(**kwargs)
+        return provider_pool.get_embedding_provider(backend, model=model, api_key=api_key).model
+
+    async def resolve_version(self, **kwargs: Any) -> str | None:
+        """
+        Version of that model, where the backend reports one: the digest of
+        an Ollama model, which changes when the model is re-pulled. OpenAI
+        model names are versioned already, so they have None.
+        """
+        backend, model, _ = await self._resolve_backend(**kwargs)
+        return await self._version(backend, model)
+
+    async def _version(self, backend: str, model: str | None) -> str | None:
+        if backend != "ollama":
+            return None
+        return await provider_pool.get_model_version(model)
+
+    def _schedule(
+        self, provider: EmbeddingProvider, backend: str, **kwargs: Any
+    ) -> ScheduledEmbeddingProvider:
+        """
+        The scheduled provider a coalesced call runs on. It is not bound by
+        any one caller's deadline: each caller waits for its own.
+        """
+        return ScheduledEmbeddingProvider(
+            provider,
+            provider_scheduler,
+            backend,
+            priority=kwargs.get("priority", self._priority),
+        )
+
+    def _timeout(self, **kwargs: Any) -> float | None:
+        return remaining(kwargs.get("deadline", self._deadline))
 
     async def embed(self, text: str, **kwargs: Any) -> list[float]:
         """
         Get the embedding for the given text.
+
+        Cached vectors are returned without touching the provider. With
+        micro-batching enabled, concurrent misses from different requests are
+        coalesced into one provider call by the pooled batcher. Texts longer
+        than one chunk are embedded like in `embed_many`.
+        """
+        if len(self._chunks(text)) > 1:
+            (vector,) = await self.embed_many([text], **kwargs)
+            return vector
+        backend, model, api_key = await self._resolve_backend(**kwargs)
+        provider = provider_pool.get_embedding_provider(backend, model=model, api_key=api_key)
+        scheduled = self._schedule(provider, backend, **kwargs)
+        key = request_key(
+            "embed", id(provider), int(kwargs.get("priority", self._priority)), normalize_text(text)
+        )
+        return await embedding_flight.do(
+            key,
+            lambda: self._embed(text, scheduled, backend, model, api_key),
+            timeout=self._timeout(**kwargs),
+        )
+
+    async def _embed(
+        self,
+        text: str,
+        provider: ScheduledEmbeddingProvider,
+        backend: str,
+        model: str | None,
+        api_key: str | None,
+    ) -> list[float]:
+        if self._cache is not None:
+            version = await self._version(backend, model)
+            (cached,) = await self._cache.get_many(provider.model, [text], version)
+            if cached is not None:
+                return cached
+
+        if self._batching:
+            batcher = provider_pool.get_embedding_batcher(
+                backend, model=model, api_key=api_key
+            )
+            vector = await within(batcher.embed(text), provider.timeout())
+        else:
+            vector = await provider.embed(text)
+
+        if self._cache is not None:
+            await self._cache.put_many(provider.model, [text], [vector], version)
+        return vector
+
+    def _chunks(self, text: str) -> List[str]:
+        return chunk_text(text, self._chunk_tokens, self._chunk_overlap)
+
+    async def embed_many(self, texts: List[str], **kwargs: Any) -> List[list[float]]:
         """
-        provider = await self._get_embedding_provider(**kwargs)
-        return await provider.embed(text)
+        Get the embeddings for several texts, in input order. Cache misses are
+        embedded with as few provider calls as `EMBEDDING_BATCH_MAX_SIZE` allows.
+
+        Texts longer than `chunk_tokens` are split into overlapping windows
+        that stay within the model's context. The chunks of all texts are
+        embedded (and cached) individually, in the same batch, and then
+        pooled back into one vector per text.
+        """
+        if not texts:
+            return []
+        chunked = [self._chunks(text) for text in texts]
+        if all(len(chunks) == 1 for chunks in chunked):
+            return await self._embed_texts(texts, **kwargs)
+
+        vectors = await self._embed_texts(
+            [chunk for chunks in chunked for chunk in chunks], **kwargs
+        )
+        pooled, start = [], 0
+        for chunks in chunked:
+            pooled.append(pool(vectors[start : start + len(chunks)], self._pooling))
+            start += len(chunks)
+        return pooled
+
+    async def _embed_texts(self, texts: List[str], **kwargs: Any) -> List[list[float]]:
+        backend, model, api_key = await self._resolve_backend(**kwargs)
+        provider = provider_pool.get_embedding_provider(backend, model=model, api_key=api_key)
+        scheduled = self._schedule(provider, backend, **kwargs)
+        key = request_key(
+            "embed_many",
+            id(provider),
+            int(kwargs.get("priority", self._priority)),
+            [normalize_text(text) for text in texts],
+        )
+        return await embedding_flight.do(
+            key,
+            lambda: self._embed_many(texts, scheduled, backend, model),
+            timeout=self._timeout(**kwargs),
+        )
+
+    async def _embed_many(
+        self, texts: List[str], provider: EmbeddingProvider, backend: str, model: str | None
+    ) -> List[list[float]]:
+        version = None
+        if self._cache is not None:
+            version = await self._version(backend, model)
+            vectors = await self._cache.get_many(provider.model, texts, version)
+        else:
+            vectors = [None] * len(texts)
+
+        missing = list(dict.fromkeys(t for t, v in zip(texts, vectors) if v is None))
+        if missing:
+            size = settings.EMBEDDING_BATCH_MAX_SIZE
+            chunks = await asyncio.gather(
+                *(
+                    provider.embed_many(missing[start : start + size])
+                    for start in range(0, len(missing), size)
+                )
+            )
+            fresh = [vector for chunk in chunks for vector in chunk]
+            if self._cache is not None:
+                await self._cache.put_many(provider.model, missing, fresh, version)
+            by_text = dict(zip(missing, fresh))
+            vectors = [v if v is not None else by_text[t] for t, v in zip(texts, vectors)]
+
+        return vectors
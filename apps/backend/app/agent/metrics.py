@@ -0,0 +1,24 @@
+from typing import Any, Dict
+
+from .pool import provider_pool
+from .cache import embedding_cache, response_cache, compatibility_cache
+from .scheduler import provider_scheduler
+from .manager import generation_flight, embedding_flight
+
+
+def agent_metrics() -> Dict[str, Any]:
+    """
+    Snapshot of the agent layer's in-process counters.
+    """
+    return {
+        "providers": provider_pool.stats(),
+        "scheduler": provider_scheduler.stats(),
+        "cancellation": provider_scheduler.cancellation_stats(),
+        "single_flight": {
+            "generate": generation_flight.stats(),
+            "embed": embedding_flight.stats(),
+        },
+        "embedding_cache": embedding_cache.stats(),
+        "response_cache": response_cache.stats(),
+        "compatibility_cache": compatibility_cache.stats(),
+    }
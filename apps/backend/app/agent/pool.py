@@ -0,0 +1,318 @@
+import time
+import asyncio
+import logging
+
+from typing import Any, Dict, List, Optional, Tuple
+
+from app.core.config import settings
+
+from .exceptions import ProviderError
+from .batching import EmbeddingBatcher
+from .scheduler import ScheduledEmbeddingProvider, provider_scheduler
+from .routing import OllamaHostRouter, RoutedOllamaProvider, RoutedOllamaEmbeddingProvider
+from .providers.base import Provider, EmbeddingProvider
+from .providers.ollama import OllamaProvider, OllamaEmbeddingProvider
+from .providers.openai import OpenAIProvider, OpenAIEmbeddingProvider
+
+logger = logging.getLogger(__name__)
+
+# (kind, backend, host, model, api_key)
+PoolKey = Tuple[str, str, Optional[str], Optional[str], Optional[str]]
+
+
+class ProviderPool:
+    """
+    App-scoped registry of long-lived providers.
+
+    Providers are keyed by (backend, host, model) - plus the API key, so
+    per-call credentials never share a client - and keep their HTTP client
+    (and its keep-alive connections) for the lifetime of the process.
+
+    The list of installed Ollama models is cached per host for `models_ttl`
+    seconds. Once stale, the cached list is still served while a background
+    task refreshes it, so the model check never sits on the hot path.
+
+    With a `router`, Ollama providers requested without an explicit host are
+    routed per call across the router's hosts.
+    """
+
+    def __init__(
+        self,
+        models_ttl: float = 300.0,
+        batch_max_size: int = 32,
+        batch_max_wait_ms: float = 5.0,
+        router: Optional[OllamaHostRouter] = None,
+    ) -> None:
+        self._router = router
+        self._models_ttl = models_ttl
+        self._batch_max_size = batch_max_size
+        self._batch_max_wait_ms = batch_max_wait_ms
+        self._providers: Dict[PoolKey, Provider | EmbeddingProvider] = {}
+        self._batchers: Dict[PoolKey, EmbeddingBatcher] = {}
+        # host -> (fetched at, {model: digest})
+        self._installed_models: Dict[
+            Optional[str], Tuple[float, Dict[str, Optional[str]]]
+        ] = {}
+        self._refresh_tasks: Dict[Optional[str], asyncio.Task] = {}
+
+    async def _refresh_installed_models(self, host: Optional[str]) -> Dict[str, Optional[str]]:
+        models = await OllamaProvider.get_model_digests(host=host)
+        self._installed_models[host] = (time.monotonic(), models)
+        return models
+
+    def _refresh(self, host: Optional[str]) -> asyncio.Task:
+        """
+        The in-flight listing of `host`'s models, started if there is none, so
+        concurrent first lookups and background refreshes share one request.
+        """
+        task = self._refresh_tasks.get(host)
+        if task is None or task.done():
+            task = asyncio.create_task(self._refresh_installed_models(host))
+            task.add_done_callback(self._log_refresh_failure)
+            self._refresh_tasks[host] = task
+        return task
+
+    @staticmethod
+    def _log_refresh_failure(task: asyncio.Task) -> None:
+        if not task.cancelled() and task.exception() is not None:
+            logger.warning(f"refresh of ollama models failed: {task.exception()}")
+
+    async def _model_digests(
+        self, host: Optional[str] = None, force_refresh: bool = False
+    ) -> Dict[str, Optional[str]]:
+        if force_refresh:
+            return await self._refresh_installed_models(host)
+        entry = self._installed_models.get(host)
+        if entry is None:
+            # Shielded: a caller giving up must not cancel the others' listing.
+            return await asyncio.shield(self._refresh(host))
+
+        fetched_at, models = entry
+        if time.monotonic() - fetched_at > self._models_ttl:
+            self._refresh(host)
+        return models
+
+    async def get_installed_models(
+        self, host: Optional[str] = None, force_refresh: bool = False
+    ) -> List[str]:
+        """
+        Return the installed Ollama models for `host`, served from cache when possible.
+        """
+        return list(await self._model_digests(host, force_refresh))
+
+    async def get_model_version(self, model: str, host: Optional[str] = None) -> Optional[str]:
+        """
+        Digest of an installed Ollama model (from the same cached listing), or
+        None if it is unknown. Routed models report the digest of a healthy
+        host the router picks among those that have the model.
+        """
+        if host is None and self._router is not None:
+            try:
+                await self._router.ensure_model(model)
+                host = self._router.choose(model)
+            except ProviderError as e:
+                logger.warning(f"no ollama host to read the version of {model} from: {e}")
+                return None
+        return (await self._model_digests(host)).get(model)
+
+    async def ensure_ollama_model(self, model: str, host: Optional[str] = None) -> None:
+        """
+        Check that `model` is installed, refreshing the cached list once on a miss
+        in case it was pulled after the last refresh.
+        """
+        if host is None and self._router is not None:
+            return await self._router.ensure_model(model)
+        installed = await self.get_installed_models(host=host)
+        if model in installed:
+            return
+        installed = await self.get_installed_models(host=host, force_refresh=True)
+        if model not in installed:
+            raise ProviderError(
+                f"Ollama Model '{model}' is not found. Run `ollama pull {model} or pick from any available models {installed}"
+            )
+
+    def _get_or_create(self, key: PoolKey, factory: Any) -> Any:
+        provider = self._providers.get(key)
+        if provider is None:
+            provider = factory()
+            self._providers[key] = provider
+            logger.info(f"created pooled provider for {key[:4]}")
+        return provider
+
+    def get_provider(
+        self,
+        backend: str,
+        model: Optional[str] = None,
+        host: Optional[str] = None,
+        api_key: Optional[str] = None,
+    ) -> Provider:
+        """
+        Return the pooled generation provider for (backend, host, model).
+        """
+        key: PoolKey = ("generate", backend, host, model, api_key)
+        match backend:
+            case "openai":
+                kwargs = {"model": model} if model else {}
+                return self._get_or_create(
+                    key, lambda: OpenAIProvider(api_key=api_key, **kwargs)
+                )
+            case "ollama" if host is None and self._router is not None:
+                return self._get_or_create(
+                    key,
+                    lambda: RoutedOllamaProvider(
+                        self._router,
+                        lambda routed_host: self.get_provider("ollama", model, routed_host),
+                        model,
+                    ),
+                )
+            case "ollama":
+                return self._get_or_create(
+                    key, lambda: OllamaProvider(model_name=model, host=host)
+                )
+            case _:
+                raise ValueError(f"Unknown provider backend: {backend}")
+
+    def get_embedding_provider(
+        self,
+        backend: str,
+        model: Optional[str] = None,
+        host: Optional[str] = None,
+        api_key: Optional[str] = None,
+    ) -> EmbeddingProvider:
+        """
+        Return the pooled embedding provider for (backend, host, model).
+        """
+        key: PoolKey = ("embed", backend, host, model, api_key)
+        match backend:
+            case "openai":
+                kwargs = {"embedding_model": model} if model else {}
+                return self._get_or_create(
+                    key, lambda: OpenAIEmbeddingProvider(api_key=api_key, **kwargs)
+                )
+            case "ollama" if host is None and self._router is not None:
+                return self._get_or_create(
+                    key,
+                    lambda: RoutedOllamaEmbeddingProvider(
+                        self._router,
+                        lambda routed_host: self.get_embedding_provider(
+                            "ollama", model, routed_host
+                        ),
+                        model,
+                    ),
+                )
+            case "ollama":
+                return self._get_or_create(
+                    key,
+                    lambda: OllamaEmbeddingProvider(embedding_model=model, host=host),
+                )
+            case _:
+                raise ValueError(f"Unknown provider backend: {backend}")
+
+    def get_embedding_batcher(
+        self,
+        backend: str,
+        model: Optional[str] = None,
+        host: Optional[str] = None,
+        api_key: Optional[str] = None,
+    ) -> EmbeddingBatcher:
+        """
+        Return the shared micro-batcher in front of the pooled embedding provider,
+        so concurrent requests for the same (backend, host, model) share batches.
+        """
+        key: PoolKey = ("embed", backend, host, model, api_key)
+        batcher = self._batchers.get(key)
+        if batcher is None:
+            provider = self.get_embedding_provider(backend, model, host, api_key)
+            batcher = EmbeddingBatcher(
+                ScheduledEmbeddingProvider(provider, provider_scheduler, backend),
+                max_batch_size=self._batch_max_size,
+                max_wait_ms=self._batch_max_wait_ms,
+            )
+            self._batchers[key] = batcher
+        return batcher
+
+    def invalidate(
+        self,
+        backend: Optional[str] = None,
+        host: Optional[str] = None,
+        model: Optional[str] = None,
+    ) -> int:
+        """
+        Drop pooled providers (and cached model lists) matching the given filters.
+        Called with no arguments it clears the whole pool. Returns the number of
+        providers removed.
+        """
+        stale = [
+            key
+            for key in self._providers
+            if (backend is None or key[1] == backend)
+            and (host is None or key[2] == host)
+            and (model is None or key[3] == model)
+        ]
+        removed = [self._providers.pop(key) for key in stale]
+        for key in stale:
+            self._batchers.pop(key, None)
+        self._close_in_background(removed)
+
+        if backend in (None, "ollama"):
+            if host is None:
+                self._installed_models.clear()
+            else:
+                self._installed_models.pop(host, None)
+
+        logger.info(f"invalidated {len(stale)} pooled provider(s)")
+        return len(stale)
+
+    def _close_in_background(self, providers: List[Provider | EmbeddingProvider]) -> None:
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return
+        for provider in providers:
+            loop.create_task(provider.aclose())
+
+    async def aclose(self) -> None:
+        """
+        Cancel background refreshes and close every pooled provider's client.
+        """
+        for task in self._refresh_tasks.values():
+            task.cancel()
+        self._refresh_tasks.clear()
+        if self._router is not None:
+            await self._router.aclose()
+
+        providers = list(self._providers.values())
+        self._providers.clear()
+        self._batchers.clear()
+        self._installed_models.clear()
+        for provider in providers:
+            try:
+                await provider.aclose()
+            except Exception as e:
+                logger.warning(f"failed to close pooled provider: {e}")
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "providers": len(self._providers),
+            "cached_model_lists": len(self._installed_models),
+            "ollama_hosts": self._router.stats() if self._router is not None else {},
+            "embedding_batchers": {
+                f"{key[1]}:{key[3]}": batcher.stats()
+                for key, batcher in self._batchers.items()
+            },
+        }
+
+
+provider_pool = ProviderPool(
+    router=OllamaHostRouter(
+        settings.OLLAMA_HOSTS,
+        probe_interval=settings.OLLAMA_PROBE_INTERVAL,
+        failure_threshold=settings.OLLAMA_FAILURE_THRESHOLD,
+        cooldown=settings.OLLAMA_COOLDOWN,
+    )
+    if settings.OLLAMA_HOSTS
+    else None,
+    models_ttl=settings.PROVIDER_MODELS_TTL,
+    batch_max_size=settings.EMBEDDING_BATCH_MAX_SIZE,
+    batch_max_wait_ms=settings.EMBEDDING_BATCH_MAX_WAIT_MS,
+)
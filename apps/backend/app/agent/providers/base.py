@@ -1,4 +1,4 @@
-from typing import Any
+from typing import Any, AsyncIterator
 from abc import ABC, abstractmethod
 
 
@@ -7,14 +7,42 @@ class Provider(ABC):
     Abstract base class for providers.
     """
 
+    model: str
+
     @abstractmethod
     async def __call__(self, prompt: str, **generation_args: Any) -> str: ...
 
+    async def stream(self, prompt: str, **generation_args: Any) -> AsyncIterator[str]:
+        """
+        Yield the response as text deltas. Providers without native streaming
+        yield the whole response at once.
+        """
+        yield await self(prompt, **generation_args)
+
+    async def aclose(self) -> None:
+        """
+        Release the underlying client. Providers without resources may ignore it.
+        """
+
 
 class EmbeddingProvider(ABC):
     """
     Abstract base class for embedding providers.
     """
 
+    model: str
+
     @abstractmethod
     async def embed(self, text: str) -> list[float]: ...
+
+    @abstractmethod
+    async def embed_many(self, texts: list[str]) -> list[list[float]]:
+        """
+        Embed several texts in one provider call, preserving input order.
+        """
+        ...
+
+    async def aclose(self) -> None:
+        """
+        Release the underlying client. Providers without resources may ignore it.
+        """
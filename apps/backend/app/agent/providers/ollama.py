@@ -1,8 +1,8 @@
 import logging
+import httpx
 import ollama
 
-from typing import Any, Dict, List, Optional
-from fastapi.concurrency import run_in_threadpool
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
 
 from ..exceptions import ProviderError
 from .base import Provider, EmbeddingProvider
@@ -10,46 +10,84 @@ from .base import Provider, EmbeddingProvider
 logger = logging.getLogger(__name__)
 
 
+def _client(host: Optional[str]) -> Tuple[ollama.AsyncClient, httpx.AsyncHTTPTransport]:
+    """
+    An Ollama client over a transport of our own. ollama's AsyncClient has no
+    public close method, so its connections are closed through the transport.
+    """
+    transport = httpx.AsyncHTTPTransport()
+    return ollama.AsyncClient(host=host, transport=transport), transport
+
+
 class OllamaProvider(Provider):
     def __init__(self, model_name: str = "gemma3:4b", host: Optional[str] = None):
         self.model = model_name
-        self._client = ollama.Client(host=host) if host else ollama.Client()
+        self._client, self._transport = _client(host)
 
     @staticmethod
     async def get_installed_models(host: Optional[str] = None) -> List[str]:
         """
         List all installed models.
         """
+        return list(await OllamaProvider.get_model_digests(host=host))
 
-        def _list_sync() -> List[str]:
-            client = ollama.Client(host=host) if host else ollama.Client()
-            return [model_class.model for model_class in client.list().models]
-
-        return await run_in_threadpool(_list_sync)
-
-    def _generate_sync(self, prompt: str, options: Dict[str, Any]) -> str:
+    @staticmethod
+    async def get_model_digests(host: Optional[str] = None) -> Dict[str, Optional[str]]:
         """
-        Generate a response from the model.
+        {model: digest} of all installed models. The digest changes whenever
+        a model is re-pulled with different weights under the same tag.
         """
+        client, transport = _client(host)
         try:
-            response = self._client.generate(
-                prompt=prompt,
-                model=self.model,
-                options=options,
-            )
-            return response["response"].strip()
-        except Exception as e:
-            logger.error(f"ollama sync error: {e}")
-            raise ProviderError(f"Ollama - Error generating response: {e}")
+            response = await client.list()
+            return {model_class.model: model_class.digest for model_class in response.models}
+        finally:
+            await transport.aclose()
 
-    async def __call__(self, prompt: str, **generation_args: Any) -> str:
+    @staticmethod
+    def _options(generation_args: Dict[str, Any]) -> Dict[str, Any]:
         opts = {
             "temperature": generation_args.get("temperature", 0),
             "top_p": generation_args.get("top_p", 0.9),
             "top_k": generation_args.get("top_k", 40),
             "num_ctx": min(generation_args.get("max_length", 15000), 16000),
         }
-        return await run_in_threadpool(self._generate_sync, prompt, opts)
+        if generation_args.get("seed") is not None:
+            opts["seed"] = generation_args["seed"]
+        return opts
+
+    async def __call__(self, prompt: str, **generation_args: Any) -> str:
+        try:
+            response = await self._client.generate(
+                prompt=prompt,
+                model=self.model,
+                options=self._options(generation_args),
+            )
+            return response["response"].strip()
+        except Exception as e:
+            logger.error(f"ollama generate error: {e}")
+            raise ProviderError(f"Ollama - Error generating response: {e}") from e
+
+    async def stream(self, prompt: str, **generation_args: Any) -> AsyncIterator[str]:
+        """
+        Stream the response token deltas as Ollama produces them.
+        """
+        try:
+            chunks = await self._client.generate(
+                prompt=prompt,
+                model=self.model,
+                options=self._options(generation_args),
+                stream=True,
+            )
+            async for chunk in chunks:
+                if chunk["response"]:
+                    yield chunk["response"]
+        except Exception as e:
+            logger.error(f"ollama stream error: {e}")
+            raise ProviderError(f"Ollama - Error streaming response: {e}") from e
+
+    async def aclose(self) -> None:
+        await self._transport.aclose()
 
 
 class OllamaEmbeddingProvider(EmbeddingProvider):
@@ -59,19 +97,33 @@ class OllamaEmbeddingProvider(EmbeddingProvider):
         host: Optional[str] = None,
     ):
         self._model = embedding_model
-        self._client = ollama.Client(host=host) if host else ollama.Client()
+        self._client, self._transport = _client(host)
+
+    @property
+    def model(self) -> str:
+        return self._model
 
     async def embed(self, text: str) -> List[float]:
         """
         Generate an embedding for the given text.
         """
         try:
-            response = await run_in_threadpool(
-                self._client.embed,
-                input=text,
-                model=self._model,
-            )
-            return response.embeddings
+            response = await self._client.embed(input=text, model=self._model)
+            return response.embeddings[0]
         except Exception as e:
             logger.error(f"ollama embedding error: {e}")
-            raise ProviderError(f"Ollama - Error generating embedding: {e}")
+            raise ProviderError(f"Ollama - Error generating embedding: {e}") from e
+
+    async def embed_many(self, texts: List[str]) -> List[List[float]]:
+        """
+        Generate embeddings for several texts with a single request.
+        """
+        try:
+            response = await self._client.embed(input=texts, model=self._model)
+            return list(response.embeddings)
+        except Exception as e:
+            logger.error(f"ollama batch embedding error: {e}")
+            raise ProviderError(f"Ollama - Error generating embeddings: {e}") from e
+
+    async def aclose(self) -> None:
+        await self._transport.aclose()
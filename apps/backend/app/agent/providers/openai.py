@@ -1,9 +1,8 @@
 import os
 import logging
 
-from openai import OpenAI
-from typing import Any, Dict
-from fastapi.concurrency import run_in_threadpool
+from openai import AsyncOpenAI
+from typing import Any, AsyncIterator, Dict
 
 from ..exceptions import ProviderError
 from .base import Provider, EmbeddingProvider
@@ -16,35 +15,49 @@ class OpenAIProvider(Provider):
         api_key = api_key or os.getenv("OPENAI_API_KEY")
         if not api_key:
             raise ProviderError("OpenAI API key is missing")
-        self._client = OpenAI(api_key=api_key)
+        self._client = AsyncOpenAI(api_key=api_key)
         self.model = model
         self.instructions = ""
 
-    def _generate_sync(self, prompt: str, options: Dict[str, Any]) -> str:
+    def _request(self, prompt: str, generation_args: Dict[str, Any]) -> Dict[str, Any]:
+        # OpenAI models have a maximum completion token limit (typically 16384)
+        # Using a safer default that's well below the limit
+        max_length = min(generation_args.get("max_length", 15000), 16000)
+        request = {
+            "model": self.model,
+            "messages": [
+                {"role": "system", "content": self.instructions},
+                {"role": "user", "content": prompt}
+            ],
+            "max_completion_tokens": max_length,
+        }
+        # Reasoning models reject `temperature`, so only the seed is forwarded.
+        if generation_args.get("seed") is not None:
+            request["seed"] = generation_args["seed"]
+        return request
+
+    async def __call__(self, prompt: str, **generation_args: Any) -> str:
         try:
-            # Remove unsupported parameters for OpenAI API
-            clean_options = {k: v for k, v in options.items() if k not in ['top_k', 'temperature', 'top_p']}
-            
-            response = self._client.chat.completions.create(
-                model=self.model,
-                messages=[
-                    {"role": "system", "content": self.instructions},
-                    {"role": "user", "content": prompt}
-                ],
-                **clean_options,
+            response = await self._client.chat.completions.create(
+                **self._request(prompt, generation_args)
             )
             return response.choices[0].message.content
         except Exception as e:
             raise ProviderError(f"OpenAI - error generating response: {e}") from e
 
-    async def __call__(self, prompt: str, **generation_args: Any) -> str:
-        # OpenAI models have a maximum completion token limit (typically 16384)
-        # Using a safer default that's well below the limit
-        max_length = min(generation_args.get("max_length", 15000), 16000)
-        opts = {
-            "max_completion_tokens": max_length,
-        }
-        return await run_in_threadpool(self._generate_sync, prompt, opts)
+    async def stream(self, prompt: str, **generation_args: Any) -> AsyncIterator[str]:
+        try:
+            chunks = await self._client.chat.completions.create(
+                **self._request(prompt, generation_args), stream=True
+            )
+            async for chunk in chunks:
+                if chunk.choices and chunk.choices[0].delta.content:
+                    yield chunk.choices[0].delta.content
+        except Exception as e:
+            raise ProviderError(f"OpenAI - error streaming response: {e}") from e
+
+    async def aclose(self) -> None:
+        await self._client.close()
 
 
 class OpenAIEmbeddingProvider(EmbeddingProvider):
@@ -56,14 +69,30 @@ class OpenAIEmbeddingProvider(EmbeddingProvider):
         api_key = api_key or os.getenv("OPENAI_API_KEY")
         if not api_key:
             raise ProviderError("OpenAI API key is missing")
-        self._client = OpenAI(api_key=api_key)
+        self._client = AsyncOpenAI(api_key=api_key)
         self._model = embedding_model
 
+    @property
+    def model(self) -> str:
+        return self._model
+
     async def embed(self, text: str) -> list[float]:
         try:
-            response = await run_in_threadpool(
-                self._client.embeddings.create, input=text, model=self._model
+            response = await self._client.embeddings.create(
+                input=text, model=self._model
             )
             return response.data[0].embedding
         except Exception as e:
             raise ProviderError(f"OpenAI - error generating embedding: {e}") from e
+
+    async def embed_many(self, texts: list[str]) -> list[list[float]]:
+        try:
+            response = await self._client.embeddings.create(
+                input=texts, model=self._model
+            )
+            return [item.embedding for item in sorted(response.data, key=lambda d: d.index)]
+        except Exception as e:
+            raise ProviderError(f"OpenAI - error generating embeddings: {e}") from e
+
+    async def aclose(self) -> None:
+        await self._client.close()
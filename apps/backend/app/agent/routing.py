@@ -0,0 +1,248 @@
+import time
+import asyncio
+import logging
+import itertools
+
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional, Set
+
+from .exceptions import ProviderError
+from .providers.base import Provider, EmbeddingProvider
+from .providers.ollama import OllamaProvider
+
+logger = logging.getLogger(__name__)
+
+
+class _HostState:
+    def __init__(self, host: str) -> None:
+        self.host = host
+        self.models: Set[str] = set()
+        self.outstanding = 0
+        self.requests = 0
+        self.failures = 0
+        self.consecutive_failures = 0
+        self.open_until = 0.0
+        self.last_probe = 0.0
+
+    def available(self, now: float) -> bool:
+        """
+        Closed circuits are available. Open ones become half-open once their
+        cool-down has passed and then admit a single trial request at a time.
+        """
+        if not self.open_until:
+            return True
+        return now >= self.open_until and self.outstanding == 0
+
+    def stats(self, now: float) -> Dict[str, Any]:
+        return {
+            "outstanding": self.outstanding,
+            "requests": self.requests,
+            "failures": self.failures,
+            "circuit": "closed" if not self.open_until
+            else ("open" if now < self.open_until else "half-open"),
+            "models": sorted(self.models),
+        }
+
+
+class OllamaHostRouter:
+    """
+    Spreads Ollama calls over several hosts.
+
+    * Model-aware: only hosts that reported the model installed are candidates.
+    * Least outstanding requests wins, ties are broken round-robin.
+    * A background probe lists each host's models every `probe_interval`
+      seconds; the same call doubles as the health check.
+    * Circuit breaker: after `failure_threshold` consecutive failures a host is
+      ejected for `cooldown` seconds, then gets a half-open trial request.
+    """
+
+    def __init__(
+        self,
+        hosts: List[str],
+        probe_interval: float = 15.0,
+        failure_threshold: int = 3,
+        cooldown: float = 30.0,
+    ) -> None:
+        self._hosts: Dict[str, _HostState] = {host: _HostState(host) for host in hosts}
+        self._probe_interval = probe_interval
+        self._failure_threshold = failure_threshold
+        self._cooldown = cooldown
+        self._rr = itertools.count()
+        self._probe_task: Optional[asyncio.Task] = None
+
+    @property
+    def hosts(self) -> List[str]:
+        return list(self._hosts)
+
+    def _record_success(self, state: _HostState) -> None:
+        state.consecutive_failures = 0
+        state.open_until = 0.0
+
+    def _record_failure(self, state: _HostState) -> None:
+        state.failures += 1
+        state.consecutive_failures += 1
+        if state.consecutive_failures >= self._failure_threshold:
+            state.open_until = time.monotonic() + self._cooldown
+            logger.warning(
+                f"ollama host {state.host} ejected for {self._cooldown}s after "
+                f"{state.consecutive_failures} consecutive failures"
+            )
+
+    async def probe(self, host: str) -> bool:
+        """
+        Refresh `host`'s model list; a failed listing counts as a failure.
+        """
+        state = self._hosts[host]
+        state.last_probe = time.monotonic()
+        try:
+            state.models = set(await OllamaProvider.get_installed_models(host=host))
+        except Exception as e:
+            logger.warning(f"ollama host {host} failed health probe: {e}")
+            self._record_failure(state)
+            return False
+        self._record_success(state)
+        return True
+
+    async def probe_all(self) -> None:
+        await asyncio.gather(*(self.probe(host) for host in self._hosts))
+
+    async def _probe_loop(self) -> None:
+        while True:
+            await asyncio.sleep(self._probe_interval)
+            await self.probe_all()
+
+    def start(self) -> None:
+        if self._probe_task is None or self._probe_task.done():
+            self._probe_task = asyncio.create_task(self._probe_loop())
+
+    async def aclose(self) -> None:
+        if self._probe_task is not None:
+            self._probe_task.cancel()
+            self._probe_task = None
+
+    async def ensure_model(self, model: str) -> None:
+        """
+        Make sure at least one host has `model`, probing every host once if
+        none is known to have it yet.
+        """
+        self.start()
+        if any(model in state.models for state in self._hosts.values()):
+            return
+        await self.probe_all()
+        if not any(model in state.models for state in self._hosts.values()):
+            installed = sorted(set().union(*(s.models for s in self._hosts.values())))
+            raise ProviderError(
+                f"Ollama Model '{model}' is not found on any host. Run `ollama pull {model} or pick from any available models {installed}"
+            )
+
+    def choose(self, model: str, exclude: Set[str] = frozenset()) -> str:
+        """
+        Pick the available host with `model` that has the fewest outstanding requests.
+        """
+        now = time.monotonic()
+        candidates = [
+            state
+            for state in self._hosts.values()
+            if model in state.models and state.host not in exclude and state.available(now)
+        ]
+        if not candidates:
+            raise ProviderError(f"No healthy Ollama host has model '{model}'")
+        fewest = min(state.outstanding for state in candidates)
+        least_loaded = [s for s in candidates if s.outstanding == fewest]
+        return least_loaded[next(self._rr) % len(least_loaded)].host
+
+    @asynccontextmanager
+    async def track(self, host: str) -> AsyncIterator[None]:
+        """
+        Count the request against `host` and feed its outcome to the circuit breaker.
+        """
+        state = self._hosts[host]
+        state.outstanding += 1
+        state.requests += 1
+        try:
+            yield
+        except ProviderError:
+            self._record_failure(state)
+            raise
+        else:
+            self._record_success(state)
+        finally:
+            state.outstanding -= 1
+
+    async def call(self, model: str, fn: Callable[[str], Any]) -> Any:
+        """
+        Run `fn(host)` on the best host, failing over once to another host
+        when the first one errors.
+        """
+        tried: Set[str] = set()
+        last_error: Optional[ProviderError] = None
+        for _ in range(2):
+            try:
+                host = self.choose(model, exclude=tried)
+            except ProviderError:
+                if last_error is not None:
+                    raise last_error
+                raise
+            tried.add(host)
+            try:
+                async with self.track(host):
+                    return await fn(host)
+            except ProviderError as e:
+                logger.warning(f"ollama host {host} failed: {e}")
+                last_error = e
+        raise last_error
+
+    def stats(self) -> Dict[str, Any]:
+        now = time.monotonic()
+        return {host: state.stats(now) for host, state in self._hosts.items()}
+
+
+class RoutedOllamaProvider(Provider):
+    """
+    Generation provider that routes each call to a host chosen by the router.
+    """
+
+    def __init__(
+        self, router: OllamaHostRouter, resolve: Callable[[str], Provider], model: str
+    ) -> None:
+        self._router = router
+        self._resolve = resolve
+        self.model = model
+
+    async def __call__(self, prompt: str, **generation_args: Any) -> str:
+        return await self._router.call(
+            self.model, lambda host: self._resolve(host)(prompt, **generation_args)
+        )
+
+    async def stream(self, prompt: str, **generation_args: Any) -> AsyncIterator[str]:
+        # Output may already have reached the client, so streams never fail over.
+        host = self._router.choose(self.model)
+        async with self._router.track(host):
+            async for delta in self._resolve(host).stream(prompt, **generation_args):
+                yield delta
+
+
+class RoutedOllamaEmbeddingProvider(EmbeddingProvider):
+    """
+    Embedding provider that routes each call to a host chosen by the router.
+    """
+
+    def __init__(
+        self,
+        router: OllamaHostRouter,
+        resolve: Callable[[str], EmbeddingProvider],
+        model: str,
+    ) -> None:
+        self._router = router
+        self._resolve = resolve
+        self.model = model
+
+    async def embed(self, text: str) -> List[float]:
+        return await self._router.call(
+            self.model, lambda host: self._resolve(host).embed(text)
+        )
+
+    async def embed_many(self, texts: List[str]) -> List[List[float]]:
+        return await self._router.call(
+            self.model, lambda host: self._resolve(host).embed_many(texts)
+        )
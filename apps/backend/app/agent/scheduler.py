@@ -0,0 +1,338 @@
+import time
+import heapq
+import asyncio
+import logging
+import itertools
+
+from enum import IntEnum
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Awaitable, Deque, Dict, List, Optional, Tuple, TypeVar
+
+from app.core.config import settings
+
+from .exceptions import DeadlineExceededError, QueueTimeoutError
+from .providers.base import Provider, EmbeddingProvider
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+def remaining(deadline: Optional[float]) -> Optional[float]:
+    """
+    Seconds left until an absolute `time.monotonic()` deadline (None: no deadline).
+    """
+    return None if deadline is None else max(0.0, deadline - time.monotonic())
+
+
+async def within(awaitable: Awaitable[T], timeout: Optional[float]) -> T:
+    """
+    Await `awaitable` for at most `timeout` seconds (None: no limit). On
+    timeout it is cancelled - aborting the provider's HTTP request - and
+    DeadlineExceededError is raised.
+    """
+    if timeout is None:
+        return await awaitable
+    try:
+        return await asyncio.wait_for(awaitable, timeout)
+    except asyncio.TimeoutError:
+        raise DeadlineExceededError("model call ran past its deadline")
+
+
+class Priority(IntEnum):
+    """
+    Scheduling classes - lower values are served first.
+    """
+
+    INTERACTIVE = 0
+    DEFAULT = 1
+    BULK = 2
+
+
+class _Lane:
+    """
+    Concurrency-limited, priority-ordered queue for one (backend, model).
+    """
+
+    def __init__(self, limit: int) -> None:
+        self.limit = max(1, limit)
+        self.active = 0
+        self._queue: List[Tuple[int, int, asyncio.Future]] = []
+        self._seq = itertools.count()
+        self._waits: Deque[float] = deque(maxlen=512)
+        self._durations: Deque[float] = deque(maxlen=512)
+        self.acquired = 0
+        self.timeouts = 0
+        self.completed = 0
+        self.cancelled = 0
+        self.cancelled_queued = 0
+        self.cancelled_seconds = 0.0
+        self.saved_seconds = 0.0
+
+    @property
+    def depth(self) -> int:
+        return sum(1 for _, _, future in self._queue if not future.done())
+
+    async def acquire(self, priority: Priority, deadline: Optional[float]) -> None:
+        enqueued_at = time.monotonic()
+        if self.active < self.limit and not self.depth:
+            self.active += 1
+            self._record(enqueued_at)
+            return
+
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._queue, (int(priority), next(self._seq), future))
+        timeout = None if deadline is None else max(0.0, deadline - time.monotonic())
+        try:
+            await asyncio.wait_for(asyncio.shield(future), timeout)
+        except asyncio.TimeoutError:
+            if future.done() and not future.cancelled():
+                # The slot was handed over just as the deadline expired.
+                self.release()
+            future.cancel()
+            self.timeouts += 1
+            raise QueueTimeoutError(
+                f"model call waited {time.monotonic() - enqueued_at:.1f}s in queue and missed its deadline"
+            )
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                self.release()
+            future.cancel()
+            raise
+        self._record(enqueued_at)
+
+    def release(self) -> None:
+        self.active -= 1
+        while self._queue and self.active < self.limit:
+            _, _, future = heapq.heappop(self._queue)
+            if future.done():
+                continue
+            self.active += 1
+            future.set_result(None)
+
+    def _record(self, enqueued_at: float) -> None:
+        self.acquired += 1
+        self._waits.append(time.monotonic() - enqueued_at)
+
+    def record_call(self, elapsed: float) -> None:
+        self.completed += 1
+        self._durations.append(elapsed)
+
+    def record_cancel(self, elapsed: Optional[float]) -> None:
+        """
+        Account for a call cancelled after `elapsed` seconds on the model, or
+        while still queued (None). The model time saved is estimated as the
+        rest of an average completed call on this lane.
+        """
+        average = sum(self._durations) / len(self._durations) if self._durations else 0.0
+        if elapsed is None:
+            self.cancelled_queued += 1
+            self.saved_seconds += average
+            return
+        self.cancelled += 1
+        self.cancelled_seconds += elapsed
+        self.saved_seconds += max(0.0, average - elapsed)
+
+    def stats(self) -> Dict[str, Any]:
+        waits = sorted(self._waits)
+        return {
+            "limit": self.limit,
+            "active": self.active,
+            "queue_depth": self.depth,
+            "acquired": self.acquired,
+            "timeouts": self.timeouts,
+            "wait_avg_ms": 1000 * sum(waits) / len(waits) if waits else 0.0,
+            "wait_p95_ms": 1000 * waits[int(0.95 * (len(waits) - 1))] if waits else 0.0,
+            "wait_max_ms": 1000 * waits[-1] if waits else 0.0,
+            "completed": self.completed,
+            "cancelled": self.cancelled,
+            "cancelled_queued": self.cancelled_queued,
+            "cancelled_model_seconds": round(self.cancelled_seconds, 3),
+            "saved_model_seconds": round(self.saved_seconds, 3),
+        }
+
+
+class ProviderScheduler:
+    """
+    Bounds concurrent model calls per (backend, model) and serves queued calls
+    by priority class, then arrival order.
+
+    Limits are looked up as "<backend>:<model>", then "<backend>", then the
+    default. Every queued call carries a deadline; one that cannot get a slot
+    before it raises QueueTimeoutError instead of waiting forever. The same
+    deadline bounds the call itself (`call_timeout` when there is none).
+    """
+
+    def __init__(
+        self,
+        default_limit: int = 4,
+        limits: Optional[Dict[str, int]] = None,
+        queue_timeout: Optional[float] = None,
+        call_timeout: Optional[float] = None,
+    ) -> None:
+        self._default_limit = default_limit
+        self._limits = limits or {}
+        self._queue_timeout = queue_timeout
+        self._call_timeout = call_timeout
+        self._lanes: Dict[Tuple[str, str], _Lane] = {}
+
+    def _lane(self, backend: str, model: str) -> _Lane:
+        key = (backend, model)
+        lane = self._lanes.get(key)
+        if lane is None:
+            limit = self._limits.get(
+                f"{backend}:{model}", self._limits.get(backend, self._default_limit)
+            )
+            lane = self._lanes[key] = _Lane(limit)
+        return lane
+
+    @asynccontextmanager
+    async def slot(
+        self,
+        backend: str,
+        model: str,
+        priority: Priority = Priority.DEFAULT,
+        deadline: Optional[float] = None,
+    ) -> AsyncIterator[None]:
+        """
+        Hold one concurrency slot of the (backend, model) lane. `deadline` is an
+        absolute `time.monotonic()` value; it defaults to now + queue_timeout.
+
+        Calls cancelled while queued or running (e.g. because the client went
+        away) are counted per lane together with the model time they saved.
+        """
+        if deadline is None and self._queue_timeout is not None:
+            deadline = time.monotonic() + self._queue_timeout
+        lane = self._lane(backend, model)
+        try:
+            await lane.acquire(priority, deadline)
+        except asyncio.CancelledError:
+            lane.record_cancel(None)
+            raise
+        started = time.monotonic()
+        try:
+            yield
+        except (asyncio.CancelledError, GeneratorExit):
+            lane.record_cancel(time.monotonic() - started)
+            raise
+        else:
+            lane.record_call(time.monotonic() - started)
+        finally:
+            lane.release()
+
+    def call_timeout(self, deadline: Optional[float] = None) -> Optional[float]:
+        """
+        How long a call that starts now may run: until `deadline` if given,
+        otherwise `call_timeout`.
+        """
+        return self._call_timeout if deadline is None else remaining(deadline)
+
+    def cancellation_stats(self) -> Dict[str, Any]:
+        """
+        Cancelled model calls and the model time saved, over all lanes.
+        """
+        lanes = self._lanes.values()
+        return {
+            "cancelled": sum(lane.cancelled for lane in lanes),
+            "cancelled_queued": sum(lane.cancelled_queued for lane in lanes),
+            "cancelled_model_seconds": round(sum(lane.cancelled_seconds for lane in lanes), 3),
+            "saved_model_seconds": round(sum(lane.saved_seconds for lane in lanes), 3),
+        }
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            f"{backend}:{model}": lane.stats()
+            for (backend, model), lane in self._lanes.items()
+        }
+
+
+class ScheduledProvider(Provider):
+    """
+    Provider decorator that runs each call inside a scheduler slot.
+    """
+
+    def __init__(
+        self,
+        provider: Provider,
+        scheduler: ProviderScheduler,
+        backend: str,
+        priority: Priority = Priority.DEFAULT,
+        deadline: Optional[float] = None,
+    ) -> None:
+        self._provider = provider
+        self._scheduler = scheduler
+        self._backend = backend
+        self._priority = priority
+        self._deadline = deadline
+        self.model = provider.model
+
+    def timeout(self) -> Optional[float]:
+        return self._scheduler.call_timeout(self._deadline)
+
+    async def __call__(self, prompt: str, **generation_args: Any) -> str:
+        async with self._scheduler.slot(
+            self._backend, self.model, self._priority, self._deadline
+        ):
+            return await within(self._provider(prompt, **generation_args), self.timeout())
+
+    async def stream(self, prompt: str, **generation_args: Any) -> AsyncIterator[str]:
+        async with self._scheduler.slot(
+            self._backend, self.model, self._priority, self._deadline
+        ):
+            timeout = self.timeout()
+            deadline = None if timeout is None else time.monotonic() + timeout
+            deltas = self._provider.stream(prompt, **generation_args).__aiter__()
+            try:
+                while True:
+                    try:
+                        delta = await within(deltas.__anext__(), remaining(deadline))
+                    except StopAsyncIteration:
+                        return
+                    yield delta
+            finally:
+                await deltas.aclose()
+
+
+class ScheduledEmbeddingProvider(EmbeddingProvider):
+    """
+    Embedding provider decorator that runs each call inside a scheduler slot.
+    """
+
+    def __init__(
+        self,
+        provider: EmbeddingProvider,
+        scheduler: ProviderScheduler,
+        backend: str,
+        priority: Priority = Priority.DEFAULT,
+        deadline: Optional[float] = None,
+    ) -> None:
+        self._provider = provider
+        self._scheduler = scheduler
+        self._backend = backend
+        self._priority = priority
+        self._deadline = deadline
+        self.model = provider.model
+
+    def timeout(self) -> Optional[float]:
+        return self._scheduler.call_timeout(self._deadline)
+
+    async def embed(self, text: str) -> List[float]:
+        async with self._scheduler.slot(
+            self._backend, self.model, self._priority, self._deadline
+        ):
+            return await within(self._provider.embed(text), self.timeout())
+
+    async def embed_many(self, texts: List[str]) -> List[List[float]]:
+        async with self._scheduler.slot(
+            self._backend, self.model, self._priority, self._deadline
+        ):
+            return await within(self._provider.embed_many(texts), self.timeout())
+
+
+provider_scheduler = ProviderScheduler(
+    default_limit=settings.PROVIDER_CONCURRENCY_DEFAULT,
+    limits=settings.PROVIDER_CONCURRENCY_LIMITS,
+    queue_timeout=settings.PROVIDER_QUEUE_TIMEOUT,
+    call_timeout=settings.PROVIDER_CALL_TIMEOUT,
+)
@@ -0,0 +1,72 @@
+import asyncio
+import logging
+
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional, TypeVar
+
+from .scheduler import within
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+class _Call:
+    __slots__ = ("task", "waiters")
+
+    def __init__(self, task: asyncio.Task) -> None:
+        self.task = task
+        self.waiters = 0
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent calls that share a key into one underlying call.
+
+    The first caller starts the work as a task; later callers with the same key
+    await that same task. Each waiter waits at most its own `timeout` (then
+    DeadlineExceededError is raised). A waiter that is cancelled or times out
+    only stops waiting - the shared task keeps running for the others - and
+    the task is cancelled once its last waiter has gone away.
+    """
+
+    def __init__(self, name: str = "") -> None:
+        self.name = name
+        self._calls: Dict[Hashable, _Call] = {}
+        self.started = 0
+        self.coalesced = 0
+        self.abandoned = 0
+
+    async def do(
+        self,
+        key: Hashable,
+        factory: Callable[[], Awaitable[T]],
+        timeout: Optional[float] = None,
+    ) -> T:
+        call = self._calls.get(key)
+        if call is None:
+            call = _Call(asyncio.ensure_future(factory()))
+            self._calls[key] = call
+            self.started += 1
+        else:
+            self.coalesced += 1
+            logger.debug(f"single-flight {self.name}: joined in-flight call")
+
+        call.waiters += 1
+        try:
+            return await within(asyncio.shield(call.task), timeout)
+        finally:
+            call.waiters -= 1
+            if call.task.done() or call.waiters == 0:
+                if self._calls.get(key) is call:
+                    del self._calls[key]
+            if call.waiters == 0 and not call.task.done():
+                self.abandoned += 1
+                call.task.cancel()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "in_flight": len(self._calls),
+            "started": self.started,
+            "coalesced": self.coalesced,
+            "abandoned": self.abandoned,
+        }
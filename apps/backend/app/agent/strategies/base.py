@@ -1,10 +1,61 @@
 from abc import ABC, abstractmethod
-from typing import Any, Dict
+from typing import Any, Awaitable, Callable, Dict, Optional
 
+from ..cache import ResponseCache
 from ..providers.base import Provider
 
+# Receives each text delta of a streamed generation.
+DeltaCallback = Callable[[str], Awaitable[None]]
+
+# Generation args that steer routing/caching rather than the model output.
+_CONTROL_ARGS = {"task", "model", "openai_api_key", "priority", "deadline"}
+
 
 class Strategy(ABC):
+    def __init__(self, cache: Optional[ResponseCache] = None) -> None:
+        self.cache = cache
+
+    def _cache_key(
+        self, prompt: str, provider: Provider, generation_args: Dict[str, Any]
+    ) -> Optional[str]:
+        """
+        Key for the response cache, or None when this call must bypass it.
+        """
+        if self.cache is None or not self.cache.allows(
+            generation_args.get("task"), generation_args
+        ):
+            return None
+        args = {k: v for k, v in generation_args.items() if k not in _CONTROL_ARGS}
+        return self.cache.key(
+            type(self).__name__, provider.model, prompt, args
+        )
+
+    async def _generate(
+        self, prompt: str, provider: Provider, cache_key: Optional[str], **generation_args: Any
+    ) -> tuple[str, bool]:
+        """
+        Return (response, cached), serving it from the response cache when possible.
+        """
+        if cache_key is not None:
+            cached = await self.cache.get(cache_key)
+            if cached is not None:
+                return cached, True
+        return await provider(prompt, **generation_args), False
+
+    async def stream(
+        self,
+        prompt: str,
+        provider: Provider,
+        on_delta: DeltaCallback,
+        **generation_args: Any,
+    ) -> Any:
+        """
+        Like `__call__`, but hands the raw output to `on_delta` as it is
+        generated. Strategies that can only act on the complete output (e.g.
+        JSON parsing) do not stream and just return the `__call__` result.
+        """
+        return await self(prompt, provider, **generation_args)
+
     @abstractmethod
     async def __call__(
         self, prompt: str, provider: Provider, **generation_args: Any
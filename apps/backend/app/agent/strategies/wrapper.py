@@ -2,7 +2,7 @@ import json
 import logging
 from typing import Any, Dict
 
-from .base import Strategy
+from .base import Strategy, DeltaCallback
 from ..providers.base import Provider
 from ..exceptions import StrategyError
 
@@ -16,17 +16,22 @@ class JSONWrapper(Strategy):
     ) -> Dict[str, Any]:
         """
         Wrapper strategy to format the prompt as JSON with the help of LLM.
+        Successfully parsed responses of cacheable tasks are stored in the response cache.
         """
-        response = await provider(prompt, **generation_args)
-        response = response.replace("```", "").replace("json", "").strip()
-        logger.info(f"provider response: {response}")
+        cache_key = self._cache_key(prompt, provider, generation_args)
+        raw, cached = await self._generate(prompt, provider, cache_key, **generation_args)
+        response = raw.replace("```", "").replace("json", "").strip()
+        logger.info(f"provider response (cached={cached}): {response}")
         try:
-            return json.loads(response)
+            parsed = json.loads(response)
         except json.JSONDecodeError as e:
             logger.error(
                 f"provider returned non-JSON. parsing error: {e} - response: {response}"
             )
             raise StrategyError(f"JSON parsing error: {e}") from e
+        if cache_key is not None and not cached:
+            await self.cache.put(cache_key, raw)
+        return parsed
 
 
 class MDWrapper(Strategy):
@@ -37,8 +42,45 @@ class MDWrapper(Strategy):
         Wrapper strategy to format the prompt as Markdown with the help of LLM.
         """
         logger.info(f"prompt given to provider: \n{prompt}")
-        response = await provider(prompt, **generation_args)
-        logger.info(f"provider response: {response}")
+        cache_key = self._cache_key(prompt, provider, generation_args)
+        response, cached = await self._generate(prompt, provider, cache_key, **generation_args)
+        logger.info(f"provider response (cached={cached}): {response}")
+        if cache_key is not None and not cached:
+            await self.cache.put(cache_key, response)
+        return self._fence(response)
+
+    async def stream(
+        self,
+        prompt: str,
+        provider: Provider,
+        on_delta: DeltaCallback,
+        **generation_args: Any,
+    ) -> str:
+        """
+        Forward the provider's Markdown deltas to `on_delta` as they arrive and
+        return the complete, fenced response. A cached response is forwarded
+        as a single delta.
+        """
+        logger.info(f"prompt given to provider (streaming): \n{prompt}")
+        cache_key = self._cache_key(prompt, provider, generation_args)
+        if cache_key is not None:
+            cached = await self.cache.get(cache_key)
+            if cached is not None:
+                await on_delta(cached)
+                return self._fence(cached)
+
+        parts = []
+        async for delta in provider.stream(prompt, **generation_args):
+            parts.append(delta)
+            await on_delta(delta)
+        response = "".join(parts).strip()
+        logger.info(f"provider response (streamed): {response}")
+        if cache_key is not None:
+            await self.cache.put(cache_key, response)
+        return self._fence(response)
+
+    @staticmethod
+    def _fence(response: str) -> str:
         try:
             response = (
                 "```md\n" + response + "```" if "```md" not in response else response
@@ -1,17 +1,28 @@
 from uuid import uuid4
 from starlette.requests import Request
-from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.types import ASGIApp, Receive, Scope, Send
 
 
-class RequestIDMiddleware(BaseHTTPMiddleware):
-    async def dispatch(self, request: Request, call_next):
-        path_parts = request.url.path.strip("/").split("/")
+class RequestIDMiddleware:
+    """
+    Tags every HTTP request with a `request.state.request_id`.
 
-        # Safely grab the 3rd part: /api/v1/<service>
-        service_tag = f"{path_parts[2]}:" if len(path_parts) > 2 else ""
+    Written as plain ASGI middleware rather than a BaseHTTPMiddleware, which
+    hides the client's `http.disconnect` from the route and so would keep
+    `request.is_disconnected()` from ever seeing an aborted request.
+    """
 
-        request_id = f"{service_tag}{uuid4()}"
-        request.state.request_id = request_id
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
 
-        response = await call_next(request)
-        return response
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] == "http":
+            request = Request(scope)
+            path_parts = request.url.path.strip("/").split("/")
+
+            # Safely grab the 3rd part: /api/v1/<service>
+            service_tag = f"{path_parts[2]}:" if len(path_parts) > 2 else ""
+
+            request.state.request_id = f"{service_tag}{uuid4()}"
+
+        await self.app(scope, receive, send)
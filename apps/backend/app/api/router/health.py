@@ -3,6 +3,8 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from fastapi import APIRouter, status, Depends
 
 from app.core import get_db_session
+from app.agent import agent_metrics
+from app.services import analysis_queue, document_index, domain_classifier
 
 health_check = APIRouter()
 
@@ -20,3 +22,18 @@ async def ping(db: AsyncSession = Depends(get_db_session)):
         logging.error("Database health check failed", exc_info=True)
         db_status = "unreachable"
     return {"message": "pong", "database": db_status}
+
+
+@health_check.get("/metrics", tags=["Health check"], status_code=status.HTTP_200_OK)
+async def metrics():
+    """
+    model-call metrics: provider pool, scheduler queues, single-flight and caches,
+    plus the analysis task queue, the retrieval index and the compatibility
+    pre-classifier
+    """
+    return {
+        "agent": agent_metrics(),
+        "analysis_queue": analysis_queue.stats(),
+        "document_index": document_index.stats(),
+        "compatibility_preclassifier": domain_classifier.stats(),
+    }
@@ -2,10 +2,14 @@ from fastapi import APIRouter
 
 from .job import job_router
 from .resume import resume_router
+from .match import match_router
+from .score import score_router
 
 v1_router = APIRouter(prefix="/api/v1", tags=["v1"])
 v1_router.include_router(resume_router, prefix="/resumes")
 v1_router.include_router(job_router, prefix="/jobs")
+v1_router.include_router(score_router, prefix="/scores")
+v1_router.include_router(match_router, prefix="/matches")
 
 
 __all__ = ["v1_router"]
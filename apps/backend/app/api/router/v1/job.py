@@ -3,11 +3,11 @@ import traceback
 
 from uuid import uuid4
 from sqlalchemy.ext.asyncio import AsyncSession
-from fastapi import APIRouter, HTTPException, Depends, Request, status, Query
+from fastapi import APIRouter, BackgroundTasks, HTTPException, Depends, Request, status, Query
 from fastapi.responses import JSONResponse
 
 from app.core import get_db_session
-from app.services import JobService, JobNotFoundError
+from app.services import JobService, JobNotFoundError, document_index
 from app.schemas.pydantic.job import JobUploadRequest
 
 job_router = APIRouter()
@@ -21,6 +21,7 @@ logger = logging.getLogger(__name__)
 async def upload_job(
     payload: JobUploadRequest,
     request: Request,
+    background_tasks: BackgroundTasks,
     db: AsyncSession = Depends(get_db_session),
 ):
     """
@@ -61,6 +62,8 @@ async def upload_job(
             detail=f"{str(e)}",
         )
 
+    background_tasks.add_task(document_index.index_new, "job", job_ids)
+
     return {
         "message": "data successfully processed",
         "job_id": job_ids,
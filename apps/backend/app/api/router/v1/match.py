@@ -0,0 +1,117 @@
+import logging
+import traceback
+
+from uuid import uuid4
+from sqlalchemy.ext.asyncio import AsyncSession
+from fastapi import APIRouter, HTTPException, Depends, Request, status, Query
+from fastapi.responses import JSONResponse
+
+from app.core import get_db_session
+from app.services import document_index
+
+match_router = APIRouter()
+logger = logging.getLogger(__name__)
+
+
+async def _top_k(
+    request: Request,
+    db: AsyncSession,
+    doc_type: str,
+    doc_id: str,
+    target_type: str,
+    k: int,
+    exact: bool,
+) -> JSONResponse:
+    request_id = getattr(request.state, "request_id", str(uuid4()))
+    headers = {"X-Request-ID": request_id}
+
+    try:
+        matches = await document_index.top_k(
+            db, doc_type, doc_id, target_type, k=k, exact=exact
+        )
+    except Exception as e:
+        logger.error(f"Error retrieving matches: {str(e)} - traceback: {traceback.format_exc()}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="sorry, something went wrong!",
+        )
+    if matches is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"{doc_type.capitalize()} with id {doc_id} not found",
+        )
+
+    return JSONResponse(
+        content={
+            "request_id": request_id,
+            "data": {f"{doc_type}_id": doc_id, "matches": matches},
+        },
+        headers=headers,
+    )
+
+
+@match_router.get(
+    "/jobs",
+    summary="The stored jobs most similar to a resume",
+)
+async def top_jobs_for_resume(
+    request: Request,
+    resume_id: str = Query(..., description="Resume ID to find jobs for"),
+    k: int = Query(10, ge=1, le=100, description="Number of jobs to return"),
+    exact: bool = Query(False, description="Force an exact (non-approximate) search"),
+    db: AsyncSession = Depends(get_db_session),
+):
+    """
+    Returns the top-k jobs by embedding similarity to the resume, best first.
+    """
+    return await _top_k(request, db, "resume", resume_id, "job", k, exact)
+
+
+@match_router.get(
+    "/resumes",
+    summary="The stored resumes most similar to a job",
+)
+async def top_resumes_for_job(
+    request: Request,
+    job_id: str = Query(..., description="Job ID to find resumes for"),
+    k: int = Query(10, ge=1, le=100, description="Number of resumes to return"),
+    exact: bool = Query(False, description="Force an exact (non-approximate) search"),
+    db: AsyncSession = Depends(get_db_session),
+):
+    """
+    Returns the top-k resumes by embedding similarity to the job, best first.
+    """
+    return await _top_k(request, db, "job", job_id, "resume", k, exact)
+
+
+@match_router.post(
+    "/rebuild",
+    summary="Rebuild the retrieval index from the stored embeddings",
+)
+async def rebuild_index(
+    request: Request,
+    db: AsyncSession = Depends(get_db_session),
+):
+    """
+    Embeds every missing or stale resume and job, reloads the index and
+    retrains its approximate mode.
+    """
+    request_id = getattr(request.state, "request_id", str(uuid4()))
+    headers = {"X-Request-ID": request_id}
+
+    try:
+        stats = await document_index.rebuild(db)
+    except Exception as e:
+        logger.error(f"Error rebuilding the index: {str(e)} - traceback: {traceback.format_exc()}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="sorry, something went wrong!",
+        )
+
+    return JSONResponse(
+        content={
+            "request_id": request_id,
+            "data": stats,
+        },
+        headers=headers,
+    )
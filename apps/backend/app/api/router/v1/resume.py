@@ -1,26 +1,34 @@
+import time
+import asyncio
 import logging
 import traceback
 from io import BytesIO
 
 from uuid import uuid4
+from typing import Any, Awaitable, Optional
 from sqlalchemy.ext.asyncio import AsyncSession
-from fastapi.responses import JSONResponse, StreamingResponse
+from fastapi.responses import JSONResponse, Response, StreamingResponse
 from fastapi import (
     APIRouter,
+    BackgroundTasks,
     File,
     UploadFile,
     HTTPException,
     Depends,
+    Header,
     Request,
     status,
     Query,
 )
 
-from app.core import get_db_session
+from app.core import get_db_session, settings
+from app.agent import DeadlineExceededError
 from app.services import (
     ResumeService,
     ScoreImprovementService,
     PDFService,
+    analysis_queue,
+    document_index,
     ResumeNotFoundError,
     ResumeParsingError,
     JobNotFoundError,
@@ -30,6 +38,46 @@ from app.schemas.pydantic import ResumeImprovementRequest
 resume_router = APIRouter()
 logger = logging.getLogger(__name__)
 
+# nginx's "client closed request"; never seen by the client, only in access logs.
+CLIENT_CLOSED_REQUEST = 499
+
+RequestTimeout = Header(
+    None,
+    alias="X-Request-Timeout",
+    gt=0,
+    description="Time budget of the request in seconds; the result is marked partial when it runs out",
+)
+
+
+def _request_deadline(timeout: Optional[float]) -> float:
+    """
+    Absolute deadline of an analysis request: `timeout` seconds from now, or
+    REQUEST_TIMEOUT_DEFAULT, and never more than REQUEST_TIMEOUT_MAX.
+    """
+    if timeout is None:
+        timeout = settings.REQUEST_TIMEOUT_DEFAULT
+    return time.monotonic() + min(timeout, settings.REQUEST_TIMEOUT_MAX)
+
+
+async def _unless_disconnected(request: Request, work: Awaitable[Any]) -> Optional[Any]:
+    """
+    Awaits `work`, cancelling it - and with it every model call it has in
+    flight - as soon as the client disconnects. Returns None in that case.
+    """
+    task = asyncio.ensure_future(work)
+    try:
+        while True:
+            done, _ = await asyncio.wait({task}, timeout=settings.DISCONNECT_POLL_INTERVAL)
+            if done:
+                return task.result()
+            if await request.is_disconnected():
+                logger.info(f"client disconnected, cancelling {request.url.path}")
+                return None
+    finally:
+        if not task.done():
+            task.cancel()
+            await asyncio.gather(task, return_exceptions=True)
+
 
 @resume_router.post(
     "/upload",
@@ -37,6 +85,7 @@ logger = logging.getLogger(__name__)
 )
 async def upload_resume(
     request: Request,
+    background_tasks: BackgroundTasks,
     file: UploadFile = File(...),
     db: AsyncSession = Depends(get_db_session),
 ):
@@ -83,6 +132,8 @@ async def upload_resume(
             detail=f"Error processing file: {str(e)}",
         )
 
+    background_tasks.add_task(document_index.index_new, "resume", [resume_id])
+
     return {
         "message": f"File {file.filename} successfully processed as MD and stored in the DB",
         "request_id": request_id,
@@ -101,15 +152,23 @@ async def score_and_improve(
     stream: bool = Query(
         False, description="Enable streaming response using Server-Sent Events"
     ),
+    timeout: Optional[float] = RequestTimeout,
 ):
     """
     Scores and improves a resume against a job description.
 
+    The analysis gets `X-Request-Timeout` seconds (REQUEST_TIMEOUT_DEFAULT
+    without the header). When they run out, the best result so far is
+    returned with `partial: true`; at worst that is the original resume and
+    its score.
+
     Raises:
-        HTTPException: If the resume or job is not found.
+        HTTPException: If the resume or job is not found, or 504 if the time
+            ran out before the original resume could be scored.
     """
     request_id = getattr(request.state, "request_id", str(uuid4()))
     headers = {"X-Request-ID": request_id}
+    deadline = _request_deadline(timeout)
 
     request_payload = payload.model_dump()
 
@@ -125,7 +184,9 @@ async def score_and_improve(
                 message="invalid value passed in `job_id` field, please try again with valid job_id."
             )
         language = str(request_payload.get("language", "en"))
-        score_improvement_service = ScoreImprovementService(db=db, language=language)
+        score_improvement_service = ScoreImprovementService(
+            db=db, language=language, deadline=deadline
+        )
 
         if stream:
             return StreamingResponse(
@@ -137,10 +198,15 @@ async def score_and_improve(
                 headers=headers,
             )
         else:
-            improvements = await score_improvement_service.run(
-                resume_id=resume_id,
-                job_id=job_id,
+            improvements = await _unless_disconnected(
+                request,
+                score_improvement_service.run(
+                    resume_id=resume_id,
+                    job_id=job_id,
+                ),
             )
+            if improvements is None:
+                return Response(status_code=CLIENT_CLOSED_REQUEST, headers=headers)
             return JSONResponse(
                 content={
                     "request_id": request_id,
@@ -166,6 +232,13 @@ async def score_and_improve(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=str(e),
         )
+    except DeadlineExceededError as e:
+        # Out of time before the original resume was scored: nothing to return.
+        logger.warning(f"Analysis of {resume_id}/{job_id} ran out of time: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_504_GATEWAY_TIMEOUT,
+            detail="The analysis ran out of its time budget (X-Request-Timeout) before the resume could be scored",
+        )
     except Exception as e:
         logger.error(f"Error: {str(e)} - traceback: {traceback.format_exc()}")
         raise HTTPException(
@@ -174,6 +247,74 @@ async def score_and_improve(
         )
 
 
+@resume_router.post(
+    "/improve/tasks",
+    summary="Queue a score-and-improve run and return its task id",
+    status_code=status.HTTP_202_ACCEPTED,
+)
+async def submit_improvement_task(
+    request: Request,
+    payload: ResumeImprovementRequest,
+):
+    """
+    Queues the same work as `/improve` on the background analysis workers and
+    returns immediately. Poll `/improve/tasks/{task_id}` for progress and the result.
+    """
+    request_id = getattr(request.state, "request_id", str(uuid4()))
+    headers = {"X-Request-ID": request_id}
+
+    try:
+        task = await analysis_queue.submit(
+            resume_id=str(payload.resume_id),
+            job_id=str(payload.job_id),
+            language=str(payload.language or "en"),
+        )
+        return JSONResponse(
+            status_code=status.HTTP_202_ACCEPTED,
+            content={
+                "request_id": request_id,
+                "data": task,
+            },
+            headers=headers,
+        )
+    except Exception as e:
+        logger.error(f"Error queueing analysis: {str(e)} - traceback: {traceback.format_exc()}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="sorry, something went wrong!",
+        )
+
+
+@resume_router.get(
+    "/improve/tasks/{task_id}",
+    summary="Get the state, progress and result of a queued score-and-improve run",
+)
+async def get_improvement_task(request: Request, task_id: str):
+    """
+    Returns the task's status (queued, running, succeeded, failed), attempts,
+    progress events and, once it succeeded, the same data `/improve` returns.
+
+    Raises:
+        HTTPException: If the task does not exist.
+    """
+    request_id = getattr(request.state, "request_id", str(uuid4()))
+    headers = {"X-Request-ID": request_id}
+
+    task = await analysis_queue.get(task_id)
+    if task is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Analysis task with id {task_id} not found",
+        )
+    return JSONResponse(
+        content={
+            "request_id": request_id,
+            "data": task,
+        },
+        headers=headers,
+    )
+
+
 @resume_router.get(
     "",
     summary="Get resume data from both resume and processed_resume models",
@@ -245,6 +386,7 @@ async def download_resume_pdf(
     request: Request,
     payload: ResumeImprovementRequest,
     db: AsyncSession = Depends(get_db_session),
+    timeout: Optional[float] = RequestTimeout,
 ):
     """
     Generates and returns a PDF version of the optimized resume.
@@ -259,6 +401,7 @@ async def download_resume_pdf(
         HTTPException: If resume generation or PDF creation fails
     """
     request_id = getattr(request.state, "request_id", str(uuid4()))
+    deadline = _request_deadline(timeout)
     
     try:
         request_payload = payload.model_dump()
@@ -275,12 +418,20 @@ async def download_resume_pdf(
                 message="invalid value passed in `job_id` field, please try again with valid job_id."
             )
             
-        # Generate the improved resume data
-        score_improvement_service = ScoreImprovementService(db=db, language=language)
-        improved_data = await score_improvement_service.run(
+        # Reuse the result the user just previewed; only run the pipeline
+        # when this resume/job pair has not been improved yet.
+        score_improvement_service = ScoreImprovementService(
+            db=db, language=language, deadline=deadline
+        )
+        improved_data = await score_improvement_service.get_match_result(
             resume_id=resume_id,
             job_id=job_id,
         )
+        if improved_data is None:
+            improved_data = await score_improvement_service.run(
+                resume_id=resume_id,
+                job_id=job_id,
+            )
         
         # Generate PDF
         pdf_service = PDFService()
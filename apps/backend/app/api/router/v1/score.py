@@ -0,0 +1,108 @@
+import logging
+import traceback
+
+from uuid import uuid4
+from sqlalchemy.ext.asyncio import AsyncSession
+from fastapi import APIRouter, HTTPException, Depends, Request, status, Query
+from fastapi.responses import JSONResponse
+
+from app.core import get_db_session
+from app.agent import Priority
+from app.services import BatchScoringService
+from app.schemas.pydantic import BatchScoreRequest
+
+score_router = APIRouter()
+logger = logging.getLogger(__name__)
+
+
+@score_router.post(
+    "/batch",
+    summary="Score many resumes against many jobs and return the ranked pairs",
+)
+async def batch_score(
+    request: Request,
+    payload: BatchScoreRequest,
+    db: AsyncSession = Depends(get_db_session),
+):
+    """
+    Scores every (resume, job) pair by embedding similarity, without LLM
+    rewriting, and returns one page of the pairs ranked best first.
+    """
+    request_id = getattr(request.state, "request_id", str(uuid4()))
+    headers = {"X-Request-ID": request_id}
+
+    try:
+        batch_scoring_service = BatchScoringService(db=db)
+        scores = await batch_scoring_service.score(
+            resume_ids=[str(resume_id) for resume_id in payload.resume_ids],
+            job_ids=[str(job_id) for job_id in payload.job_ids],
+            page=payload.page,
+            page_size=payload.page_size,
+            min_score=payload.min_score,
+        )
+    except Exception as e:
+        logger.error(f"Error batch scoring: {str(e)} - traceback: {traceback.format_exc()}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="sorry, something went wrong!",
+        )
+
+    return JSONResponse(
+        content={
+            "request_id": request_id,
+            "data": scores,
+        },
+        headers=headers,
+    )
+
+
+@score_router.get(
+    "/pair",
+    summary="Score a resume against a job without the LLM improvement",
+)
+async def score_pair(
+    request: Request,
+    resume_id: str = Query(..., description="Resume ID to score"),
+    job_id: str = Query(..., description="Job ID to score the resume against"),
+    include_compatibility: bool = Query(
+        False,
+        description="Add the cached compatibility verdict (LLM or local), if there is one",
+    ),
+    language: str = Query("en", description="Language of the compatibility verdict"),
+    db: AsyncSession = Depends(get_db_session),
+):
+    """
+    The pair's embedding similarity and keyword coverage, in milliseconds:
+    no LLM call is made, and embeddings come from the embedding cache or
+    one batched call.
+    """
+    request_id = getattr(request.state, "request_id", str(uuid4()))
+    headers = {"X-Request-ID": request_id}
+
+    try:
+        batch_scoring_service = BatchScoringService(db=db, priority=Priority.INTERACTIVE)
+        score = await batch_scoring_service.score_pair(
+            resume_id=resume_id,
+            job_id=job_id,
+            include_compatibility=include_compatibility,
+            language=language,
+        )
+    except Exception as e:
+        logger.error(f"Error scoring pair: {str(e)} - traceback: {traceback.format_exc()}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="sorry, something went wrong!",
+        )
+    if score is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Resume {resume_id} or job {job_id} not found",
+        )
+
+    return JSONResponse(
+        content={
+            "request_id": request_id,
+            "data": score,
+        },
+        headers=headers,
+    )
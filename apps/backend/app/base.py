@@ -17,13 +17,21 @@ from .core import (
     unhandled_exception_handler,
 )
 from .models import Base
+from .services import analysis_queue
+from .agent import provider_pool, embedding_cache, response_cache, compatibility_cache
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     async with async_engine.begin() as conn:
         await conn.run_sync(Base.metadata.create_all)
+    await analysis_queue.start()
     yield
+    await analysis_queue.stop()
+    await provider_pool.aclose()
+    embedding_cache.close()
+    response_cache.close()
+    compatibility_cache.close()
     await async_engine.dispose()
 
 
@@ -2,7 +2,7 @@ import os
 import sys
 import logging
 from pydantic_settings import BaseSettings, SettingsConfigDict
-from typing import List, Optional, Literal
+from typing import Dict, List, Optional, Literal
 
 
 class Settings(BaseSettings):
@@ -15,6 +15,57 @@ class Settings(BaseSettings):
     DB_ECHO: bool = False
     PYTHONDONTWRITEBYTECODE: int = 1
     OPENAI_API_KEY: Optional[str] = None
+    PROVIDER_MODELS_TTL: int = 300
+    OLLAMA_HOSTS: List[str] = []
+    OLLAMA_PROBE_INTERVAL: float = 15.0
+    OLLAMA_FAILURE_THRESHOLD: int = 3
+    OLLAMA_COOLDOWN: float = 30.0
+    PROVIDER_CONCURRENCY_DEFAULT: int = 4
+    PROVIDER_CONCURRENCY_LIMITS: Dict[str, int] = {"openai": 16}
+    PROVIDER_QUEUE_TIMEOUT: float = 300.0
+    PROVIDER_CALL_TIMEOUT: Optional[float] = 600.0
+    EMBEDDING_MICROBATCH: bool = False
+    EMBEDDING_BATCH_MAX_SIZE: int = 32
+    EMBEDDING_BATCH_MAX_WAIT_MS: float = 5.0
+    EMBEDDING_CHUNK_TOKENS: int = 512
+    EMBEDDING_CHUNK_OVERLAP: int = 64
+    EMBEDDING_POOLING: str = "mean"
+    CACHE_DIR: str = os.path.join(os.path.dirname(__file__), os.pardir, os.pardir, ".cache")
+    EMBEDDING_CACHE_ENABLED: bool = True
+    EMBEDDING_CACHE_MEMORY_SIZE: int = 2048
+    EMBEDDING_CACHE_MAX_ENTRIES: int = 100_000
+    RESPONSE_CACHE_ENABLED: bool = True
+    RESPONSE_CACHE_TTL: int = 7 * 24 * 3600
+    RESPONSE_CACHE_MEMORY_SIZE: int = 256
+    RESPONSE_CACHE_MAX_ENTRIES: int = 10_000
+    RESPONSE_CACHE_TASKS: List[str] = [
+        "structured_resume",
+        "structured_job",
+        "resume_preview",
+    ]
+
+    COMPATIBILITY_CACHE_ENABLED: bool = True
+    COMPATIBILITY_CACHE_TTL: int = 30 * 24 * 3600
+    COMPATIBILITY_PRECLASSIFIER_ENABLED: bool = True
+    COMPATIBILITY_PRECLASSIFIER_MARGIN: float = 0.15
+    COMPATIBILITY_PRECLASSIFIER_MIN_HITS: int = 2
+    IMPROVEMENT_CANDIDATES: int = 1
+    IMPROVEMENT_CONCURRENCY: int = 3
+    IMPROVEMENT_TEMPERATURE_MIN: float = 0.3
+    IMPROVEMENT_TEMPERATURE_MAX: float = 0.9
+    IMPROVEMENT_TARGET_SCORE: Optional[float] = None
+
+    VECTOR_INDEX_IVF_THRESHOLD: int = 20_000
+    VECTOR_INDEX_NPROBE: int = 8
+    ANALYSIS_WORKERS: int = 2
+    ANALYSIS_MAX_ATTEMPTS: int = 3
+    ANALYSIS_RETRY_BACKOFF: float = 5.0
+    ANALYSIS_POLL_INTERVAL: float = 2.0
+    STREAM_HEARTBEAT_INTERVAL: float = 15.0
+    DISCONNECT_POLL_INTERVAL: float = 0.5
+    REQUEST_TIMEOUT_DEFAULT: float = 300.0
+    REQUEST_TIMEOUT_MAX: float = 900.0
+    IMPROVEMENT_BUDGET_SHARE: float = 0.8
 
     model_config = SettingsConfigDict(
         env_file=os.path.join(os.path.dirname(__file__), os.pardir, os.pardir, ".env"),
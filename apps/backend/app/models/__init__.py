@@ -2,6 +2,9 @@ from .base import Base
 from .resume import ProcessedResume, Resume
 from .user import User
 from .job import ProcessedJob, Job
+from .match_result import MatchResult
+from .analysis_task import AnalysisTask
+from .document_embedding import DocumentEmbedding
 from .association import job_resume_association
 
 __all__ = [
@@ -11,5 +14,8 @@ __all__ = [
     "ProcessedJob",
     "User",
     "Job",
+    "MatchResult",
+    "AnalysisTask",
+    "DocumentEmbedding",
     "job_resume_association",
 ]
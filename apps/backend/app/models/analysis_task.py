@@ -0,0 +1,38 @@
+from sqlalchemy.types import JSON
+from sqlalchemy import Column, String, Integer, Float, Text, DateTime, text
+
+from .base import Base
+
+
+class AnalysisTask(Base):
+    """
+    A queued score-and-improve run, drained by the analysis worker pool.
+
+    `status` moves queued -> running -> succeeded | failed; a failed attempt
+    with retries left goes back to queued until `available_at`.
+    """
+
+    __tablename__ = "analysis_tasks"
+
+    id = Column(Integer, primary_key=True, index=True)
+    task_id = Column(String, unique=True, nullable=False, index=True)
+    resume_id = Column(String, nullable=False)
+    job_id = Column(String, nullable=False)
+    language = Column(String, nullable=False, default="en")
+    status = Column(String, nullable=False, default="queued", index=True)
+    attempts = Column(Integer, nullable=False, default=0)
+    max_attempts = Column(Integer, nullable=False)
+    progress = Column(Float, nullable=False, default=0.0)
+    stage = Column(String, nullable=True)
+    events = Column(JSON, nullable=True)
+    result = Column(JSON, nullable=True)
+    error = Column(Text, nullable=True)
+    available_at = Column(DateTime(timezone=True), nullable=False)
+    started_at = Column(DateTime(timezone=True), nullable=True)
+    finished_at = Column(DateTime(timezone=True), nullable=True)
+    created_at = Column(
+        DateTime(timezone=True),
+        server_default=text("CURRENT_TIMESTAMP"),
+        nullable=False,
+        index=True,
+    )
@@ -0,0 +1,44 @@
+from sqlalchemy import (
+    Column,
+    String,
+    Integer,
+    LargeBinary,
+    DateTime,
+    UniqueConstraint,
+    text,
+)
+
+from .base import Base
+
+
+class DocumentEmbedding(Base):
+    """
+    L2-normalized float32 embedding of a resume or job, per embedding model.
+    `doc_type` says which text was embedded ("resume": the resume content,
+    "job": the job's keywords, "job_content": the job content) and
+    `content_hash` identifies it, so stale vectors can be detected and
+    re-embedded. `model_version` (e.g. the Ollama model digest) marks
+    vectors of a re-pulled model as stale too.
+    """
+
+    __tablename__ = "document_embeddings"
+    __table_args__ = (
+        UniqueConstraint(
+            "doc_type", "doc_id", "model", name="uq_document_embeddings_doc_model"
+        ),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    doc_type = Column(String, nullable=False, index=True)
+    doc_id = Column(String, nullable=False, index=True)
+    model = Column(String, nullable=False, index=True)
+    model_version = Column(String, nullable=True)
+    dim = Column(Integer, nullable=False)
+    vector = Column(LargeBinary, nullable=False)
+    content_hash = Column(String, nullable=False)
+    created_at = Column(
+        DateTime(timezone=True),
+        server_default=text("CURRENT_TIMESTAMP"),
+        nullable=False,
+        index=True,
+    )
@@ -0,0 +1,59 @@
+from sqlalchemy.types import JSON
+from sqlalchemy import (
+    Column,
+    String,
+    Integer,
+    Float,
+    ForeignKey,
+    Text,
+    DateTime,
+    UniqueConstraint,
+    text,
+)
+
+from .base import Base
+
+
+class MatchResult(Base):
+    """
+    Outcome of one score-and-improve run of a resume against a job, so it can
+    be served again (e.g. as a PDF) without re-running the pipeline.
+    """
+
+    __tablename__ = "match_results"
+    __table_args__ = (
+        UniqueConstraint(
+            "resume_id",
+            "job_id",
+            "language",
+            "pipeline_version",
+            name="uq_match_results_run",
+        ),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    resume_id = Column(
+        String,
+        ForeignKey("resumes.resume_id", ondelete="CASCADE"),
+        nullable=False,
+        index=True,
+    )
+    job_id = Column(
+        String,
+        ForeignKey("jobs.job_id", ondelete="CASCADE"),
+        nullable=False,
+        index=True,
+    )
+    language = Column(String, nullable=False)
+    pipeline_version = Column(String, nullable=False)
+    original_score = Column(Float, nullable=False)
+    new_score = Column(Float, nullable=False)
+    updated_resume = Column(Text, nullable=False)
+    resume_preview = Column(JSON, nullable=True)
+    analysis = Column(JSON, nullable=True)
+    created_at = Column(
+        DateTime(timezone=True),
+        server_default=text("CURRENT_TIMESTAMP"),
+        nullable=False,
+        index=True,
+    )
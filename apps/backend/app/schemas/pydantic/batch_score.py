@@ -0,0 +1,17 @@
+from uuid import UUID
+from typing import List, Optional
+from pydantic import BaseModel, Field
+
+
+class BatchScoreRequest(BaseModel):
+    resume_ids: List[UUID] = Field(
+        ..., min_length=1, max_length=2000, description="Resumes to score"
+    )
+    job_ids: List[UUID] = Field(
+        ..., min_length=1, max_length=2000, description="Jobs to score the resumes against"
+    )
+    page: int = Field(default=1, ge=1, description="1-based page of the ranked pairs")
+    page_size: int = Field(default=50, ge=1, le=1000, description="Pairs per page")
+    min_score: Optional[float] = Field(
+        default=None, description="Drop pairs scoring below this cosine similarity"
+    )
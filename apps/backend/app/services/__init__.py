@@ -2,6 +2,10 @@ from .job_service import JobService
 from .resume_service import ResumeService
 from .score_improvement_service import ScoreImprovementService
 from .pdf_service import PDFService
+from .analysis_queue import AnalysisQueue, analysis_queue
+from .batch_scoring_service import BatchScoringService
+from .document_index import DocumentIndex, document_index
+from .domain_classifier import DomainClassifier, domain_classifier
 from .exceptions import (
     ResumeNotFoundError,
     ResumeParsingError,
@@ -18,4 +22,11 @@ __all__ = [
     "ResumeNotFoundError",
     "ScoreImprovementService",
     "PDFService",
+    "AnalysisQueue",
+    "analysis_queue",
+    "BatchScoringService",
+    "DocumentIndex",
+    "document_index",
+    "DomainClassifier",
+    "domain_classifier",
 ]
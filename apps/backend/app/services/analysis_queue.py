@@ -0,0 +1,296 @@
+import asyncio
+import logging
+import traceback
+
+from uuid import uuid4
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional, Set
+
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.core import settings
+from app.core.database import AsyncSessionLocal
+from app.models import AnalysisTask
+from .score_improvement_service import ScoreImprovementService
+from .exceptions import ResumeNotFoundError, JobNotFoundError
+
+logger = logging.getLogger(__name__)
+
+# Errors that another attempt cannot fix.
+_PERMANENT_ERRORS = (ResumeNotFoundError, JobNotFoundError)
+
+
+def _utcnow() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+class AnalysisQueue:
+    """
+    Durable queue of score-and-improve runs, stored in the `analysis_tasks`
+    table and drained by a pool of in-process workers.
+
+    * `submit` only inserts a row, so the HTTP request returns immediately.
+    * A worker claims a queued task with a conditional UPDATE, so a task is
+      never run twice at once, and runs `ScoreImprovementService.run` in its
+      own DB session, recording every stage event as progress.
+    * Failed attempts are retried with exponential backoff up to
+      `max_attempts`; missing resumes/jobs fail immediately.
+    * On start, tasks left `running` by a previous process are queued again
+      (counting as an attempt); on stop, this process's running tasks are
+      handed back to the queue without using up an attempt.
+    """
+
+    def __init__(
+        self,
+        sessions: async_sessionmaker[AsyncSession],
+        workers: int = 2,
+        max_attempts: int = 3,
+        retry_backoff: float = 5.0,
+        poll_interval: float = 2.0,
+    ) -> None:
+        self._sessions = sessions
+        self._workers = max(1, workers)
+        self._max_attempts = max(1, max_attempts)
+        self._retry_backoff = retry_backoff
+        self._poll_interval = poll_interval
+        self._wakeup = asyncio.Event()
+        self._tasks: List[asyncio.Task] = []
+        self._running: Set[str] = set()
+        self.completed = 0
+        self.failed = 0
+        self.retried = 0
+
+    async def submit(self, resume_id: str, job_id: str, language: str = "en") -> Dict[str, Any]:
+        """
+        Queue a run and return its task record.
+        """
+        task = AnalysisTask(
+            task_id=str(uuid4()),
+            resume_id=resume_id,
+            job_id=job_id,
+            language=language,
+            status="queued",
+            attempts=0,
+            max_attempts=self._max_attempts,
+            progress=0.0,
+            events=[],
+            available_at=_utcnow(),
+        )
+        async with self._sessions() as db:
+            db.add(task)
+            await db.commit()
+        self._wakeup.set()
+        logger.info(f"analysis task {task.task_id} queued for resume {resume_id} / job {job_id}")
+        return self._serialize(task)
+
+    async def get(self, task_id: str) -> Optional[Dict[str, Any]]:
+        async with self._sessions() as db:
+            result = await db.execute(
+                select(AnalysisTask).where(AnalysisTask.task_id == task_id)
+            )
+            task = result.scalars().first()
+        return self._serialize(task) if task else None
+
+    @staticmethod
+    def _serialize(task: AnalysisTask) -> Dict[str, Any]:
+        def iso(value: Optional[datetime]) -> Optional[str]:
+            return value.isoformat() if value else None
+
+        return {
+            "task_id": task.task_id,
+            "resume_id": task.resume_id,
+            "job_id": task.job_id,
+            "language": task.language,
+            "status": task.status,
+            "attempts": task.attempts,
+            "max_attempts": task.max_attempts,
+            "progress": task.progress,
+            "stage": task.stage,
+            "events": task.events or [],
+            "error": task.error,
+            "result": task.result,
+            "created_at": iso(task.created_at),
+            "started_at": iso(task.started_at),
+            "finished_at": iso(task.finished_at),
+        }
+
+    async def _update(self, task_id: str, **values: Any) -> None:
+        async with self._sessions() as db:
+            await db.execute(
+                update(AnalysisTask).where(AnalysisTask.task_id == task_id).values(**values)
+            )
+            await db.commit()
+
+    async def _recover(self) -> None:
+        async with self._sessions() as db:
+            result = await db.execute(
+                select(AnalysisTask).where(AnalysisTask.status == "running")
+            )
+            for task in result.scalars().all():
+                if task.attempts >= task.max_attempts:
+                    task.status = "failed"
+                    task.error = "interrupted by a restart on its last attempt"
+                    task.finished_at = _utcnow()
+                else:
+                    task.status = "queued"
+                    task.available_at = _utcnow()
+                logger.warning(f"analysis task {task.task_id} was interrupted, now {task.status}")
+            await db.commit()
+
+    async def _claim(self) -> Optional[AnalysisTask]:
+        async with self._sessions() as db:
+            result = await db.execute(
+                select(AnalysisTask.task_id)
+                .where(
+                    AnalysisTask.status == "queued",
+                    AnalysisTask.available_at <= _utcnow(),
+                )
+                .order_by(AnalysisTask.id)
+                .limit(self._workers)
+            )
+            for task_id in result.scalars().all():
+                claimed = await db.execute(
+                    update(AnalysisTask)
+                    .where(AnalysisTask.task_id == task_id, AnalysisTask.status == "queued")
+                    .values(
+                        status="running",
+                        attempts=AnalysisTask.attempts + 1,
+                        started_at=_utcnow(),
+                        error=None,
+                    )
+                )
+                await db.commit()
+                if claimed.rowcount == 1:
+                    result = await db.execute(
+                        select(AnalysisTask).where(AnalysisTask.task_id == task_id)
+                    )
+                    return result.scalars().first()
+        return None
+
+    async def _execute(self, task: AnalysisTask) -> None:
+        events: List[Dict[str, Any]] = list(task.events or [])
+        total = 1
+        finished = 0
+
+        async def on_event(stage: str, event: str, outputs: Dict[str, Any]) -> None:
+            nonlocal finished
+            events.append(
+                {
+                    "attempt": task.attempts,
+                    "stage": stage,
+                    "event": event,
+                    "at": _utcnow().isoformat(),
+                }
+            )
+            values: Dict[str, Any] = {"stage": stage, "events": list(events)}
+            if event == "finished":
+                finished += 1
+                values["progress"] = finished / total
+            await self._update(task.task_id, **values)
+
+        try:
+            async with self._sessions() as db:
+                service = ScoreImprovementService(db=db, language=task.language)
+                total = len(service.pipeline_stages())
+                result = await service.run(task.resume_id, task.job_id, on_event=on_event)
+        except Exception as e:
+            logger.error(
+                f"analysis task {task.task_id} attempt {task.attempts} failed: {e} - traceback: {traceback.format_exc()}"
+            )
+            if isinstance(e, _PERMANENT_ERRORS) or task.attempts >= task.max_attempts:
+                self.failed += 1
+                await self._update(
+                    task.task_id, status="failed", error=str(e), finished_at=_utcnow()
+                )
+            else:
+                self.retried += 1
+                delay = self._retry_backoff * 2 ** (task.attempts - 1)
+                await self._update(
+                    task.task_id,
+                    status="queued",
+                    error=str(e),
+                    available_at=_utcnow() + timedelta(seconds=delay),
+                )
+            return
+
+        self.completed += 1
+        await self._update(
+            task.task_id,
+            status="succeeded",
+            progress=1.0,
+            result=result,
+            finished_at=_utcnow(),
+        )
+        logger.info(f"analysis task {task.task_id} succeeded")
+
+    async def _worker(self) -> None:
+        while True:
+            # Cleared before claiming, so a task submitted after the claim
+            # found nothing still wakes this worker up.
+            self._wakeup.clear()
+            try:
+                task = await self._claim()
+            except Exception as e:
+                logger.error(f"analysis queue could not claim a task: {e}")
+                task = None
+            if task is None:
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), self._poll_interval)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+
+            self._running.add(task.task_id)
+            try:
+                await self._execute(task)
+            finally:
+                self._running.discard(task.task_id)
+
+    async def start(self) -> None:
+        if self._tasks:
+            return
+        await self._recover()
+        self._tasks = [asyncio.create_task(self._worker()) for _ in range(self._workers)]
+        logger.info(f"analysis queue started with {self._workers} worker(s)")
+
+    async def stop(self) -> None:
+        running = set(self._running)
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        if running:
+            async with self._sessions() as db:
+                await db.execute(
+                    update(AnalysisTask)
+                    .where(
+                        AnalysisTask.task_id.in_(running),
+                        AnalysisTask.status == "running",
+                    )
+                    .values(
+                        status="queued",
+                        attempts=AnalysisTask.attempts - 1,
+                        available_at=_utcnow(),
+                    )
+                )
+                await db.commit()
+            logger.info(f"analysis queue handed {len(running)} running task(s) back to the queue")
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "workers": len(self._tasks),
+            "running": len(self._running),
+            "completed": self.completed,
+            "failed": self.failed,
+            "retried": self.retried,
+        }
+
+
+analysis_queue = AnalysisQueue(
+    AsyncSessionLocal,
+    workers=settings.ANALYSIS_WORKERS,
+    max_attempts=settings.ANALYSIS_MAX_ATTEMPTS,
+    retry_backoff=settings.ANALYSIS_RETRY_BACKOFF,
+    poll_interval=settings.ANALYSIS_POLL_INTERVAL,
+)
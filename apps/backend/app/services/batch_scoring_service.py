@@ -0,0 +1,151 @@
+import logging
+import numpy as np
+
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Any, Dict, List, Optional
+
+from app.agent import EmbeddingManager, Priority
+from app.models import Resume, Job, ProcessedJob
+from .vector_index import normalize_rows
+from .keyword_matcher import compile_keywords
+from .compatibility_validator import ProfessionalCompatibilityValidator
+from .document_index import document_index
+from . import document_texts
+from .document_texts import fetch_rows, joined_keywords
+
+logger = logging.getLogger(__name__)
+
+
+def cosine_similarity_matrix(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    """
+    Cosine similarity of every row of `a` with every row of `b` (len(a) x len(b)),
+    computed as one matrix multiply of the normalized rows.
+    """
+    return normalize_rows(a) @ normalize_rows(b).T
+
+
+class BatchScoringService:
+    """
+    Scores many resumes against many jobs at once, without any LLM rewriting.
+
+    Like the single-pair pipeline, a resume's content is compared with its
+    job's extracted keywords (or the job content when none were extracted).
+    Stored embeddings (see DocumentIndex) are used where they are current;
+    the remaining texts are embedded in one batched, cache-backed call. The
+    full similarity matrix comes from a single matrix multiply.
+    """
+
+    def __init__(self, db: AsyncSession, priority: Priority = Priority.BULK):
+        self.db = db
+        self.embedding_manager = EmbeddingManager(priority=priority)
+
+    async def score(
+        self,
+        resume_ids: List[str],
+        job_ids: List[str],
+        page: int = 1,
+        page_size: int = 50,
+        min_score: Optional[float] = None,
+    ) -> Dict[str, Any]:
+        """
+        Ranks every (resume, job) pair by cosine similarity and returns one
+        page of the ranking, best first. Unknown ids are reported, not scored.
+        """
+        resume_ids = list(dict.fromkeys(resume_ids))
+        job_ids = list(dict.fromkeys(job_ids))
+        resume_texts = await document_texts.resume_texts(self.db, resume_ids)
+        job_texts = await document_texts.job_texts(self.db, job_ids)
+        found_resumes = [rid for rid in resume_ids if rid in resume_texts]
+        found_jobs = [jid for jid in job_ids if jid in job_texts]
+
+        response: Dict[str, Any] = {
+            "total": 0,
+            "page": page,
+            "page_size": page_size,
+            "results": [],
+            "missing_resume_ids": [rid for rid in resume_ids if rid not in resume_texts],
+            "missing_job_ids": [jid for jid in job_ids if jid not in job_texts],
+        }
+        if not found_resumes or not found_jobs:
+            return response
+
+        matrix = await document_index.embed(
+            self.embedding_manager,
+            [("resume", rid, resume_texts[rid]) for rid in found_resumes]
+            + [("job", jid, job_texts[jid]) for jid in found_jobs],
+        )
+        scores = cosine_similarity_matrix(
+            matrix[: len(found_resumes)], matrix[len(found_resumes) :]
+        ).ravel()
+
+        ranked = np.argsort(-scores, kind="stable")
+        if min_score is not None:
+            ranked = ranked[scores[ranked] >= min_score]
+
+        offset = (page - 1) * page_size
+        window = ranked[offset : offset + page_size]
+        n_jobs = len(found_jobs)
+        response["total"] = int(ranked.size)
+        response["results"] = [
+            {
+                "rank": offset + position + 1,
+                "resume_id": found_resumes[index // n_jobs],
+                "job_id": found_jobs[index % n_jobs],
+                "score": float(scores[index]),
+            }
+            for position, index in enumerate(window.tolist())
+        ]
+        logger.info(
+            f"Batch scored {len(found_resumes)} resumes x {n_jobs} jobs = {scores.size} pairs"
+        )
+        return response
+
+    async def score_pair(
+        self,
+        resume_id: str,
+        job_id: str,
+        include_compatibility: bool = False,
+        language: str = "en",
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Scores one pair without any LLM call: the embedding similarity (from
+        the stored embeddings, or both texts in one cache-backed call) and the
+        resume's coverage of the job's keywords. With `include_compatibility`,
+        the compatibility verdict of an earlier analysis (by the LLM or the
+        local pre-classifier) is added when one is cached; it is never
+        computed here. Returns None if the resume or the job does not exist.
+        """
+        resumes = await fetch_rows(self.db, Resume, Resume.resume_id, [resume_id])
+        jobs = await fetch_rows(self.db, Job, Job.job_id, [job_id])
+        if not resumes or not jobs:
+            return None
+        resume, job = resumes[0], jobs[0]
+        processed = await fetch_rows(self.db, ProcessedJob, ProcessedJob.job_id, [job_id])
+        keywords = joined_keywords(processed[0] if processed else None)
+
+        matrix = await document_index.embed(
+            self.embedding_manager,
+            [("resume", resume_id, resume.content), ("job", job_id, keywords or job.content)],
+        )
+        score = float(cosine_similarity_matrix(matrix[:1], matrix[1:])[0, 0])
+        matcher = compile_keywords(kw.strip() for kw in keywords.split(",") if kw.strip())
+
+        result: Dict[str, Any] = {
+            "resume_id": resume_id,
+            "job_id": job_id,
+            "score": score,
+            "keyword_coverage": matcher.coverage(resume.content),
+        }
+        if include_compatibility:
+            validator = ProfessionalCompatibilityValidator(language=language)
+            verdict = await validator.cached_compatibility(resume.content, job.content)
+            result["compatibility"] = None
+            if verdict is not None:
+                level, multiplier, reasons = verdict
+                result["compatibility"] = {
+                    "level": level,
+                    "multiplier": multiplier,
+                    "reasons": reasons,
+                }
+                result["validated_score"] = score * multiplier
+        return result
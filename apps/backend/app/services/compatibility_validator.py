@@ -1,8 +1,23 @@
+import json
 import logging
 from typing import Dict, List, Tuple, Optional
 import re
 import asyncio
-from app.agent import AgentManager
+from app.agent import (
+    AgentManager,
+    Priority,
+    ResponseCache,
+    compatibility_cache,
+    content_hash,
+    normalize_text,
+)
+from app.core import settings
+from .domain_classifier import (
+    PROFESSIONAL_DOMAINS,
+    DomainClassifier,
+    domain_classifier,
+    has_required_qualifications,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -11,14 +26,114 @@ class ProfessionalCompatibilityValidator:
     """
     Validates professional compatibility between resume and job posting
     to prevent unrealistic score inflations for incompatible career fields.
+    Its LLM calls and the pre-classifier's embeddings are bounded by the
+    request's `deadline`; an LLM call that runs out of time falls back like
+    any other failed analysis.
     """
     
-    def __init__(self, language: str = "en"):
-        self.agent_manager = AgentManager()
+    def __init__(
+        self,
+        language: str = "en",
+        cache: Optional[ResponseCache] = None,
+        classifier: Optional[DomainClassifier] = None,
+        deadline: Optional[float] = None,
+    ):
+        self.agent_manager = AgentManager(priority=Priority.INTERACTIVE, deadline=deadline)
+        self.deadline = deadline
         self.language = language
-    
+        self.professional_domains = PROFESSIONAL_DOMAINS
+        if cache is None and settings.COMPATIBILITY_CACHE_ENABLED:
+            cache = compatibility_cache
+        self.cache = cache
+        if classifier is None and settings.COMPATIBILITY_PRECLASSIFIER_ENABLED:
+            classifier = domain_classifier
+        self.classifier = classifier
+        # Per-instance (i.e. per-request) memo in front of the persistent cache.
+        self._memo: Dict[str, Tuple[str, float, List[str]]] = {}
+
+    async def _key(self, resume_text: str, job_text: str) -> str:
+        model = await self.agent_manager.resolve_model()
+        return ResponseCache.key(
+            "compatibility",
+            content_hash(normalize_text(resume_text)),
+            content_hash(normalize_text(job_text)),
+            self.language,
+            model,
+        )
+
+    async def _cached(self, key: str) -> Optional[Tuple[str, float, List[str]]]:
+        if key in self._memo:
+            return self._memo[key]
+        if self.cache is not None:
+            cached = await self.cache.get(key)
+            if cached is not None:
+                level, multiplier, reasons = json.loads(cached)
+                self._memo[key] = (level, multiplier, reasons)
+                logger.info(f"AI Compatibility Analysis (cached) - Level: {level}, Multiplier: {multiplier}")
+                return self._memo[key]
+        return None
+
+    async def cached_compatibility(
+        self, resume_text: str, job_text: str
+    ) -> Optional[Tuple[str, float, List[str]]]:
+        """
+        The stored analysis of this pair, if an earlier run produced one
+        (from the LLM or the local pre-classifier), or None. Never calls the
+        LLM nor the pre-classifier.
+        """
+        try:
+            return await self._cached(await self._key(resume_text, job_text))
+        except Exception as e:
+            logger.warning(f"Could not look up the cached compatibility analysis: {e}")
+            return None
+
     async def analyze_compatibility_with_ai(self, resume_text: str, job_text: str) -> Tuple[str, float, List[str]]:
-        """Use AI to analyze professional compatibility between resume and job."""
+        """
+        Use AI to analyze professional compatibility between resume and job.
+
+        Clear-cut pairs are decided by the local domain pre-classifier without
+        an LLM call; only ambiguous ones reach the model. Results are memoized
+        per (resume hash, job hash, language, model), first for the lifetime
+        of this validator and then across requests in the persistent
+        compatibility cache. Editing either document changes its hash, so
+        stale analyses are never reused. Local decisions are cached like the
+        model's, so `cached_compatibility` finds them too; fallback results
+        from a failed analysis are not cached.
+        """
+        try:
+            key = await self._key(resume_text, job_text)
+        except Exception as e:
+            logger.error(f"AI compatibility analysis failed: {e}")
+            return "high", 0.95, ["Análise automática não disponível"]
+
+        cached = await self._cached(key)
+        if cached is not None:
+            return cached
+
+        if self.classifier is not None:
+            local = await self.classifier.pre_classify(
+                resume_text, job_text, self.language, deadline=self.deadline
+            )
+            if local is not None:
+                self._memo[key] = local
+                if self.cache is not None:
+                    await self.cache.put(key, json.dumps(local))
+                return local
+
+        try:
+            result = await self._analyze_with_ai(resume_text, job_text)
+        except Exception as e:
+            logger.error(f"AI compatibility analysis failed: {e}")
+            # Fallback to high compatibility (less restrictive)
+            return "high", 0.95, ["Análise automática não disponível"]
+
+        self._memo[key] = result
+        if self.cache is not None:
+            await self.cache.put(key, json.dumps(result))
+        return result
+
+    async def _analyze_with_ai(self, resume_text: str, job_text: str) -> Tuple[str, float, List[str]]:
+        """Run the compatibility prompt through the LLM; raises on failure."""
         
         # Language-specific prompts
         prompts = {
@@ -107,48 +222,31 @@ IMPORTANTE: Medios, Marketing, Ventas, Business Development, Partnerships, Estra
         
         prompt = prompts.get(self.language, prompts["en"])
 
-        try:
-            response = await self.agent_manager.run(prompt)
-            # Parse JSON response
-            import json
-            
-            # Handle both string and dict responses
-            if isinstance(response, dict):
-                result = response
-            else:
-                result = json.loads(response)
-            
-            compatibility_level = result.get("compatibility_level", "moderate")
-            score_multiplier = result.get("score_multiplier", 0.6)
-            reasons = result.get("reasons", [])
-            resume_area = result.get("resume_area", "")
-            job_area = result.get("job_area", "")
-            
-            logger.info(f"AI Compatibility Analysis - Level: {compatibility_level}, Multiplier: {score_multiplier}")
-            logger.info(f"Resume area: {resume_area}, Job area: {job_area}")
-            
-            return compatibility_level, score_multiplier, reasons
-            
-        except Exception as e:
-            logger.error(f"AI compatibility analysis failed: {e}")
-            # Fallback to high compatibility (less restrictive)
-            return "high", 0.95, ["Análise automática não disponível"]
+        response = await self.agent_manager.run(prompt, task="compatibility")
+
+        # Handle both string and dict responses
+        if isinstance(response, dict):
+            result = response
+        else:
+            result = json.loads(response)
+
+        compatibility_level = result.get("compatibility_level", "moderate")
+        score_multiplier = result.get("score_multiplier", 0.6)
+        reasons = result.get("reasons", [])
+        resume_area = result.get("resume_area", "")
+        job_area = result.get("job_area", "")
+
+        logger.info(f"AI Compatibility Analysis - Level: {compatibility_level}, Multiplier: {score_multiplier}")
+        logger.info(f"Resume area: {resume_area}, Job area: {job_area}")
+
+        return compatibility_level, score_multiplier, reasons
     
     def has_required_qualifications(self, resume_text: str, domain: str) -> bool:
         """Check if resume has required qualifications for the domain."""
         if domain not in self.professional_domains:
             return True  # If domain is unknown, assume compatible
-            
-        required_quals = self.professional_domains[domain]["required_qualifications"]
-        if not required_quals:  # No specific requirements
-            return True
-            
-        resume_lower = resume_text.lower()
-        for qual in required_quals:
-            if qual.lower() in resume_lower:
-                return True
-                
-        return False
+
+        return has_required_qualifications(resume_text, domain)
     
     async def calculate_compatibility_score(
         self, 
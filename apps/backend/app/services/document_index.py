@@ -0,0 +1,275 @@
+import asyncio
+import logging
+import numpy as np
+
+from sqlalchemy import select
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from app.core import settings
+from app.core.database import AsyncSessionLocal, init_models
+from app.agent import EmbeddingManager, Priority, content_hash, normalize_text
+from app.models import Base, Resume, Job, DocumentEmbedding
+from .vector_index import VectorIndex, normalize_rows
+from .document_texts import TEXT_LOADERS
+
+logger = logging.getLogger(__name__)
+
+# The stored embedding types (see TEXT_LOADERS) of each uploaded document type.
+INGESTED_TYPES = {"resume": ("resume",), "job": ("job", "job_content")}
+
+# Rows per multi-row upsert, well below SQLite's bound-parameter limit.
+_UPSERT_CHUNK = 100
+
+
+class DocumentIndex:
+    """
+    Stored document embeddings, and top-k retrieval of resumes and jobs by
+    embedding similarity.
+
+    Every resume gets a normalized embedding of its content, and every job
+    one of its extracted keywords and one of its content, per embedding
+    model in `document_embeddings`. They are computed in the background at
+    upload (`index_new`), and `embed` serves them to scoring, which then
+    only embeds texts without a stored vector.
+
+    The rows for the current model and model version are loaded lazily into
+    one `VectorIndex` per embedding type; rows of another version count as
+    missing. Uploads are inserted incrementally; `rebuild` reloads the
+    table, embeds whatever is missing or stale and retrains the approximate
+    (IVF) mode for indexes of at least `ivf_threshold` vectors. Smaller
+    indexes are searched exactly.
+    """
+
+    def __init__(
+        self,
+        sessions: async_sessionmaker[AsyncSession],
+        ivf_threshold: int = 20_000,
+        nprobe: int = 8,
+    ) -> None:
+        self._sessions = sessions
+        self._ivf_threshold = ivf_threshold
+        self._indexes: Dict[str, VectorIndex] = {t: VectorIndex(nprobe) for t in TEXT_LOADERS}
+        self._hashes: Dict[Tuple[str, str], str] = {}
+        self._model: Optional[str] = None
+        self._version: Optional[str] = None
+        self._lock = asyncio.Lock()
+        self._embedding_manager = EmbeddingManager(priority=Priority.BULK)
+        self.stored_hits = 0
+        self.on_demand = 0
+
+    async def _all_ids(self, db: AsyncSession, doc_type: str) -> List[str]:
+        column = Resume.resume_id if doc_type == "resume" else Job.job_id
+        return list((await db.execute(select(column))).scalars().all())
+
+    def _train(self, doc_type: str) -> None:
+        index = self._indexes[doc_type]
+        if len(index) >= self._ivf_threshold:
+            index.train_ivf()
+
+    async def _load(self, db: AsyncSession, model: str, version: Optional[str]) -> None:
+        rows = (
+            await db.execute(
+                select(
+                    DocumentEmbedding.doc_type,
+                    DocumentEmbedding.doc_id,
+                    DocumentEmbedding.vector,
+                    DocumentEmbedding.content_hash,
+                    DocumentEmbedding.model_version,
+                ).where(DocumentEmbedding.model == model)
+            )
+        ).all()
+        outdated = sum(1 for row in rows if row.model_version != version)
+        if outdated:
+            logger.info(f"document index ignoring {outdated} embeddings of another {model} version")
+            rows = [row for row in rows if row.model_version == version]
+        self._hashes = {}
+        for doc_type in self._indexes:
+            typed = [row for row in rows if row.doc_type == doc_type]
+            index = self._indexes[doc_type]
+            index.clear()
+            if typed:
+                index.add(
+                    [row.doc_id for row in typed],
+                    np.stack([np.frombuffer(row.vector, dtype=np.float32) for row in typed]),
+                )
+            self._hashes.update({(doc_type, row.doc_id): row.content_hash for row in typed})
+            self._train(doc_type)
+        logger.info(f"document index loaded {len(rows)} embeddings for model {model}")
+
+    async def ensure_loaded(self) -> str:
+        """
+        Load the stored embeddings of the current embedding model and model
+        version, once.
+        """
+        model = await self._embedding_manager.resolve_model()
+        version = await self._embedding_manager.resolve_version()
+        if (self._model, self._version) != (model, version):
+            async with self._lock:
+                if (self._model, self._version) != (model, version):
+                    async with self._sessions() as db:
+                        await self._load(db, model, version)
+                    self._model, self._version = model, version
+        return model
+
+    async def index(self, db: AsyncSession, doc_type: str, ids: Sequence[str]) -> int:
+        """
+        Embed, store and insert the given documents, skipping the ones whose
+        text has not changed since they were last embedded. Returns the number
+        of documents embedded.
+        """
+        model = await self.ensure_loaded()
+        texts = await TEXT_LOADERS[doc_type](db, list(ids))
+        hashes = {doc_id: content_hash(normalize_text(text)) for doc_id, text in texts.items()}
+        stale = [doc_id for doc_id in texts if self._hashes.get((doc_type, doc_id)) != hashes[doc_id]]
+        if not stale:
+            return 0
+
+        vectors = normalize_rows(
+            np.asarray(
+                await self._embedding_manager.embed_many([texts[doc_id] for doc_id in stale]),
+                dtype=np.float32,
+            )
+        )
+        rows = [
+            {
+                "doc_type": doc_type,
+                "doc_id": doc_id,
+                "model": model,
+                "model_version": self._version,
+                "dim": vector.shape[0],
+                "vector": vector.tobytes(),
+                "content_hash": hashes[doc_id],
+            }
+            for doc_id, vector in zip(stale, vectors)
+        ]
+        # Upserts, as an upload task, a query and a rebuild may store the same
+        # document at the same time.
+        for start in range(0, len(rows), _UPSERT_CHUNK):
+            statement = sqlite_insert(DocumentEmbedding).values(rows[start : start + _UPSERT_CHUNK])
+            await db.execute(
+                statement.on_conflict_do_update(
+                    index_elements=["doc_type", "doc_id", "model"],
+                    set_={
+                        column: statement.excluded[column]
+                        for column in ("model_version", "dim", "vector", "content_hash")
+                    },
+                )
+            )
+        await db.commit()
+
+        self._indexes[doc_type].add(stale, vectors)
+        self._hashes.update({(doc_type, doc_id): hashes[doc_id] for doc_id in stale})
+        logger.info(f"document index embedded {len(stale)} {doc_type}(s)")
+        return len(stale)
+
+    async def index_new(self, doc_type: str, ids: Sequence[str]) -> None:
+        """
+        Background-task entry point for freshly uploaded documents: computes
+        and stores all of their embeddings (see INGESTED_TYPES).
+        """
+        try:
+            async with self._sessions() as db:
+                for embedded_type in INGESTED_TYPES[doc_type]:
+                    await self.index(db, embedded_type, ids)
+        except Exception as e:
+            logger.warning(f"could not index {doc_type}(s) {list(ids)}: {e}")
+
+    async def embed(
+        self,
+        embedding_manager: EmbeddingManager,
+        items: Sequence[Tuple[str, str, str]],
+    ) -> np.ndarray:
+        """
+        Normalized embeddings of (embedding type, doc id, text) items, one row
+        each. A stored vector is used when it was computed by the model
+        `embedding_manager` uses, from exactly this text; the other texts are
+        embedded on demand by `embedding_manager` (with its priority and
+        deadline) and not stored.
+        """
+        vectors: List[Optional[np.ndarray]] = [None] * len(items)
+        try:
+            model = await self.ensure_loaded()
+            if model == await embedding_manager.resolve_model():
+                for i, (doc_type, doc_id, text) in enumerate(items):
+                    if self._hashes.get((doc_type, doc_id)) == content_hash(normalize_text(text)):
+                        vectors[i] = self._indexes[doc_type].get(doc_id)
+        except Exception as e:
+            logger.warning(f"stored embeddings unavailable, embedding on demand: {e}")
+
+        missing = [i for i, vector in enumerate(vectors) if vector is None]
+        self.stored_hits += len(items) - len(missing)
+        self.on_demand += len(missing)
+        if missing:
+            fresh = normalize_rows(
+                np.asarray(
+                    await embedding_manager.embed_many([items[i][2] for i in missing]),
+                    dtype=np.float32,
+                )
+            )
+            for i, vector in zip(missing, fresh):
+                vectors[i] = vector
+        return np.stack(vectors)
+
+    async def rebuild(self, db: AsyncSession) -> Dict[str, Any]:
+        """
+        Reload the index from the table, embed every missing or stale
+        document and retrain the approximate indexes.
+        """
+        async with self._lock:
+            self._model = None
+        embedded = {}
+        for doc_type in self._indexes:
+            embedded[doc_type] = await self.index(db, doc_type, await self._all_ids(db, doc_type))
+            self._train(doc_type)
+        return {"embedded": embedded, **self.stats()}
+
+    async def top_k(
+        self,
+        db: AsyncSession,
+        doc_type: str,
+        doc_id: str,
+        target_type: str,
+        k: int = 10,
+        exact: bool = False,
+    ) -> Optional[List[Dict[str, Any]]]:
+        """
+        The `k` documents of `target_type` most similar to the given document,
+        best first, or None if the document does not exist.
+        """
+        await self.ensure_loaded()
+        query = self._indexes[doc_type].get(doc_id)
+        if query is None:
+            await self.index(db, doc_type, [doc_id])
+            query = self._indexes[doc_type].get(doc_id)
+            if query is None:
+                return None
+        hits = self._indexes[target_type].search(query, k=k, exact=exact)
+        return [{f"{target_type}_id": hit_id, "score": score} for hit_id, score in hits]
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "model": self._model,
+            "model_version": self._version,
+            "stored_hits": self.stored_hits,
+            "on_demand": self.on_demand,
+            **{f"{doc_type}s": index.stats() for doc_type, index in self._indexes.items()},
+        }
+
+
+document_index = DocumentIndex(
+    AsyncSessionLocal,
+    ivf_threshold=settings.VECTOR_INDEX_IVF_THRESHOLD,
+    nprobe=settings.VECTOR_INDEX_NPROBE,
+)
+
+
+async def _rebuild() -> None:
+    await init_models(Base)
+    async with AsyncSessionLocal() as db:
+        print(await document_index.rebuild(db))
+
+
+if __name__ == "__main__":
+    asyncio.run(_rebuild())
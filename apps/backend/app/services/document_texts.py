@@ -0,0 +1,74 @@
+import json
+
+from sqlalchemy.future import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Any, Awaitable, Callable, Dict, List, Sequence
+
+from app.models import Resume, Job, ProcessedJob
+
+# Stay well below SQLite's bound-parameter limit in IN (...) lookups.
+_ID_CHUNK = 500
+
+
+async def fetch_rows(db: AsyncSession, model, column, ids: Sequence[str]) -> List[Any]:
+    rows = []
+    for start in range(0, len(ids), _ID_CHUNK):
+        result = await db.execute(
+            select(model).where(column.in_(ids[start : start + _ID_CHUNK]))
+        )
+        rows.extend(result.scalars().all())
+    return rows
+
+
+def joined_keywords(processed) -> str:
+    """
+    Joins the extracted keywords stored on a processed resume or job.
+    """
+    if not processed or not processed.extracted_keywords:
+        return ""
+    try:
+        keywords_data = json.loads(processed.extracted_keywords)
+    except (json.JSONDecodeError, TypeError):
+        return ""
+    if not keywords_data:
+        return ""
+    return ", ".join(keywords_data.get("extracted_keywords", []))
+
+
+async def resume_texts(db: AsyncSession, resume_ids: List[str]) -> Dict[str, str]:
+    """
+    The text each resume is scored with: its content.
+    """
+    resumes = await fetch_rows(db, Resume, Resume.resume_id, resume_ids)
+    return {resume.resume_id: resume.content for resume in resumes}
+
+
+async def job_texts(db: AsyncSession, job_ids: List[str]) -> Dict[str, str]:
+    """
+    The text each job is scored with: its extracted keywords, or its content.
+    """
+    jobs = await fetch_rows(db, Job, Job.job_id, job_ids)
+    processed = {
+        job.job_id: job
+        for job in await fetch_rows(db, ProcessedJob, ProcessedJob.job_id, job_ids)
+    }
+    return {
+        job.job_id: joined_keywords(processed.get(job.job_id)) or job.content
+        for job in jobs
+    }
+
+
+async def job_contents(db: AsyncSession, job_ids: List[str]) -> Dict[str, str]:
+    """
+    The full text of each job.
+    """
+    jobs = await fetch_rows(db, Job, Job.job_id, job_ids)
+    return {job.job_id: job.content for job in jobs}
+
+
+# The text behind each stored embedding type (see DocumentEmbedding.doc_type).
+TEXT_LOADERS: Dict[str, Callable[[AsyncSession, List[str]], Awaitable[Dict[str, str]]]] = {
+    "resume": resume_texts,
+    "job": job_texts,
+    "job_content": job_contents,
+}
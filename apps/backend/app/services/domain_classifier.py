@@ -0,0 +1,509 @@
+import asyncio
+import logging
+import numpy as np
+
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
+
+from app.core import settings
+from app.agent import EmbeddingManager, Priority
+from .keyword_matcher import compile_keywords
+
+logger = logging.getLogger(__name__)
+
+# Professional domain taxonomy. `keywords` is the domain's signature (en/pt/es);
+# `required_qualifications` are credentials without which a candidate from
+# another field cannot hold the job.
+PROFESSIONAL_DOMAINS: Dict[str, Dict[str, Any]] = {
+    "software_engineering": {
+        "family": "technology",
+        "labels": {"en": "Software Engineering", "pt": "Engenharia de Software", "es": "Ingeniería de Software"},
+        "description": "Designing, building and maintaining software applications and services.",
+        "keywords": [
+            "software engineer", "software developer", "software development", "programming",
+            "backend", "frontend", "full stack", "python", "java", "javascript", "typescript",
+            "react", "node.js", "golang", "c#", "rest api", "microservices", "git",
+            "desenvolvedor", "programador", "desarrollador", "desenvolvimento de software",
+        ],
+        "required_qualifications": [],
+    },
+    "data_science": {
+        "family": "technology",
+        "labels": {"en": "Data Science", "pt": "Ciência de Dados", "es": "Ciencia de Datos"},
+        "description": "Analyzing data and building statistical and machine learning models.",
+        "keywords": [
+            "data science", "data scientist", "machine learning", "deep learning", "statistics",
+            "data analysis", "data analyst", "data engineer", "sql", "pandas", "etl",
+            "power bi", "tableau", "analytics", "cientista de dados", "análise de dados",
+            "ciencia de datos", "análisis de datos", "estatística", "estadística",
+        ],
+        "required_qualifications": [],
+    },
+    "it_infrastructure": {
+        "family": "technology",
+        "labels": {"en": "IT Infrastructure", "pt": "Infraestrutura de TI", "es": "Infraestructura de TI"},
+        "description": "Operating cloud, network and server infrastructure, DevOps and IT security.",
+        "keywords": [
+            "devops", "cloud", "aws", "azure", "gcp", "kubernetes", "docker", "linux",
+            "terraform", "ci/cd", "sysadmin", "network administration", "cybersecurity",
+            "site reliability", "infraestrutura", "infraestructura", "redes", "suporte técnico",
+            "soporte técnico",
+        ],
+        "required_qualifications": [],
+    },
+    "product_design": {
+        "family": "creative",
+        "labels": {"en": "Product & Graphic Design", "pt": "Design de Produto e Gráfico", "es": "Diseño de Producto y Gráfico"},
+        "description": "Designing user experiences, interfaces and visual identities.",
+        "keywords": [
+            "ux", "ui", "user experience", "user interface", "figma", "product design",
+            "graphic design", "adobe", "photoshop", "illustrator", "wireframes", "prototyping",
+            "design gráfico", "diseño gráfico", "designer", "diseñador",
+        ],
+        "required_qualifications": [],
+    },
+    "marketing": {
+        "family": "business",
+        "labels": {"en": "Marketing", "pt": "Marketing", "es": "Marketing"},
+        "description": "Planning campaigns, brand, content and digital marketing to acquire customers.",
+        "keywords": [
+            "marketing", "digital marketing", "seo", "sem", "google ads", "campaigns", "branding",
+            "brand", "content marketing", "social media", "copywriting", "advertising",
+            "growth", "mídias sociais", "redes sociales", "publicidade", "publicidad", "campanhas",
+            "campañas",
+        ],
+        "required_qualifications": [],
+    },
+    "sales": {
+        "family": "business",
+        "labels": {"en": "Sales", "pt": "Vendas", "es": "Ventas"},
+        "description": "Prospecting, negotiating and closing deals to meet revenue targets.",
+        "keywords": [
+            "sales", "account executive", "quota", "prospecting", "negotiation", "crm",
+            "salesforce", "b2b", "closing deals", "revenue targets", "cold calling", "vendas",
+            "ventas", "comercial", "negociação", "negociación", "vendedor",
+        ],
+        "required_qualifications": [],
+    },
+    "business_development": {
+        "family": "business",
+        "labels": {"en": "Business Development", "pt": "Desenvolvimento de Negócios", "es": "Desarrollo de Negocios"},
+        "description": "Building partnerships, strategy and new business opportunities.",
+        "keywords": [
+            "business development", "partnerships", "strategic partnerships", "go-to-market",
+            "market expansion", "new business", "strategy", "stakeholders", "parcerias",
+            "alianzas", "estratégia", "estrategia", "desenvolvimento de negócios",
+            "desarrollo de negocios",
+        ],
+        "required_qualifications": [],
+    },
+    "media_communications": {
+        "family": "business",
+        "labels": {"en": "Media & Communications", "pt": "Mídia e Comunicação", "es": "Medios y Comunicación"},
+        "description": "Journalism, public relations, editorial work and media production.",
+        "keywords": [
+            "journalism", "journalist", "public relations", "communications", "editorial",
+            "press", "broadcasting", "video production", "media", "jornalismo", "jornalista",
+            "periodismo", "periodista", "relações públicas", "comunicação", "comunicación",
+            "mídia", "medios",
+        ],
+        "required_qualifications": [],
+    },
+    "customer_support": {
+        "family": "business",
+        "labels": {"en": "Customer Support", "pt": "Atendimento ao Cliente", "es": "Atención al Cliente"},
+        "description": "Serving and supporting customers through service and success teams.",
+        "keywords": [
+            "customer service", "customer support", "customer success", "call center",
+            "zendesk", "tickets", "atendimento ao cliente", "sucesso do cliente",
+            "atención al cliente", "sac",
+        ],
+        "required_qualifications": [],
+    },
+    "human_resources": {
+        "family": "business",
+        "labels": {"en": "Human Resources", "pt": "Recursos Humanos", "es": "Recursos Humanos"},
+        "description": "Recruiting, onboarding, payroll and people operations.",
+        "keywords": [
+            "human resources", "recruiting", "recruiter", "talent acquisition", "payroll",
+            "onboarding", "people operations", "recursos humanos", "recrutamento",
+            "reclutamiento", "folha de pagamento", "nómina",
+        ],
+        "required_qualifications": [],
+    },
+    "finance_accounting": {
+        "family": "finance",
+        "labels": {"en": "Finance & Accounting", "pt": "Finanças e Contabilidade", "es": "Finanzas y Contabilidad"},
+        "description": "Accounting, auditing, tax, budgeting and financial analysis.",
+        "keywords": [
+            "accounting", "accountant", "finance", "financial analysis", "audit", "tax",
+            "budget", "ifrs", "gaap", "cpa", "controller", "treasury", "contabilidade",
+            "contabilidad", "contador", "finanças", "finanzas", "auditoria", "auditoría",
+            "orçamento", "presupuesto", "tesouraria", "tesorería",
+        ],
+        "required_qualifications": [],
+    },
+    "operations_logistics": {
+        "family": "operations",
+        "labels": {"en": "Operations & Logistics", "pt": "Operações e Logística", "es": "Operaciones y Logística"},
+        "description": "Supply chain, procurement, inventory, warehousing and process improvement.",
+        "keywords": [
+            "logistics", "supply chain", "procurement", "inventory", "warehouse", "lean",
+            "six sigma", "operations management", "logística", "cadeia de suprimentos",
+            "cadena de suministro", "compras", "estoque", "inventario", "armazém", "almacén",
+        ],
+        "required_qualifications": [],
+    },
+    "legal": {
+        "family": "legal",
+        "labels": {"en": "Law", "pt": "Direito", "es": "Derecho"},
+        "description": "Legal counsel, litigation, contracts and regulatory compliance.",
+        "keywords": [
+            "lawyer", "attorney", "law firm", "litigation", "legal counsel", "paralegal",
+            "contracts", "advogado", "advogada", "abogado", "abogada", "jurídico",
+            "direito", "derecho", "contratos",
+        ],
+        # No "JD" / "LLM": a job description and a language model in tech resumes.
+        "required_qualifications": [
+            "bar admission", "admitted to the bar", "juris doctor", "master of laws", "llb",
+            "law degree", "oab", "bacharel em direito", "licenciado en derecho",
+            "abogado colegiado",
+        ],
+    },
+    "healthcare_medicine": {
+        "family": "healthcare",
+        "labels": {"en": "Medicine", "pt": "Medicina", "es": "Medicina"},
+        "description": "Diagnosing and treating patients as a physician or surgeon.",
+        "keywords": [
+            "physician", "doctor", "surgeon", "surgery", "clinical", "patients", "hospital",
+            "diagnosis", "residency", "médico", "médica", "medicina", "cirurgia", "cirugía",
+            "pacientes", "diagnóstico", "residência médica",
+        ],
+        # No "MD" (Markdown, README.md) or bare "CRM" (the sales tool): the
+        # Brazilian medical council registration is only matched spelled out.
+        "required_qualifications": [
+            "doctor of medicine", "medical degree", "medical license", "conselho regional de medicina",
+            "residência médica", "residency", "licenciatura en medicina", "título de médico",
+        ],
+    },
+    "nursing": {
+        "family": "healthcare",
+        "labels": {"en": "Nursing", "pt": "Enfermagem", "es": "Enfermería"},
+        "description": "Nursing and direct patient care in clinical settings.",
+        "keywords": [
+            "nurse", "nursing", "patient care", "icu", "enfermeiro", "enfermeira",
+            "enfermagem", "enfermero", "enfermera", "enfermería", "uti",
+        ],
+        "required_qualifications": [
+            "rn", "registered nurse", "nursing license", "bsn", "coren",
+            "licenciatura en enfermería", "bacharel em enfermagem",
+        ],
+    },
+    "education": {
+        "family": "education",
+        "labels": {"en": "Education", "pt": "Educação", "es": "Educación"},
+        "description": "Teaching students, planning curricula and lessons.",
+        "keywords": [
+            "teacher", "teaching", "professor", "curriculum", "lesson plans", "students",
+            "classroom", "pedagogy", "professora", "ensino", "alunos", "sala de aula",
+            "pedagogia", "docente", "enseñanza", "estudiantes", "maestro", "pedagogía",
+        ],
+        "required_qualifications": [],
+    },
+    "engineering": {
+        "family": "engineering",
+        "labels": {"en": "Mechanical & Civil Engineering", "pt": "Engenharia Mecânica e Civil", "es": "Ingeniería Mecánica y Civil"},
+        "description": "Mechanical, civil, structural and manufacturing engineering.",
+        "keywords": [
+            "mechanical engineering", "civil engineering", "structural", "autocad",
+            "solidworks", "hvac", "manufacturing", "construction", "engenharia civil",
+            "engenharia mecânica", "ingeniería civil", "ingeniería mecánica", "estrutural",
+            "manufatura", "fabricación", "obras",
+        ],
+        "required_qualifications": [],
+    },
+    "hospitality": {
+        "family": "hospitality",
+        "labels": {"en": "Hospitality & Food Service", "pt": "Hotelaria e Alimentação", "es": "Hostelería y Alimentación"},
+        "description": "Hotels, restaurants, kitchens and guest services.",
+        "keywords": [
+            "hotel", "restaurant", "chef", "cook", "kitchen", "hospitality", "front desk",
+            "bartender", "food service", "restaurante", "cozinheiro", "cozinha", "cocinero",
+            "cocina", "hotelaria", "hostelería", "recepção",
+        ],
+        "required_qualifications": [],
+    },
+}
+
+# Family pairs whose roles share enough transferable skills to be "moderate".
+RELATED_FAMILIES = {
+    frozenset(pair)
+    for pair in [
+        ("technology", "creative"),
+        ("technology", "engineering"),
+        ("business", "creative"),
+        ("business", "finance"),
+        ("business", "operations"),
+        ("business", "hospitality"),
+        ("finance", "operations"),
+        ("finance", "legal"),
+        ("operations", "engineering"),
+    ]
+}
+
+_REASONS = {
+    "en": {
+        "areas": "Resume area: {resume}; job area: {job}",
+        "excellent": "Same professional area",
+        "high": "Closely related professional areas",
+        "moderate": "Related areas with transferable skills",
+        "incompatible": "The job requires qualifications that were not found in the resume",
+    },
+    "pt": {
+        "areas": "Área do currículo: {resume}; área da vaga: {job}",
+        "excellent": "Mesma área profissional",
+        "high": "Áreas profissionais próximas",
+        "moderate": "Áreas relacionadas com skills transferíveis",
+        "incompatible": "A vaga exige qualificações que não foram encontradas no currículo",
+    },
+    "es": {
+        "areas": "Área del currículum: {resume}; área del trabajo: {job}",
+        "excellent": "Misma área profesional",
+        "high": "Áreas profesionales cercanas",
+        "moderate": "Áreas relacionadas con habilidades transferibles",
+        "incompatible": "El trabajo requiere calificaciones que no aparecen en el currículum",
+    },
+}
+
+# Same multipliers as the LLM compatibility prompt.
+_MULTIPLIERS = {"excellent": 1.0, "high": 0.95, "moderate": 0.8, "incompatible": 0.4}
+
+# Weight of the keyword signature against the centroid similarity.
+_KEYWORD_WEIGHT = 0.7
+# Softmax temperature for centroid similarities.
+_TEMPERATURE = 0.05
+# Occurrences of one keyword counted towards a domain's signature score.
+_MAX_OCCURRENCES = 3
+
+_DOMAIN_NAMES = list(PROFESSIONAL_DOMAINS)
+
+
+def has_required_qualifications(resume_text: str, domain: str) -> bool:
+    """
+    Whether the resume mentions one of the domain's required qualifications
+    (on word boundaries, so "RN" does not match inside "learn").
+    """
+    required = PROFESSIONAL_DOMAINS.get(domain, {}).get("required_qualifications")
+    if not required:
+        return True
+    return bool(compile_keywords(required).scan(resume_text))
+
+
+@dataclass
+class DomainPrediction:
+    """
+    The most likely domain of a text. `domain` is None when the text is
+    ambiguous: too few signature keywords or too small a lead over the
+    runner-up.
+    """
+
+    domain: Optional[str]
+    confidence: float
+    scores: Dict[str, float] = field(default_factory=dict)
+
+
+class DomainClassifier:
+    """
+    Deterministic, in-process professional domain classifier.
+
+    A text is scored against every domain of `PROFESSIONAL_DOMAINS` by its
+    keyword signature (one Aho-Corasick pass over all domains' keywords) and,
+    when embeddings are available, by cosine similarity to the domain
+    centroids (embeddings of the domain descriptions, computed once per
+    embedding model). `pre_classify` decides the compatibility of a
+    resume/job pair locally when both sides are unambiguous and the answer
+    follows from the taxonomy; everything else is left to the LLM.
+    """
+
+    def __init__(
+        self,
+        margin: float = 0.15,
+        min_hits: int = 2,
+        use_embeddings: bool = True,
+    ) -> None:
+        self._margin = margin
+        self._min_hits = min_hits
+        self._use_embeddings = use_embeddings
+        self._embedding_manager = EmbeddingManager(priority=Priority.INTERACTIVE)
+        self._centroids: Dict[str, np.ndarray] = {}
+        self._lock = asyncio.Lock()
+        self._keywords: List[str] = []
+        self._keyword_domains: List[int] = []
+        for position, domain in enumerate(PROFESSIONAL_DOMAINS.values()):
+            for keyword in domain["keywords"]:
+                self._keywords.append(keyword)
+                self._keyword_domains.append(position)
+        self._matcher = compile_keywords(self._keywords)
+        self.decided: Counter = Counter()
+        self.escalated = 0
+
+    def signature_scores(self, text: str) -> np.ndarray:
+        """
+        Per-domain keyword signature score: occurrences of the domain's
+        keywords, each counted at most `_MAX_OCCURRENCES` times.
+        """
+        scores = np.zeros(len(_DOMAIN_NAMES), dtype=np.float64)
+        for index, spans in self._matcher.scan(text).items():
+            scores[self._keyword_domains[index]] += min(len(spans), _MAX_OCCURRENCES)
+        return scores
+
+    async def _centroid_matrix(self, deadline: Optional[float] = None) -> np.ndarray:
+        model = await self._embedding_manager.resolve_model()
+        if model not in self._centroids:
+            async with self._lock:
+                if model not in self._centroids:
+                    texts = [
+                        f"{domain['labels']['en']}: {domain['description']} "
+                        + ", ".join(domain["keywords"])
+                        for domain in PROFESSIONAL_DOMAINS.values()
+                    ]
+                    matrix = np.asarray(
+                        await self._embedding_manager.embed_many(texts, deadline=deadline),
+                        dtype=np.float64,
+                    )
+                    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+                    self._centroids[model] = matrix / np.where(norms == 0, 1.0, norms)
+                    logger.info(f"Computed {len(texts)} domain centroids for {model}")
+        return self._centroids[model]
+
+    async def _similarities(
+        self, texts: List[str], deadline: Optional[float] = None
+    ) -> Optional[np.ndarray]:
+        if not self._use_embeddings:
+            return None
+        try:
+            centroids = await self._centroid_matrix(deadline)
+            vectors = np.asarray(
+                await self._embedding_manager.embed_many(texts, deadline=deadline),
+                dtype=np.float64,
+            )
+        except Exception as e:
+            logger.warning(f"Domain centroids unavailable, using keywords only: {e}")
+            return None
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        return (vectors / np.where(norms == 0, 1.0, norms)) @ centroids.T
+
+    def _predict(self, signature: np.ndarray, similarity: Optional[np.ndarray]) -> DomainPrediction:
+        total = signature.sum()
+        combined = signature / total if total else np.zeros_like(signature)
+        if similarity is not None:
+            weights = np.exp((similarity - similarity.max()) / _TEMPERATURE)
+            combined = _KEYWORD_WEIGHT * combined + (1 - _KEYWORD_WEIGHT) * weights / weights.sum()
+        order = np.argsort(-combined, kind="stable")
+        top, second = order[0], order[1]
+        confidence = float(combined[top] - combined[second])
+        scores = {
+            _DOMAIN_NAMES[i]: round(float(combined[i]), 4) for i in order[:3] if combined[i] > 0
+        }
+        if signature[top] < self._min_hits or confidence < self._margin:
+            return DomainPrediction(None, confidence, scores)
+        return DomainPrediction(_DOMAIN_NAMES[top], confidence, scores)
+
+    async def classify_many(
+        self, texts: List[str], deadline: Optional[float] = None
+    ) -> List[DomainPrediction]:
+        """
+        Predictions for several texts. Their embeddings are bounded by
+        `deadline` (absolute `time.monotonic()`); past it, the texts are
+        classified by keywords alone.
+        """
+        similarities = await self._similarities(texts, deadline)
+        return [
+            self._predict(
+                self.signature_scores(text),
+                None if similarities is None else similarities[i],
+            )
+            for i, text in enumerate(texts)
+        ]
+
+    async def classify(self, text: str) -> DomainPrediction:
+        (prediction,) = await self.classify_many([text])
+        return prediction
+
+    async def pre_classify(
+        self,
+        resume_text: str,
+        job_text: str,
+        language: str = "en",
+        deadline: Optional[float] = None,
+    ) -> Optional[Tuple[str, float, List[str]]]:
+        """
+        (compatibility level, score multiplier, reasons) when the pair can be
+        decided locally, otherwise None:
+
+        * same domain -> excellent; same family -> high; related families ->
+          moderate;
+        * a job whose required qualifications the resume lacks, from a
+          different domain -> incompatible;
+        * anything else (ambiguous texts, unrelated families) -> None.
+
+        The embeddings are bounded by the request's `deadline`.
+        """
+        resume, job = await self.classify_many([resume_text, job_text], deadline)
+        level = None
+        if resume.domain is not None and job.domain is not None:
+            resume_family = PROFESSIONAL_DOMAINS[resume.domain]["family"]
+            job_family = PROFESSIONAL_DOMAINS[job.domain]["family"]
+            if resume.domain != job.domain and not has_required_qualifications(
+                resume_text, job.domain
+            ):
+                level = "incompatible"
+            elif resume.domain == job.domain:
+                level = "excellent"
+            elif resume_family == job_family:
+                level = "high"
+            elif frozenset((resume_family, job_family)) in RELATED_FAMILIES:
+                level = "moderate"
+
+        if level is None or (
+            level != "incompatible" and not has_required_qualifications(resume_text, job.domain)
+        ):
+            self.escalated += 1
+            logger.info(
+                f"Domain pre-classifier escalating - resume: {resume.domain} {resume.scores}, job: {job.domain} {job.scores}"
+            )
+            return None
+
+        self.decided[level] += 1
+        reasons = _REASONS.get(language, _REASONS["en"])
+        labels = {
+            name: PROFESSIONAL_DOMAINS[name]["labels"].get(language, PROFESSIONAL_DOMAINS[name]["labels"]["en"])
+            for name in (resume.domain, job.domain)
+        }
+        logger.info(
+            f"Domain pre-classifier decided {level} - resume: {resume.domain}, job: {job.domain}"
+        )
+        return (
+            level,
+            _MULTIPLIERS[level],
+            [
+                reasons["areas"].format(resume=labels[resume.domain], job=labels[job.domain]),
+                reasons[level],
+            ],
+        )
+
+    def stats(self) -> Dict[str, Any]:
+        decided = sum(self.decided.values())
+        total = decided + self.escalated
+        return {
+            "decided": dict(self.decided),
+            "escalated": self.escalated,
+            "avoided_ratio": decided / total if total else None,
+        }
+
+
+domain_classifier = DomainClassifier(
+    margin=settings.COMPATIBILITY_PRECLASSIFIER_MARGIN,
+    min_hits=settings.COMPATIBILITY_PRECLASSIFIER_MIN_HITS,
+)
@@ -7,7 +7,7 @@ from pydantic import ValidationError
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.agent import AgentManager
+from app.agent import AgentManager, Priority
 from app.prompt import prompt_factory
 from app.schemas.json import json_schema_factory
 from app.models import Job, Resume, ProcessedJob
@@ -20,7 +20,7 @@ logger = logging.getLogger(__name__)
 class JobService:
     def __init__(self, db: AsyncSession):
         self.db = db
-        self.json_agent_manager = AgentManager(model="gemma3:4b")
+        self.json_agent_manager = AgentManager(model="gemma3:4b", priority=Priority.BULK)
 
     async def create_and_store_job(self, job_data: dict) -> List[str]:
         """
@@ -125,7 +125,9 @@ class JobService:
             job_description_text,
         )
         logger.info(f"Structured Job Prompt: {prompt}")
-        raw_output = await self.json_agent_manager.run(prompt=prompt)
+        raw_output = await self.json_agent_manager.run(
+            prompt=prompt, task="structured_job"
+        )
 
         try:
             structured_job: StructuredJobModel = StructuredJobModel.model_validate(
@@ -0,0 +1,179 @@
+import logging
+
+from collections import deque
+from functools import lru_cache
+from typing import Any, Dict, Iterable, List, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Treated like a space on both sides, so "CI/CD", "ci-cd" and "ci cd" match.
+_SEPARATORS = set("-_/.")
+
+
+def _fold(char: str) -> str:
+    """
+    Case- and separator-folds one character without changing its length,
+    so match positions map straight back onto the original text.
+    """
+    if char.isspace() or char in _SEPARATORS:
+        return " "
+    lowered = char.lower()
+    return lowered if len(lowered) == 1 else char
+
+
+def normalize_keyword(keyword: str) -> str:
+    return " ".join("".join(_fold(char) for char in keyword).split())
+
+
+# Endings whose trailing "s" is not a plural: "sass", "status", "analysis", "news".
+_NOT_PLURAL = ("ss", "us", "is", "ews")
+
+
+def _inflect(word: str) -> str:
+    """
+    The singular of a plural word or the plural of a singular one, or "" when
+    the word's trailing "s" is not a plural ending.
+    """
+    if not word.endswith("s"):
+        return word + "s"
+    if word.endswith(_NOT_PLURAL):
+        return ""
+    return word[:-1]
+
+
+def keyword_variants(keyword: str) -> List[str]:
+    """
+    The normalized forms a keyword is matched in: as written, with its
+    separators dropped ("node.js" -> "nodejs") and, when its last word is
+    alphabetic, with that word in singular/plural ("unit tests" ->
+    "unit test").
+    """
+    normalized = normalize_keyword(keyword)
+    if not normalized:
+        return []
+    variants = {normalized, normalized.replace(" ", "")}
+    last = keyword.split()[-1]
+    if last.isalpha() and len(last) > 3:
+        inflected = _inflect(last.lower())
+        if inflected:
+            head = normalized[: len(normalized) - len(last)]
+            variants.add(head + inflected)
+    return sorted(variants)
+
+
+class KeywordMatcher:
+    """
+    Aho-Corasick automaton over a job's keywords (and their variants).
+
+    `scan` finds every keyword occurrence in a text in one linear pass,
+    independent of the number of keywords. Matching is case-insensitive,
+    treats runs of whitespace and separators as one space, and only accepts
+    occurrences on word boundaries ("go" does not match inside "google").
+    Build matchers with `compile_keywords`, which caches them per keyword set.
+    """
+
+    def __init__(self, keywords: Iterable[str]) -> None:
+        self.keywords: List[str] = list(dict.fromkeys(k.strip() for k in keywords if k.strip()))
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        # Per state: (keyword index, pattern length) of every pattern ending here.
+        self._out: List[List[Tuple[int, int]]] = [[]]
+        for index, keyword in enumerate(self.keywords):
+            for variant in keyword_variants(keyword):
+                self._insert(variant, index)
+        self._link()
+
+    def _insert(self, pattern: str, index: int) -> None:
+        state = 0
+        for char in pattern:
+            following = self._goto[state].get(char)
+            if following is None:
+                following = len(self._goto)
+                self._goto[state][char] = following
+                self._goto.append({})
+                self._fail.append(0)
+                self._out.append([])
+            state = following
+        self._out[state].append((index, len(pattern)))
+
+    def _link(self) -> None:
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, following in self._goto[state].items():
+                queue.append(following)
+                fallback = self._fail[state]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                self._fail[following] = self._goto[fallback].get(char, 0)
+                if self._fail[following] == following:
+                    self._fail[following] = 0
+                self._out[following] = self._out[following] + self._out[self._fail[following]]
+
+    def scan(self, text: str) -> Dict[int, List[Tuple[int, int]]]:
+        """
+        {keyword index: [(start, end), ...]} of every occurrence in `text`,
+        with offsets into `text` itself.
+        """
+        goto, fail, out = self._goto, self._fail, self._out
+        found: Dict[int, List[Tuple[int, int]]] = {}
+        # Original offset of every folded character fed to the automaton.
+        offsets: List[int] = []
+        state = 0
+        previous = " "
+        for position, raw in enumerate(text):
+            char = _fold(raw)
+            if char == " " and previous == " ":
+                continue
+            previous = char
+            offsets.append(position)
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            if not out[state]:
+                continue
+            fed = len(offsets)
+            for index, length in out[state]:
+                start = offsets[fed - length]
+                if start > 0 and text[start - 1].isalnum():
+                    continue
+                if position + 1 < len(text) and text[position + 1].isalnum():
+                    continue
+                found.setdefault(index, []).append((start, position + 1))
+        return found
+
+    def coverage(self, text: str) -> Dict[str, Any]:
+        """
+        Matched keywords with their positions, missing keywords and the share
+        of keywords found in `text`.
+        """
+        found = self.scan(text)
+        # Two variants can match the same span; count it once.
+        spans = {index: sorted(set(found_spans)) for index, found_spans in found.items()}
+        matched = [
+            {
+                "keyword": keyword,
+                "count": len(spans[index]),
+                "positions": [list(span) for span in spans[index]],
+            }
+            for index, keyword in enumerate(self.keywords)
+            if index in spans
+        ]
+        missing = [k for index, k in enumerate(self.keywords) if index not in found]
+        return {
+            "matched": matched,
+            "missing": missing,
+            "coverage": len(matched) / len(self.keywords) if self.keywords else 0.0,
+        }
+
+
+@lru_cache(maxsize=256)
+def _compile(keywords: Tuple[str, ...]) -> KeywordMatcher:
+    return KeywordMatcher(keywords)
+
+
+def compile_keywords(keywords: Iterable[str]) -> KeywordMatcher:
+    """
+    The (cached) matcher for a keyword list, e.g. a job's extracted keywords.
+    """
+    return _compile(tuple(keywords))
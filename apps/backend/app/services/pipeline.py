@@ -0,0 +1,176 @@
+import time
+import asyncio
+import logging
+
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Called with (stage name, "started" | "finished", outputs) as a run progresses;
+# outputs maps the stage's output names to their values once it has finished
+# and is empty when it starts.
+StageEventCallback = Callable[[str, str, Dict[str, Any]], Awaitable[None]]
+
+
+@dataclass(frozen=True)
+class Stage:
+    """
+    One async step of a pipeline.
+
+    `fn` is called with the values named in `inputs` as keyword arguments. Its
+    return value is published under `outputs`: a single output receives the
+    value as is, several outputs receive the items of the returned tuple.
+    """
+
+    name: str
+    fn: Callable[..., Awaitable[Any]]
+    inputs: Tuple[str, ...] = ()
+    outputs: Tuple[str, ...] = ()
+
+
+@dataclass
+class GraphRun:
+    """
+    Values and per-stage timings of one pipeline run. Timings are
+    (start, end) offsets in seconds from the start of the run.
+    """
+
+    values: Dict[str, Any]
+    timings: Dict[str, Tuple[float, float]] = field(default_factory=dict)
+    elapsed: float = 0.0
+
+    def critical_path(self, graph: "StageGraph") -> List[str]:
+        """
+        Walk back from the last stage to finish, always following the
+        dependency that finished last.
+        """
+        if not self.timings:
+            return []
+        path = [max(self.timings, key=lambda name: self.timings[name][1])]
+        while True:
+            deps = [d for d in graph.dependencies(path[-1]) if d in self.timings]
+            if not deps:
+                break
+            path.append(max(deps, key=lambda name: self.timings[name][1]))
+        return path[::-1]
+
+    def summary(self, graph: "StageGraph") -> str:
+        stages = ", ".join(
+            f"{name}={1000 * (end - start):.0f}ms"
+            for name, (start, end) in sorted(self.timings.items(), key=lambda item: item[1])
+        )
+        return (
+            f"total={1000 * self.elapsed:.0f}ms critical_path="
+            f"{' -> '.join(self.critical_path(graph))} stages: {stages}"
+        )
+
+
+class StageGraph:
+    """
+    A small DAG of async stages.
+
+    Dependencies are derived from declared inputs and outputs, and each stage
+    starts as soon as everything it consumes is available, so independent
+    stages overlap and the run takes as long as its critical path. If a stage
+    fails, the stages still running are cancelled and the error propagates.
+    """
+
+    def __init__(self, stages: List[Stage], inputs: Tuple[str, ...] = ()) -> None:
+        self._stages: Dict[str, Stage] = {}
+        self._producers: Dict[str, str] = {}
+        for stage in stages:
+            if stage.name in self._stages:
+                raise ValueError(f"duplicate stage '{stage.name}'")
+            self._stages[stage.name] = stage
+            for output in stage.outputs or (stage.name,):
+                if output in self._producers or output in inputs:
+                    raise ValueError(f"value '{output}' is produced more than once")
+                self._producers[output] = stage.name
+
+        self._inputs = set(inputs)
+        for stage in stages:
+            for name in stage.inputs:
+                if name not in self._producers and name not in self._inputs:
+                    raise ValueError(f"stage '{stage.name}' needs unknown value '{name}'")
+        self._order = self._topological_order()
+
+    @property
+    def stages(self) -> List[str]:
+        return list(self._order)
+
+    def dependencies(self, name: str) -> List[str]:
+        return list(
+            dict.fromkeys(
+                self._producers[value]
+                for value in self._stages[name].inputs
+                if value in self._producers
+            )
+        )
+
+    def _topological_order(self) -> List[str]:
+        order: List[str] = []
+        state: Dict[str, int] = {}
+
+        def visit(name: str) -> None:
+            if state.get(name) == 2:
+                return
+            if state.get(name) == 1:
+                raise ValueError(f"stage '{name}' is part of a cycle")
+            state[name] = 1
+            for dep in self.dependencies(name):
+                visit(dep)
+            state[name] = 2
+            order.append(name)
+
+        for name in self._stages:
+            visit(name)
+        return order
+
+    async def run(
+        self, on_event: Optional[StageEventCallback] = None, **inputs: Any
+    ) -> GraphRun:
+        missing = self._inputs - set(inputs)
+        if missing:
+            raise ValueError(f"missing pipeline inputs: {sorted(missing)}")
+
+        result = GraphRun(values=dict(inputs))
+        started = time.perf_counter()
+        tasks: Dict[str, asyncio.Task] = {}
+
+        async def run_stage(stage: Stage) -> None:
+            await asyncio.gather(*(tasks[dep] for dep in self.dependencies(stage.name)))
+            begin = time.perf_counter() - started
+            if on_event is not None:
+                await on_event(stage.name, "started", {})
+            value = await stage.fn(**{name: result.values[name] for name in stage.inputs})
+            result.timings[stage.name] = (begin, time.perf_counter() - started)
+            outputs = stage.outputs or (stage.name,)
+            if len(outputs) == 1:
+                result.values[outputs[0]] = value
+            else:
+                result.values.update(zip(outputs, value))
+            if on_event is not None:
+                await on_event(
+                    stage.name, "finished", {name: result.values[name] for name in outputs}
+                )
+
+        for name in self._order:
+            tasks[name] = asyncio.create_task(
+                run_stage(self._stages[name]), name=f"stage:{name}"
+            )
+        try:
+            done, pending = await asyncio.wait(
+                tasks.values(), return_when=asyncio.FIRST_EXCEPTION
+            )
+            for task in done:
+                if not task.cancelled() and task.exception() is not None:
+                    raise task.exception()
+        finally:
+            for task in tasks.values():
+                task.cancel()
+            await asyncio.gather(*tasks.values(), return_exceptions=True)
+
+        result.elapsed = time.perf_counter() - started
+        logger.info(f"pipeline finished: {result.summary(self)}")
+        return result
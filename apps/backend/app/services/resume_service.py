@@ -11,7 +11,7 @@ from pydantic import ValidationError
 from typing import Dict, Optional
 
 from app.models import Resume, ProcessedResume
-from app.agent import AgentManager
+from app.agent import AgentManager, Priority
 from app.prompt import prompt_factory
 from app.schemas.json import json_schema_factory
 from app.schemas.pydantic import StructuredResumeModel
@@ -24,7 +24,7 @@ class ResumeService:
     def __init__(self, db: AsyncSession):
         self.db = db
         self.md = MarkItDown(enable_plugins=False)
-        self.json_agent_manager = AgentManager(model="gemma3:4b")
+        self.json_agent_manager = AgentManager(model="gemma3:4b", priority=Priority.BULK)
 
     async def convert_and_store_resume(
         self, file_bytes: bytes, file_type: str, filename: str, content_type: str = "md"
@@ -133,7 +133,9 @@ class ResumeService:
             resume_text,
         )
         logger.info(f"Structured Resume Prompt: {prompt}")
-        raw_output = await self.json_agent_manager.run(prompt=prompt)
+        raw_output = await self.json_agent_manager.run(
+            prompt=prompt, task="structured_resume"
+        )
 
         try:
             structured_resume: StructuredResumeModel = (
@@ -1,21 +1,41 @@
 import gc
 import json
+import time
 import asyncio
 import logging
 import markdown
 import numpy as np
 
 from sqlalchemy.future import select
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 from pydantic import ValidationError
 from sqlalchemy.ext.asyncio import AsyncSession
-from typing import Dict, Optional, Tuple, AsyncGenerator, List
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple, AsyncGenerator, List
 
+from app.core import settings
 from app.prompt import prompt_factory
 from app.schemas.json import json_schema_factory
 from app.schemas.pydantic import ResumePreviewerModel
-from app.agent import EmbeddingManager, AgentManager
-from app.models import Resume, Job, ProcessedResume, ProcessedJob
+from app.agent import (
+    EmbeddingManager,
+    AgentManager,
+    Priority,
+    DeadlineExceededError,
+    remaining,
+)
+from app.models import Resume, Job, ProcessedResume, ProcessedJob, MatchResult
+from .pipeline import Stage, StageGraph, StageEventCallback
+from .section_scoring import (
+    SectionScorer,
+    resume_sections,
+    job_requirements,
+    markdown_sections,
+)
 from .compatibility_validator import ProfessionalCompatibilityValidator
+from .keyword_matcher import compile_keywords
+from .document_index import document_index
+from . import document_texts
+from .document_texts import joined_keywords
 from .exceptions import (
     ResumeNotFoundError,
     JobNotFoundError,
@@ -25,6 +45,11 @@ from .exceptions import (
 
 logger = logging.getLogger(__name__)
 
+# Called with (attempt, delta) for every chunk of improvement text generated.
+ImprovementDeltaCallback = Callable[[int, str], Awaitable[None]]
+# Called with (attempt, score) as soon as an improvement attempt is scored.
+ImprovementAttemptCallback = Callable[[int, float], Awaitable[None]]
+
 
 class ScoreImprovementService:
     """
@@ -32,16 +57,44 @@ class ScoreImprovementService:
     Fetches Resume and Job data from the database, computes embeddings,
     and calculates cosine similarity scores. Uses LLM for iteratively improving
     the scoring process.
+
+    `deadline` (absolute `time.monotonic()`) is the request's time budget.
+    Every model call gets what is left of it, and a run that exhausts it
+    returns its best-so-far result marked `partial` instead of failing.
     """
 
-    def __init__(self, db: AsyncSession, max_retries: int = 5, language: str = "en"):
+    # Part of the stored match result key; bump it when the pipeline's output
+    # changes so that results from older pipelines are no longer served.
+    PIPELINE_VERSION = "3"
+
+    def __init__(
+        self,
+        db: AsyncSession,
+        max_retries: int = 5,
+        language: str = "en",
+        candidates: Optional[int] = None,
+        target_score: Optional[float] = None,
+        deadline: Optional[float] = None,
+    ):
         self.db = db
+        self.deadline = deadline
         self.max_retries = max_retries
         self.language = language
-        self.md_agent_manager = AgentManager(strategy="md")
-        self.json_agent_manager = AgentManager()
-        self.embedding_manager = EmbeddingManager()
-        self.compatibility_validator = ProfessionalCompatibilityValidator(language=language)
+        self.candidates = (
+            settings.IMPROVEMENT_CANDIDATES if candidates is None else candidates
+        )
+        self.target_score = (
+            settings.IMPROVEMENT_TARGET_SCORE if target_score is None else target_score
+        )
+        self.md_agent_manager = AgentManager(
+            strategy="md", priority=Priority.INTERACTIVE, deadline=deadline
+        )
+        self.json_agent_manager = AgentManager(priority=Priority.INTERACTIVE, deadline=deadline)
+        self.embedding_manager = EmbeddingManager(priority=Priority.INTERACTIVE, deadline=deadline)
+        self.section_scorer = SectionScorer(self.embedding_manager)
+        self.compatibility_validator = ProfessionalCompatibilityValidator(
+            language=language, deadline=deadline
+        )
 
     async def _get_resume(
         self, resume_id: str
@@ -116,6 +169,146 @@ class ScoreImprovementService:
 
         return float(np.dot(ejk, re) / (np.linalg.norm(ejk) * np.linalg.norm(re)))
 
+    def calculate_cosine_similarities(
+        self,
+        extracted_job_keywords_embedding: np.ndarray,
+        embeddings: np.ndarray,
+    ) -> np.ndarray:
+        """
+        Calculates the cosine similarity of every row of `embeddings` with the
+        job keywords embedding in one vectorized pass.
+        """
+        ejk = np.asarray(extracted_job_keywords_embedding, dtype=np.float64).squeeze()
+        matrix = np.atleast_2d(np.asarray(embeddings, dtype=np.float64))
+        norms = np.linalg.norm(matrix, axis=1) * np.linalg.norm(ejk)
+        return (matrix @ ejk) / np.where(norms == 0, 1.0, norms)
+
+    async def _embed_attempts(
+        self, texts: List[str], deadline: Optional[float] = None
+    ) -> np.ndarray:
+        """
+        Embeds improvement attempts together with their markdown sections in
+        one batch, by `deadline`. Sections an attempt left unchanged are
+        already known to the section scorer and are not embedded again.
+        """
+        sections = [
+            section for text in texts for section in markdown_sections(text).values()
+        ]
+        embeddings = await self.section_scorer.embed(list(texts) + sections, deadline=deadline)
+        return embeddings[: len(texts)]
+
+    def _improvement_deadline(self) -> Optional[float]:
+        """
+        Deadline of the improvement attempts: IMPROVEMENT_BUDGET_SHARE of the
+        budget left when they start, so the stages after them still get time.
+        """
+        left = remaining(self.deadline)
+        if left is None:
+            return None
+        return time.monotonic() + settings.IMPROVEMENT_BUDGET_SHARE * left
+
+    def _candidate_args(self, index: int) -> Dict[str, Any]:
+        """
+        Generation args for candidate `index`: temperatures are spread evenly
+        over the configured range and every candidate gets its own seed.
+        """
+        low = settings.IMPROVEMENT_TEMPERATURE_MIN
+        high = settings.IMPROVEMENT_TEMPERATURE_MAX
+        step = (high - low) / (self.candidates - 1) if self.candidates > 1 else 0.0
+        return {"temperature": round(low + index * step, 3), "seed": index}
+
+    async def _improve_with_candidates(
+        self,
+        prompt: str,
+        resume: str,
+        previous_cosine_similarity_score: float,
+        extracted_job_keywords_embedding: np.ndarray,
+        on_delta: Optional[ImprovementDeltaCallback] = None,
+        on_attempt: Optional[ImprovementAttemptCallback] = None,
+        deadline: Optional[float] = None,
+    ) -> Tuple[str, float, bool]:
+        """
+        Generates `self.candidates` rewrites concurrently, at most
+        IMPROVEMENT_CONCURRENCY at a time, embeds the finished ones in one
+        batch and keeps the best scoring one. With a target score, candidates
+        are scored as they finish and the outstanding ones are cancelled as
+        soon as the target is reached. Candidates still generating or being
+        scored at `deadline` are dropped, and the result is then marked
+        partial.
+        """
+        limit = asyncio.Semaphore(max(1, settings.IMPROVEMENT_CONCURRENCY))
+
+        async def generate(index: int) -> str:
+            async with limit:
+                args = {
+                    "task": "resume_improvement",
+                    "deadline": deadline,
+                    **self._candidate_args(index),
+                }
+                if on_delta is None:
+                    return await self.md_agent_manager.run(prompt, **args)
+                return await self.md_agent_manager.stream(
+                    prompt, lambda delta: on_delta(index + 1, delta), **args
+                )
+
+        attempts = {asyncio.create_task(generate(i)): i + 1 for i in range(self.candidates)}
+        pending = set(attempts)
+        return_when = (
+            asyncio.ALL_COMPLETED if self.target_score is None else asyncio.FIRST_COMPLETED
+        )
+        best_resume, best_score = resume, previous_cosine_similarity_score
+        errors: List[BaseException] = []
+        partial = False
+        try:
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=return_when)
+                finished, numbers = [], []
+                for task in done:
+                    if isinstance(task.exception(), DeadlineExceededError):
+                        logger.warning(f"Resume candidate ran out of time: {task.exception()}")
+                        partial = True
+                    elif task.exception() is not None:
+                        logger.warning(f"Resume candidate failed: {task.exception()}")
+                        errors.append(task.exception())
+                    else:
+                        finished.append(task.result())
+                        numbers.append(attempts[task])
+                if not finished:
+                    continue
+
+                try:
+                    embeddings = await self._embed_attempts(finished, deadline)
+                except DeadlineExceededError as e:
+                    logger.warning(f"Improvement budget exhausted while scoring candidates: {e}")
+                    partial = True
+                    break
+                scores = self.calculate_cosine_similarities(
+                    extracted_job_keywords_embedding, embeddings
+                )
+                if on_attempt is not None:
+                    for number, candidate_score in zip(numbers, scores):
+                        await on_attempt(number, float(candidate_score))
+                best = int(np.argmax(scores))
+                logger.info(
+                    f"Scored {len(finished)} candidate(s), best: {scores[best]:.3f}, best so far: {best_score:.3f}"
+                )
+                if scores[best] > best_score:
+                    best_resume, best_score = finished[best], float(scores[best])
+
+                if self.target_score is not None and best_score >= self.target_score:
+                    logger.info(
+                        f"Target score {self.target_score} reached, cancelling {len(pending)} candidate(s)"
+                    )
+                    break
+        finally:
+            for task in pending:
+                task.cancel()
+            await asyncio.gather(*pending, return_exceptions=True)
+
+        if errors and len(errors) == self.candidates:
+            raise errors[0]
+        return best_resume, best_score, partial
+
     async def improve_score_with_llm(
         self,
         resume: str,
@@ -124,7 +317,21 @@ class ScoreImprovementService:
         extracted_job_keywords: str,
         previous_cosine_similarity_score: float,
         extracted_job_keywords_embedding: np.ndarray,
-    ) -> Tuple[str, float]:
+        on_delta: Optional[ImprovementDeltaCallback] = None,
+        on_attempt: Optional[ImprovementAttemptCallback] = None,
+    ) -> Tuple[str, float, bool]:
+        """
+        Ask the LLM for an improved resume until one scores better than the
+        baseline. Returns the resume, its score and whether the attempts were
+        cut short by the deadline while generating or scoring, in which case
+        the best resume so far is returned. When `on_delta` is given, the text
+        of each attempt is streamed to it as `on_delta(attempt, delta)` while
+        it is generated; `on_attempt(attempt, score)` is told each attempt's
+        score.
+
+        With more than one configured candidate, the attempts run concurrently
+        instead of one after another (see `_improve_with_candidates`).
+        """
         # Check compatibility before attempting optimization
         _, compatibility_status, warnings = await self.compatibility_validator.calculate_compatibility_score(
             resume, job, previous_cosine_similarity_score
@@ -133,13 +340,35 @@ class ScoreImprovementService:
         # Skip optimization for incompatible domains to prevent unrealistic resume generation
         if compatibility_status == "incompatible":
             logger.warning(f"Skipping LLM optimization due to incompatible areas: {warnings}")
-            return resume, previous_cosine_similarity_score
+            return resume, previous_cosine_similarity_score, False
         
         # Get the appropriate prompt based on language
         prompt_template = prompt_factory.get("resume_improvement", self.language)
         best_resume, best_score = resume, previous_cosine_similarity_score
+        deadline = self._improvement_deadline()
+
+        if self.candidates > 1:
+            prompt = prompt_template.format(
+                raw_job_description=job,
+                extracted_job_keywords=extracted_job_keywords,
+                raw_resume=resume,
+                extracted_resume_keywords=extracted_resume_keywords,
+                current_cosine_similarity=previous_cosine_similarity_score,
+            )
+            return await self._improve_with_candidates(
+                prompt,
+                resume,
+                previous_cosine_similarity_score,
+                extracted_job_keywords_embedding,
+                on_delta=on_delta,
+                on_attempt=on_attempt,
+                deadline=deadline,
+            )
 
         for attempt in range(1, self.max_retries + 1):
+            if remaining(deadline) == 0:
+                logger.warning(f"Improvement budget exhausted before attempt {attempt}")
+                return best_resume, best_score, True
             logger.info(
                 f"Attempt {attempt}/{self.max_retries} to improve resume score."
             )
@@ -150,20 +379,36 @@ class ScoreImprovementService:
                 extracted_resume_keywords=extracted_resume_keywords,
                 current_cosine_similarity=best_score,
             )
-            improved = await self.md_agent_manager.run(prompt)
-            emb = await self.embedding_manager.embed(text=improved)
+            try:
+                if on_delta is None:
+                    improved = await self.md_agent_manager.run(
+                        prompt, task="resume_improvement", deadline=deadline
+                    )
+                else:
+                    improved = await self.md_agent_manager.stream(
+                        prompt,
+                        lambda delta, attempt=attempt: on_delta(attempt, delta),
+                        task="resume_improvement",
+                        deadline=deadline,
+                    )
+                (emb,) = await self._embed_attempts([improved], deadline)
+            except DeadlineExceededError as e:
+                logger.warning(f"Improvement budget exhausted during attempt {attempt}: {e}")
+                return best_resume, best_score, True
             score = self.calculate_cosine_similarity(
                 emb, extracted_job_keywords_embedding
             )
+            if on_attempt is not None:
+                await on_attempt(attempt, score)
 
             if score > best_score:
-                return improved, score
+                return improved, score, False
 
             logger.info(
                 f"Attempt {attempt} resulted in score: {score}, best score so far: {best_score}"
             )
 
-        return best_resume, best_score
+        return best_resume, best_score, False
     
     async def generate_detailed_analysis(
         self,
@@ -175,9 +420,13 @@ class ScoreImprovementService:
         resume_content: str,
         compatibility_status: str = None,
         compatibility_warnings: list = None,
+        updated_resume_content: str = None,
     ) -> dict:
         """
         Generate detailed analysis including commentary and improvement suggestions.
+
+        Keyword coverage is measured by scanning the resume (and the updated
+        resume, when given) for the job's extracted keywords.
         """
         # Use the compatibility data already provided
         if compatibility_status is None or compatibility_warnings is None:
@@ -259,7 +508,15 @@ class ScoreImprovementService:
         logger.info(f"Generated {len(improvements)} realistic suggestions based on compatibility")
             
         # Generate detailed analysis
-        job_kw_count = len([kw.strip() for kw in extracted_job_keywords.split(',') if kw.strip()]) if extracted_job_keywords else 0
+        job_keywords = [kw.strip() for kw in extracted_job_keywords.split(',') if kw.strip()] if extracted_job_keywords else []
+        job_kw_count = len(job_keywords)
+        keyword_matcher = compile_keywords(job_keywords)
+        keyword_coverage = keyword_matcher.coverage(resume_content)
+        updated_keyword_coverage = (
+            keyword_matcher.coverage(updated_resume_content)
+            if updated_resume_content
+            else None
+        )
         resume_kw_count = len([kw.strip() for kw in extracted_resume_keywords.split(',') if kw.strip()]) if extracted_resume_keywords else 0
         
         # Language-specific analysis templates
@@ -278,6 +535,7 @@ class ScoreImprovementService:
                 "job_keywords": "Job keywords",
                 "resume_keywords": "Resume keywords",
                 "coverage": "Coverage rate",
+                "missing": "Missing keywords",
                 "methodology": "🤖 **Methodology:**",
                 "methodology_text": "The system uses AI embeddings (OpenAI) combined with professional compatibility validation to calculate realistic scores. The analysis considers semantic similarity but applies penalties for domain incompatibilities."
             },
@@ -295,6 +553,7 @@ class ScoreImprovementService:
                 "job_keywords": "Palavras-chave da vaga",
                 "resume_keywords": "Palavras-chave no currículo",
                 "coverage": "Taxa de cobertura",
+                "missing": "Palavras-chave ausentes",
                 "methodology": "🤖 **Metodologia:**",
                 "methodology_text": "O sistema utiliza embeddings de IA (OpenAI) combinados com validação de compatibilidade profissional para calcular scores realistas. A análise considera similaridade semântica, mas aplica penalizações para incompatibilidades de domínio."
             },
@@ -312,6 +571,7 @@ class ScoreImprovementService:
                 "job_keywords": "Palabras clave del trabajo",
                 "resume_keywords": "Palabras clave del currículum",
                 "coverage": "Tasa de cobertura",
+                "missing": "Palabras clave faltantes",
                 "methodology": "🤖 **Metodología:**",
                 "methodology_text": "El sistema utiliza embeddings de IA (OpenAI) combinados con validación de compatibilidad profesional para calcular puntuaciones realistas. El análisis considera similitud semántica pero aplica penalizaciones por incompatibilidades de dominio."
             }
@@ -340,6 +600,12 @@ class ScoreImprovementService:
         score_section += f"""
 • {t['status']}: {compatibility_status.replace('_', ' ').title()}"""
         
+        coverage_text = f"{int(keyword_coverage['coverage'] * 100)}%"
+        if updated_keyword_coverage is not None:
+            coverage_text += f" → {int(updated_keyword_coverage['coverage'] * 100)}%"
+        missing = (updated_keyword_coverage or keyword_coverage)["missing"]
+        missing_text = f"\n• {t['missing']}: {', '.join(missing[:10])}" if missing else ""
+
         details = f"""{t['title']}
 {compatibility_info}
 {score_section}
@@ -347,7 +613,7 @@ class ScoreImprovementService:
 {t['keywords']}
 • {t['job_keywords']}: {job_kw_count}
 • {t['resume_keywords']}: {resume_kw_count}
-• {t['coverage']}: {int((resume_kw_count/job_kw_count*100)) if job_kw_count > 0 else 0}%
+• {t['coverage']}: {coverage_text}{missing_text}
 
 {t['methodology']}
 {t['methodology_text']}""".strip()
@@ -361,7 +627,11 @@ class ScoreImprovementService:
         return {
             "details": details,
             "commentary": commentary,
-            "improvements": formatted_improvements
+            "improvements": formatted_improvements,
+            "keyword_coverage": {
+                "original": keyword_coverage,
+                "updated": updated_keyword_coverage,
+            },
         }
 
     async def get_resume_for_previewer(self, updated_resume: str) -> Dict:
@@ -375,7 +645,9 @@ class ScoreImprovementService:
             updated_resume,
         )
         logger.info(f"Structured Resume Prompt: {prompt}")
-        raw_output = await self.json_agent_manager.run(prompt=prompt)
+        raw_output = await self.json_agent_manager.run(
+            prompt=prompt, task="resume_preview"
+        )
 
         try:
             resume_preview: ResumePreviewerModel = ResumePreviewerModel.model_validate(
@@ -386,173 +658,447 @@ class ScoreImprovementService:
             return None
         return resume_preview.model_dump()
 
-    async def run(self, resume_id: str, job_id: str) -> Dict:
+    def pipeline_stages(self) -> List[str]:
         """
-        Main method to run the scoring and improving process and return dict.
+        Names of the `run` pipeline's stages, in a valid execution order.
+        """
+        return self._pipeline().stages
+
+    def _pipeline(
+        self,
+        on_delta: Optional[ImprovementDeltaCallback] = None,
+        on_attempt: Optional[ImprovementAttemptCallback] = None,
+    ) -> StageGraph:
         """
+        The `run` pipeline as a stage graph. The compatibility LLM call runs
+        alongside the embeddings, and the previewer extraction alongside the
+        detailed analysis. `on_delta` and `on_attempt` are passed on to the
+        improvement stage.
+        """
+
+        async def fetch(resume_id: str, job_id: str):
+            # Both lookups share one AsyncSession, which must not be used concurrently.
+            resume, processed_resume = await self._get_resume(resume_id)
+            job, processed_job = await self._get_job(job_id)
+            return resume, processed_resume, job, processed_job
 
-        resume, processed_resume = await self._get_resume(resume_id)
-        job, processed_job = await self._get_job(job_id)
+        async def keywords(processed_resume, processed_job):
+            return joined_keywords(processed_resume), joined_keywords(processed_job)
 
-        if processed_job.extracted_keywords:
+        async def embeddings(resume, job):
+            # Usually precomputed at upload; embedded here only if missing.
+            # The job text must be the one it was indexed with, so a job
+            # without keywords is matched on its content.
+            job_text = (await document_texts.job_texts(self.db, [job.job_id]))[job.job_id]
+            return tuple(
+                await document_index.embed(
+                    self.embedding_manager,
+                    [
+                        ("resume", resume.resume_id, resume.content),
+                        ("job", job.job_id, job_text),
+                    ],
+                )
+            )
+
+        async def sections(processed_resume, processed_job):
+            requirements = job_requirements(processed_job)
             try:
-                keywords_data = json.loads(processed_job.extracted_keywords)
-                extracted_job_keywords = ", ".join(keywords_data.get("extracted_keywords", []))
-            except (json.JSONDecodeError, TypeError):
-                extracted_job_keywords = ""
-        else:
-            extracted_job_keywords = ""
+                return requirements, await self.section_scorer.compare(
+                    resume_sections(processed_resume), requirements
+                ), False
+            except DeadlineExceededError as e:
+                logger.warning(f"Skipping the section match, out of time: {e}")
+                return requirements, None, True
 
-        if processed_resume and processed_resume.extracted_keywords:
+        async def updated_sections(updated_resume, job_requirements):
+            # The improvement attempts embedded their sections already.
             try:
-                keywords_data = json.loads(processed_resume.extracted_keywords)
-                if keywords_data:
-                    extracted_resume_keywords = ", ".join(
-                        keywords_data.get("extracted_keywords", [])
-                    )
-                else:
-                    extracted_resume_keywords = ""
-            except (json.JSONDecodeError, TypeError):
-                extracted_resume_keywords = ""
-        else:
-            extracted_resume_keywords = ""
+                return await self.section_scorer.compare(
+                    markdown_sections(updated_resume), job_requirements
+                ), False
+            except DeadlineExceededError as e:
+                logger.warning(f"Skipping the updated section match, out of time: {e}")
+                return None, True
 
-        resume_embedding_task = asyncio.create_task(
-            self.embedding_manager.embed(resume.content)
-        )
-        job_kw_embedding_task = asyncio.create_task(
-            self.embedding_manager.embed(extracted_job_keywords)
-        )
-        resume_embedding, extracted_job_keywords_embedding = await asyncio.gather(
-            resume_embedding_task, job_kw_embedding_task
-        )
+        async def compatibility(resume, job):
+            return await self.compatibility_validator.analyze_compatibility_with_ai(
+                resume.content, job.content
+            )
 
-        # Calculate initial cosine similarity
-        cosine_similarity_score = self.calculate_cosine_similarity(
-            extracted_job_keywords_embedding, resume_embedding
-        )
-        
-        # Apply compatibility validation FIRST to get realistic baseline score
-        validated_original_score, compatibility_status, warnings = await self.compatibility_validator.calculate_compatibility_score(
-            resume.content, job.content, cosine_similarity_score
-        )
-        
-        # Use validated score as the baseline for optimization
-        updated_resume, updated_score = await self.improve_score_with_llm(
-            resume=resume.content,
-            extracted_resume_keywords=extracted_resume_keywords,
-            job=job.content,
-            extracted_job_keywords=extracted_job_keywords,
-            previous_cosine_similarity_score=validated_original_score,  # Use validated score as starting point
-            extracted_job_keywords_embedding=extracted_job_keywords_embedding,
+        async def score(resume, job, resume_embedding, extracted_job_keywords_embedding, compatibility):
+            cosine_similarity_score = self.calculate_cosine_similarity(
+                extracted_job_keywords_embedding, resume_embedding
+            )
+            # The analysis is memoized by the compatibility stage, so this is no LLM call.
+            validated_original_score, compatibility_status, warnings = await self.compatibility_validator.calculate_compatibility_score(
+                resume.content, job.content, cosine_similarity_score
+            )
+            return cosine_similarity_score, validated_original_score, compatibility_status, warnings
+
+        async def improve(
+            resume,
+            job,
+            extracted_resume_keywords,
+            extracted_job_keywords,
+            validated_original_score,
+            extracted_job_keywords_embedding,
+        ):
+            # Use validated score as the baseline for optimization
+            return await self.improve_score_with_llm(
+                resume=resume.content,
+                extracted_resume_keywords=extracted_resume_keywords,
+                job=job.content,
+                extracted_job_keywords=extracted_job_keywords,
+                previous_cosine_similarity_score=validated_original_score,
+                extracted_job_keywords_embedding=extracted_job_keywords_embedding,
+                on_delta=on_delta,
+                on_attempt=on_attempt,
+            )
+
+        async def preview(updated_resume):
+            try:
+                return await self.get_resume_for_previewer(updated_resume=updated_resume), False
+            except DeadlineExceededError as e:
+                logger.warning(f"Skipping the resume preview, out of time: {e}")
+                return None, True
+
+        async def analysis(
+            resume,
+            job,
+            extracted_resume_keywords,
+            extracted_job_keywords,
+            validated_original_score,
+            updated_resume,
+            updated_score,
+            compatibility_status,
+            warnings,
+        ):
+            # Generate detailed analysis using the already validated scores
+            return await self.generate_detailed_analysis(
+                original_score=validated_original_score,
+                new_score=updated_score,
+                extracted_job_keywords=extracted_job_keywords,
+                extracted_resume_keywords=extracted_resume_keywords,
+                job_content=job.content,
+                resume_content=resume.content,
+                compatibility_status=compatibility_status,
+                compatibility_warnings=warnings,
+                updated_resume_content=updated_resume,
+            )
+
+        return StageGraph(
+            [
+                Stage(
+                    "fetch",
+                    fetch,
+                    inputs=("resume_id", "job_id"),
+                    outputs=("resume", "processed_resume", "job", "processed_job"),
+                ),
+                Stage(
+                    "keywords",
+                    keywords,
+                    inputs=("processed_resume", "processed_job"),
+                    outputs=("extracted_resume_keywords", "extracted_job_keywords"),
+                ),
+                Stage(
+                    "embeddings",
+                    embeddings,
+                    inputs=("resume", "job"),
+                    outputs=("resume_embedding", "extracted_job_keywords_embedding"),
+                ),
+                Stage(
+                    "sections",
+                    sections,
+                    inputs=("processed_resume", "processed_job"),
+                    outputs=("job_requirements", "section_match", "sections_partial"),
+                ),
+                Stage("compatibility", compatibility, inputs=("resume", "job")),
+                Stage(
+                    "score",
+                    score,
+                    inputs=(
+                        "resume",
+                        "job",
+                        "resume_embedding",
+                        "extracted_job_keywords_embedding",
+                        "compatibility",
+                    ),
+                    outputs=(
+                        "cosine_similarity_score",
+                        "validated_original_score",
+                        "compatibility_status",
+                        "warnings",
+                    ),
+                ),
+                Stage(
+                    "improve",
+                    improve,
+                    inputs=(
+                        "resume",
+                        "job",
+                        "extracted_resume_keywords",
+                        "extracted_job_keywords",
+                        "validated_original_score",
+                        "extracted_job_keywords_embedding",
+                    ),
+                    outputs=("updated_resume", "updated_score", "improvement_partial"),
+                ),
+                Stage(
+                    "preview",
+                    preview,
+                    inputs=("updated_resume",),
+                    outputs=("resume_preview", "preview_partial"),
+                ),
+                Stage(
+                    "updated_sections",
+                    updated_sections,
+                    inputs=("updated_resume", "job_requirements"),
+                    outputs=("updated_section_match", "updated_sections_partial"),
+                ),
+                Stage(
+                    "analysis",
+                    analysis,
+                    inputs=(
+                        "resume",
+                        "job",
+                        "extracted_resume_keywords",
+                        "extracted_job_keywords",
+                        "validated_original_score",
+                        "updated_resume",
+                        "updated_score",
+                        "compatibility_status",
+                        "warnings",
+                    ),
+                    outputs=("detailed_analysis",),
+                ),
+            ],
+            inputs=("resume_id", "job_id"),
         )
 
-        resume_preview = await self.get_resume_for_previewer(
-            updated_resume=updated_resume
+    @staticmethod
+    def _section_match(values: Dict[str, Any]) -> Dict[str, Any]:
+        return {
+            "original": values["section_match"],
+            "updated": values["updated_section_match"],
+        }
+
+    @staticmethod
+    def _execution(match: MatchResult) -> Dict:
+        return {
+            "resume_id": match.resume_id,
+            "job_id": match.job_id,
+            "original_score": match.original_score,
+            "new_score": match.new_score,
+            "updated_resume": markdown.markdown(text=match.updated_resume),
+            "resume_preview": match.resume_preview,
+            **(match.analysis or {}),
+            "partial": False,
+        }
+
+    async def _find_match_result(self, resume_id: str, job_id: str) -> Optional[MatchResult]:
+        query = select(MatchResult).where(
+            MatchResult.resume_id == resume_id,
+            MatchResult.job_id == job_id,
+            MatchResult.language == self.language,
+            MatchResult.pipeline_version == self.PIPELINE_VERSION,
         )
+        result = await self.db.execute(query)
+        return result.scalars().first()
 
-        # Generate detailed analysis using the already validated scores
-        detailed_analysis = await self.generate_detailed_analysis(
-            original_score=validated_original_score,  # Use the already validated score
-            new_score=updated_score,
-            extracted_job_keywords=extracted_job_keywords,
-            extracted_resume_keywords=extracted_resume_keywords,
-            job_content=job.content,
-            resume_content=resume.content,
-            compatibility_status=compatibility_status,
-            compatibility_warnings=warnings,
+    async def get_match_result(self, resume_id: str, job_id: str) -> Optional[Dict]:
+        """
+        Returns the stored result of the last run for this resume, job,
+        language and pipeline version, in the same shape as `run`, or None.
+        """
+        match = await self._find_match_result(resume_id, job_id)
+        return self._execution(match) if match else None
+
+    async def _save_match_result(
+        self, resume_id: str, job_id: str, values: Dict[str, Any]
+    ) -> None:
+        """
+        Stores (or replaces) the match result of a finished run. A single
+        upsert, so overlapping runs for the same pair cannot both insert.
+        """
+        key = {
+            "resume_id": resume_id,
+            "job_id": job_id,
+            "language": self.language,
+            "pipeline_version": self.PIPELINE_VERSION,
+        }
+        fields = {
+            "original_score": values["validated_original_score"],
+            "new_score": values["updated_score"],
+            "updated_resume": values["updated_resume"],
+            "resume_preview": values["resume_preview"],
+            "analysis": {
+                **values["detailed_analysis"],
+                "section_match": self._section_match(values),
+            },
+        }
+        statement = sqlite_insert(MatchResult).values(**key, **fields)
+        await self.db.execute(
+            statement.on_conflict_do_update(index_elements=list(key), set_=fields)
         )
+        await self.db.commit()
+
+    async def run(
+        self,
+        resume_id: str,
+        job_id: str,
+        on_event: Optional[StageEventCallback] = None,
+        on_delta: Optional[ImprovementDeltaCallback] = None,
+        on_attempt: Optional[ImprovementAttemptCallback] = None,
+    ) -> Dict:
+        """
+        Main method to run the scoring and improving process and return dict.
+
+        The steps run as a stage graph (see `_pipeline`), so independent
+        stages overlap; per-stage timings and the critical path are logged.
+        `section_match` scores the resume's sections against the job's
+        requirements, before and after the improvement.
+        The result is stored in `match_results` for later reuse, unless it
+        is `partial` because the deadline cut the improvement, the preview or
+        a section match short; a run out of time before the original resume
+        was even scored raises DeadlineExceededError. `on_event` is told when
+        each stage starts and finishes; `on_delta` and `on_attempt` follow
+        the improvement attempts.
+        """
+        pipeline = self._pipeline(on_delta=on_delta, on_attempt=on_attempt)
+        values = (
+            await pipeline.run(on_event=on_event, resume_id=resume_id, job_id=job_id)
+        ).values
 
-        logger.info(f"Resume Preview: {resume_preview}")
-        logger.info(f"Final scores - Raw Cosine: {cosine_similarity_score:.3f}, Validated Original: {validated_original_score:.3f}, Optimized: {updated_score:.3f}")
+        logger.info(f"Resume Preview: {values['resume_preview']}")
+        logger.info(f"Final scores - Raw Cosine: {values['cosine_similarity_score']:.3f}, Validated Original: {values['validated_original_score']:.3f}, Optimized: {values['updated_score']:.3f}")
 
         execution = {
             "resume_id": resume_id,
             "job_id": job_id,
-            "original_score": validated_original_score,  # Show the realistic score from start
-            "new_score": updated_score,  # Score after optimization
-            "updated_resume": markdown.markdown(text=updated_resume),
-            "resume_preview": resume_preview,
-            **detailed_analysis,  # Include details, commentary, and improvements
+            "original_score": values["validated_original_score"],  # Show the realistic score from start
+            "new_score": values["updated_score"],  # Score after optimization
+            "updated_resume": markdown.markdown(text=values["updated_resume"]),
+            "resume_preview": values["resume_preview"],
+            **values["detailed_analysis"],  # Include details, commentary, and improvements
+            "section_match": self._section_match(values),
+            "partial": any(
+                values[name]
+                for name in (
+                    "improvement_partial",
+                    "preview_partial",
+                    "sections_partial",
+                    "updated_sections_partial",
+                )
+            ),
         }
 
+        if execution["partial"]:
+            logger.warning(f"Returning a partial result for {resume_id}/{job_id}, not storing it")
+        else:
+            await self._save_match_result(resume_id, job_id, values)
+
         gc.collect()
 
         return execution
 
-    async def run_and_stream(self, resume_id: str, job_id: str) -> AsyncGenerator:
+    @staticmethod
+    def _stage_payload(stage: str, outputs: Dict[str, Any]) -> Optional[Dict[str, Any]]:
         """
-        Main method to run the scoring and improving process and return dict.
+        The fields of the final result (as returned by `run`) that a finished
+        stage has produced, for streaming; None for internal stages.
         """
+        if stage == "compatibility":
+            level, multiplier, reasons = outputs["compatibility"]
+            return {"compatibility": {"level": level, "multiplier": multiplier, "reasons": reasons}}
+        if stage == "score":
+            return {
+                "original_score": outputs["validated_original_score"],
+                "cosine_similarity_score": outputs["cosine_similarity_score"],
+                "compatibility_status": outputs["compatibility_status"],
+                "warnings": outputs["warnings"],
+            }
+        if stage == "sections":
+            return {"section_match": {"original": outputs["section_match"]}}
+        if stage == "improve":
+            return {
+                "new_score": outputs["updated_score"],
+                "updated_resume": markdown.markdown(text=outputs["updated_resume"]),
+            }
+        if stage == "updated_sections":
+            return {"section_match": {"updated": outputs["updated_section_match"]}}
+        if stage == "preview":
+            return {"resume_preview": outputs["resume_preview"]}
+        if stage == "analysis":
+            return outputs["detailed_analysis"]
+        return None
 
-        yield f"data: {json.dumps({'status': 'starting', 'message': 'Analyzing resume and job description...'})}\n\n"
-        await asyncio.sleep(2)
-
-        resume, processed_resume = await self._get_resume(resume_id)
-        job, processed_job = await self._get_job(job_id)
-
-        yield f"data: {json.dumps({'status': 'parsing', 'message': 'Parsing resume content...'})}\n\n"
-        await asyncio.sleep(2)
-
-        if processed_job.extracted_keywords:
-            try:
-                keywords_data = json.loads(processed_job.extracted_keywords)
-                extracted_job_keywords = ", ".join(keywords_data.get("extracted_keywords", []))
-            except (json.JSONDecodeError, TypeError):
-                extracted_job_keywords = ""
-        else:
-            extracted_job_keywords = ""
+    async def run_and_stream(self, resume_id: str, job_id: str) -> AsyncGenerator:
+        """
+        Runs `run` and streams its progress as Server-Sent Events:
 
-        if processed_resume and processed_resume.extracted_keywords:
-            try:
-                keywords_data = json.loads(processed_resume.extracted_keywords)
-                if keywords_data:
-                    extracted_resume_keywords = ", ".join(
-                        keywords_data.get("extracted_keywords", [])
-                    )
-                else:
-                    extracted_resume_keywords = ""
-            except (json.JSONDecodeError, TypeError):
-                extracted_resume_keywords = ""
-        else:
-            extracted_resume_keywords = ""
+        * `stage` events the moment each stage starts and finishes, finished
+          ones carrying the fields of the final result the stage produced;
+        * `suggestion` events with each improvement attempt's text as it is
+          generated, and an `attempt` event with its score;
+        * `completed` with the same result `run` returns, or `error`.
 
-        resume_embedding = await self.embedding_manager.embed(text=resume.content)
-        extracted_job_keywords_embedding = await self.embedding_manager.embed(
-            text=extracted_job_keywords
-        )
+        A comment line is sent as a keep-alive whenever nothing else was sent
+        for STREAM_HEARTBEAT_INTERVAL seconds.
+        """
+        events: asyncio.Queue = asyncio.Queue()
+        index = 0
 
-        yield f"data: {json.dumps({'status': 'scoring', 'message': 'Calculating compatibility score...'})}\n\n"
-        await asyncio.sleep(3)
+        async def on_event(stage: str, event: str, outputs: Dict[str, Any]) -> None:
+            message: Dict[str, Any] = {"status": "stage", "stage": stage, "event": event}
+            data = self._stage_payload(stage, outputs) if event == "finished" else None
+            if data:
+                message["data"] = data
+            await events.put(message)
+            if stage == "score" and event == "finished":
+                await events.put({"status": "scored", "score": outputs["validated_original_score"]})
 
-        cosine_similarity_score = self.calculate_cosine_similarity(
-            extracted_job_keywords_embedding, resume_embedding
-        )
+        async def on_delta(attempt: int, delta: str) -> None:
+            nonlocal index
+            await events.put({"status": "suggestion", "index": index, "attempt": attempt, "text": delta})
+            index += 1
 
-        yield f"data: {json.dumps({'status': 'scored', 'score': cosine_similarity_score})}\n\n"
+        async def on_attempt(attempt: int, score: float) -> None:
+            await events.put({"status": "attempt", "attempt": attempt, "score": score})
 
-        yield f"data: {json.dumps({'status': 'improving', 'message': 'Generating improvement suggestions...'})}\n\n"
-        await asyncio.sleep(3)
+        yield f"data: {json.dumps({'status': 'starting', 'message': 'Analyzing resume and job description...'})}\n\n"
 
-        updated_resume, updated_score = await self.improve_score_with_llm(
-            resume=resume.content,
-            extracted_resume_keywords=extracted_resume_keywords,
-            job=job.content,
-            extracted_job_keywords=extracted_job_keywords,
-            previous_cosine_similarity_score=cosine_similarity_score,
-            extracted_job_keywords_embedding=extracted_job_keywords_embedding,
+        run = asyncio.create_task(
+            self.run(
+                resume_id,
+                job_id,
+                on_event=on_event,
+                on_delta=on_delta,
+                on_attempt=on_attempt,
+            )
         )
+        run.add_done_callback(lambda _: events.put_nowait(None))
+        getter: Optional[asyncio.Future] = None
+        try:
+            while True:
+                if getter is None:
+                    getter = asyncio.ensure_future(events.get())
+                done, _ = await asyncio.wait({getter}, timeout=settings.STREAM_HEARTBEAT_INTERVAL)
+                if not done:
+                    yield ": keep-alive\n\n"
+                    continue
+                message, getter = getter.result(), None
+                if message is None:
+                    break
+                yield f"data: {json.dumps(message)}\n\n"
+            result = await run
+        except Exception as e:
+            logger.error(f"Streaming analysis failed: {e}")
+            yield f"data: {json.dumps({'status': 'error', 'message': str(e)})}\n\n"
+            return
+        finally:
+            if getter is not None:
+                getter.cancel()
+            if not run.done():
+                run.cancel()
 
-        for i, suggestion in enumerate(updated_resume):
-            yield f"data: {json.dumps({'status': 'suggestion', 'index': i, 'text': suggestion})}\n\n"
-            await asyncio.sleep(0.2)
-
-        final_result = {
-            "resume_id": resume_id,
-            "job_id": job_id,
-            "original_score": cosine_similarity_score,
-            "new_score": updated_score,
-            "updated_resume": markdown.markdown(text=updated_resume),
-        }
-
-        yield f"data: {json.dumps({'status': 'completed', 'result': final_result})}\n\n"
+        yield f"data: {json.dumps({'status': 'completed', 'result': result})}\n\n"
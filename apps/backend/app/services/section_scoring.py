@@ -0,0 +1,201 @@
+import re
+import json
+import logging
+import numpy as np
+
+from typing import Any, Dict, List
+
+from app.agent import EmbeddingManager, content_hash, normalize_text
+from .vector_index import normalize_rows
+
+logger = logging.getLogger(__name__)
+
+# ProcessedResume columns that become sections, one section per entry.
+RESUME_SECTION_FIELDS = ("experiences", "projects", "research_work", "education")
+# ProcessedResume columns that become a single section each.
+RESUME_GROUPED_FIELDS = ("skills", "achievements")
+
+# Entry fields that say nothing about fit and would only add noise.
+_SKIPPED_KEYS = {"start_date", "end_date", "startDate", "endDate", "link", "date"}
+
+_HEADING = re.compile(r"^\s{0,3}#{1,6}\s+(.*?)\s*#*\s*$")
+
+
+def _load(value: Any, key: str) -> List[Any]:
+    """
+    Entries of a processed JSON column, stored either as `{key: [...]}`, a
+    bare list or a JSON string of either.
+    """
+    if not value:
+        return []
+    if isinstance(value, str):
+        try:
+            value = json.loads(value)
+        except (json.JSONDecodeError, TypeError):
+            return [value]
+    if isinstance(value, dict):
+        value = value.get(key, value)
+    if isinstance(value, list):
+        return value
+    return [value]
+
+
+def _text(entry: Any) -> str:
+    if isinstance(entry, dict):
+        parts = (_text(v) for k, v in entry.items() if k not in _SKIPPED_KEYS)
+        return ". ".join(part for part in parts if part)
+    if isinstance(entry, list):
+        return ", ".join(part for part in map(_text, entry) if part)
+    return str(entry).strip() if entry is not None else ""
+
+
+def resume_sections(processed_resume) -> Dict[str, str]:
+    """
+    The resume's sections as {name: text}, e.g. "experiences[0]", "skills".
+    """
+    sections: Dict[str, str] = {}
+    if processed_resume is None:
+        return sections
+    for field in RESUME_SECTION_FIELDS:
+        for index, entry in enumerate(_load(getattr(processed_resume, field), field)):
+            text = _text(entry)
+            if text:
+                sections[f"{field}[{index}]"] = text
+    for field in RESUME_GROUPED_FIELDS:
+        text = _text(_load(getattr(processed_resume, field), field))
+        if text:
+            sections[field] = text
+    return sections
+
+
+def job_requirements(processed_job) -> Dict[str, str]:
+    """
+    The job's requirements as {name: text}: every key responsibility and
+    required/preferred qualification, or the job summary when there are none.
+    """
+    requirements: Dict[str, str] = {}
+    if processed_job is None:
+        return requirements
+    for index, entry in enumerate(
+        _load(processed_job.key_responsibilities, "key_responsibilities")
+    ):
+        if _text(entry):
+            requirements[f"responsibilities[{index}]"] = _text(entry)
+    qualifications = processed_job.qualifications
+    if isinstance(qualifications, str):
+        try:
+            qualifications = json.loads(qualifications)
+        except (json.JSONDecodeError, TypeError):
+            qualifications = None
+    if isinstance(qualifications, dict):
+        for kind in ("required", "preferred"):
+            for index, entry in enumerate(qualifications.get(kind) or []):
+                if _text(entry):
+                    requirements[f"{kind}[{index}]"] = _text(entry)
+    if not requirements and processed_job.job_summary:
+        requirements["summary"] = processed_job.job_summary
+    return requirements
+
+
+def markdown_sections(text: str) -> Dict[str, str]:
+    """
+    Splits a markdown resume into one section per heading (of any level), so
+    an edit to one entry only changes that entry's section.
+    """
+    sections: Dict[str, str] = {}
+    name, lines = "preamble", []
+
+    def flush() -> None:
+        body = "\n".join(lines).strip()
+        if body:
+            key, suffix = name, 2
+            while key in sections:
+                key, suffix = f"{name} ({suffix})", suffix + 1
+            sections[key] = f"{name}\n{body}" if name != "preamble" else body
+
+    for line in text.splitlines():
+        heading = _HEADING.match(line)
+        if heading:
+            flush()
+            name, lines = heading.group(1) or "section", []
+        else:
+            lines.append(line)
+    flush()
+    return sections
+
+
+class SectionScorer:
+    """
+    Scores resume sections against job requirements as one vectorized
+    sections x requirements cosine-similarity matrix.
+
+    Section embeddings are kept by content hash for the scorer's lifetime
+    (and by text in the embedding cache across requests), so re-scoring a
+    revised resume only embeds the sections whose text changed.
+    """
+
+    def __init__(self, embedding_manager: EmbeddingManager) -> None:
+        self._embedding_manager = embedding_manager
+        self._vectors: Dict[str, np.ndarray] = {}
+        self.embedded = 0
+
+    async def embed(self, texts: List[str], **kwargs: Any) -> np.ndarray:
+        """
+        Normalized embeddings of `texts`, one row each; only texts not seen
+        by this scorer before are sent to the embedding manager (with
+        `kwargs`, e.g. a `deadline`).
+        """
+        hashes = [content_hash(normalize_text(text)) for text in texts]
+        missing = {h: text for h, text in zip(hashes, texts) if h not in self._vectors}
+        if missing:
+            vectors = normalize_rows(
+                np.asarray(
+                    await self._embedding_manager.embed_many(list(missing.values()), **kwargs),
+                    dtype=np.float32,
+                )
+            )
+            self._vectors.update(zip(missing, vectors))
+            self.embedded += len(missing)
+            logger.info(f"Embedded {len(missing)} new of {len(texts)} section text(s)")
+        if not texts:
+            return np.zeros((0, 0), dtype=np.float32)
+        return np.stack([self._vectors[h] for h in hashes])
+
+    async def compare(
+        self, sections: Dict[str, str], requirements: Dict[str, str]
+    ) -> Dict[str, Any]:
+        """
+        Best-matching requirement per section and best-covering section per
+        requirement. `coverage` is the mean best score over requirements.
+        """
+        result: Dict[str, Any] = {"sections": [], "requirements": [], "coverage": None}
+        if not sections or not requirements:
+            return result
+
+        section_names, requirement_names = list(sections), list(requirements)
+        vectors = await self.embed(
+            list(sections.values()) + list(requirements.values())
+        )
+        matrix = vectors[: len(sections)] @ vectors[len(sections) :].T
+
+        best_requirement = matrix.argmax(axis=1)
+        best_section = matrix.argmax(axis=0)
+        result["sections"] = [
+            {
+                "section": name,
+                "score": float(matrix[i, best_requirement[i]]),
+                "requirement": requirement_names[best_requirement[i]],
+            }
+            for i, name in enumerate(section_names)
+        ]
+        result["requirements"] = [
+            {
+                "requirement": name,
+                "text": requirements[name],
+                "score": float(matrix[best_section[j], j]),
+                "section": section_names[best_section[j]],
+            }
+            for j, name in enumerate(requirement_names)
+        ]
+        result["coverage"] = float(matrix.max(axis=0).mean())
+        return result
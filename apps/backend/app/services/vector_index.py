@@ -0,0 +1,173 @@
+import logging
+import numpy as np
+
+from typing import Dict, List, Optional, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+def normalize_rows(matrix: np.ndarray) -> np.ndarray:
+    """
+    L2-normalizes every row as float32; all-zero rows stay zero.
+    """
+    matrix = np.atleast_2d(np.asarray(matrix, dtype=np.float32))
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    return matrix / np.where(norms == 0, 1.0, norms)
+
+
+class VectorIndex:
+    """
+    In-process cosine-similarity index over L2-normalized float32 vectors.
+
+    Vectors live in one contiguous, geometrically grown matrix, so exact
+    search is a single matrix-vector product plus a partial sort. Once the
+    index is trained (`train_ivf`), searches are approximate in IVF style:
+    every row is assigned to its nearest of `nlist` k-means centroids and a
+    query only scores the rows of its `nprobe` nearest centroids. Inserts after
+    training are assigned to a centroid immediately; `train_ivf` again to
+    rebalance after heavy growth.
+    """
+
+    def __init__(self, nprobe: int = 8) -> None:
+        self.nprobe = max(1, nprobe)
+        self._vectors: Optional[np.ndarray] = None
+        self._assign: Optional[np.ndarray] = None
+        self._centroids: Optional[np.ndarray] = None
+        self._ids: List[str] = []
+        self._positions: Dict[str, int] = {}
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def __contains__(self, doc_id: str) -> bool:
+        return doc_id in self._positions
+
+    @property
+    def dim(self) -> Optional[int]:
+        return None if self._vectors is None else self._vectors.shape[1]
+
+    @property
+    def trained(self) -> bool:
+        return self._centroids is not None
+
+    def _reserve(self, size: int, dim: int) -> None:
+        if self._vectors is None:
+            capacity = max(64, size)
+            self._vectors = np.zeros((capacity, dim), dtype=np.float32)
+            self._assign = np.zeros(capacity, dtype=np.int32)
+            return
+        if dim != self._vectors.shape[1]:
+            raise ValueError(f"vector dimension {dim} does not match index dimension {self.dim}")
+        if size > len(self._vectors):
+            capacity = max(size, 2 * len(self._vectors))
+            vectors = np.zeros((capacity, dim), dtype=np.float32)
+            vectors[: len(self)] = self._vectors[: len(self)]
+            assign = np.zeros(capacity, dtype=np.int32)
+            assign[: len(self)] = self._assign[: len(self)]
+            self._vectors, self._assign = vectors, assign
+
+    def get(self, doc_id: str) -> Optional[np.ndarray]:
+        position = self._positions.get(doc_id)
+        return None if position is None else self._vectors[position].copy()
+
+    def add(self, ids: Sequence[str], vectors: np.ndarray) -> None:
+        """
+        Insert or replace vectors; they are normalized on the way in.
+        """
+        if not len(ids):
+            return
+        vectors = normalize_rows(vectors)
+        new = sum(1 for doc_id in dict.fromkeys(ids) if doc_id not in self._positions)
+        self._reserve(len(self) + new, vectors.shape[1])
+        for doc_id, vector in zip(ids, vectors):
+            position = self._positions.get(doc_id)
+            if position is None:
+                position = len(self._ids)
+                self._ids.append(doc_id)
+                self._positions[doc_id] = position
+            self._vectors[position] = vector
+            if self._centroids is not None:
+                self._assign[position] = int(np.argmax(self._centroids @ vector))
+
+    def remove(self, doc_id: str) -> None:
+        position = self._positions.pop(doc_id, None)
+        if position is None:
+            return
+        last = len(self._ids) - 1
+        if position != last:
+            moved = self._ids[last]
+            self._ids[position] = moved
+            self._positions[moved] = position
+            self._vectors[position] = self._vectors[last]
+            self._assign[position] = self._assign[last]
+        self._ids.pop()
+
+    def clear(self) -> None:
+        self._vectors = self._assign = self._centroids = None
+        self._ids = []
+        self._positions = {}
+
+    def train_ivf(self, nlist: Optional[int] = None, iterations: int = 10, seed: int = 0) -> None:
+        """
+        Cluster the stored vectors with spherical k-means (default nlist is
+        about sqrt(n)) and assign every row to its nearest centroid.
+        """
+        size = len(self)
+        if size == 0:
+            return
+        nlist = min(size, nlist or max(1, int(np.sqrt(size))))
+        data = self._vectors[:size]
+        rng = np.random.default_rng(seed)
+        centroids = data[rng.choice(size, nlist, replace=False)].copy()
+        for _ in range(iterations):
+            assign = np.argmax(data @ centroids.T, axis=1)
+            sums = np.zeros_like(centroids)
+            np.add.at(sums, assign, data)
+            empty = ~np.bincount(assign, minlength=nlist).astype(bool)
+            sums[empty] = centroids[empty]
+            centroids = normalize_rows(sums)
+        self._centroids = centroids
+        self._assign[:size] = np.argmax(data @ centroids.T, axis=1)
+        logger.info(f"vector index trained: {size} vectors in {nlist} lists")
+
+    def search(
+        self, query: np.ndarray, k: int = 10, exact: bool = False, exclude: Sequence[str] = ()
+    ) -> List[Tuple[str, float]]:
+        """
+        Top-`k` (id, cosine similarity) pairs for `query`, best first.
+        """
+        size = len(self)
+        if size == 0 or k <= 0:
+            return []
+        query = normalize_rows(query)[0]
+        rows = None
+        if self._centroids is not None and not exact:
+            probe = np.argsort(-(self._centroids @ query))[: self.nprobe]
+            rows = np.flatnonzero(np.isin(self._assign[:size], probe))
+            scores = self._vectors[rows] @ query
+        else:
+            scores = self._vectors[:size] @ query
+
+        excluded = [self._positions[d] for d in exclude if d in self._positions]
+        if excluded:
+            mask = np.isin(rows, excluded) if rows is not None else np.isin(np.arange(size), excluded)
+            scores = np.where(mask, -np.inf, scores)
+
+        k = min(k, len(scores))
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top], kind="stable")]
+        positions = top if rows is None else rows[top]
+        return [
+            (self._ids[position], float(score))
+            for position, score in zip(positions.tolist(), scores[top].tolist())
+            if score != -np.inf
+        ]
+
+    def stats(self) -> Dict[str, int | str | None]:
+        return {
+            "size": len(self),
+            "dim": self.dim,
+            "mode": "ivf" if self.trained else "exact",
+            "lists": None if self._centroids is None else len(self._centroids),
+            "nprobe": self.nprobe,
+        }
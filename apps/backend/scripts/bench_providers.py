@@ -0,0 +1,132 @@
+"""
+Throughput of the Ollama providers under concurrent analyses: the native
+async clients against the previous blocking clients run in anyio's worker
+threads (40 by default).
+
+Starts a stub Ollama server in a subprocess (0.5 s per generation, 0.05 s
+per embedding) and runs N simulated /improve pipelines at once for each
+concurrency level:
+
+    cd apps/backend && python -m scripts.bench_providers 40 80 160 320
+"""
+
+import sys
+import time
+import asyncio
+import argparse
+import subprocess
+
+import httpx
+import ollama
+
+from typing import Any, List
+from fastapi.concurrency import run_in_threadpool
+
+from app.agent.providers.base import Provider, EmbeddingProvider
+from app.agent.providers.ollama import OllamaProvider, OllamaEmbeddingProvider
+from scripts.stub_ollama import GENERATION_MODEL, EMBEDDING_MODEL
+
+
+class ThreadpoolOllamaProvider(Provider):
+    """
+    The blocking client in a worker thread, as the providers used to call it.
+    """
+
+    def __init__(self, host: str) -> None:
+        self.model = GENERATION_MODEL
+        self._client = ollama.Client(host=host)
+
+    async def __call__(self, prompt: str, **generation_args: Any) -> str:
+        response = await run_in_threadpool(self._client.generate, prompt=prompt, model=self.model)
+        return response["response"].strip()
+
+
+class ThreadpoolOllamaEmbeddingProvider(EmbeddingProvider):
+    def __init__(self, host: str) -> None:
+        self._client = ollama.Client(host=host)
+
+    async def embed(self, text: str) -> List[float]:
+        return (await self.embed_many([text]))[0]
+
+    async def embed_many(self, texts: List[str]) -> List[List[float]]:
+        response = await run_in_threadpool(self._client.embed, input=texts, model=EMBEDDING_MODEL)
+        return list(response.embeddings)
+
+
+async def pipeline(generate: Provider, embedding: EmbeddingProvider) -> None:
+    """
+    The model calls of one /improve run: resume and job embeddings, the
+    compatibility analysis, two rewrite + embed rounds and the preview.
+    """
+    await asyncio.gather(embedding.embed("resume"), embedding.embed("job keywords"))
+    await generate("compatibility")
+    for attempt in range(2):
+        await generate("improve")
+        await embedding.embed(f"candidate {attempt}")
+    await generate("preview")
+
+
+async def measure(label: str, generate: Provider, embedding: EmbeddingProvider, levels: List[int]) -> None:
+    await pipeline(generate, embedding)
+    for concurrency in levels:
+        start = time.perf_counter()
+        await asyncio.gather(*(pipeline(generate, embedding) for _ in range(concurrency)))
+        elapsed = time.perf_counter() - start
+        print(
+            f"{label:10s} concurrency={concurrency:4d} "
+            f"wall={elapsed:6.2f}s pipelines/s={concurrency / elapsed:6.1f}"
+        )
+
+
+def wait_until_up(host: str, timeout: float = 15.0) -> None:
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            httpx.get(f"{host}/api/tags").raise_for_status()
+            return
+        except httpx.HTTPError:
+            if time.monotonic() > deadline:
+                raise
+            time.sleep(0.1)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("levels", nargs="*", type=int, default=[40, 80, 160, 320])
+    parser.add_argument("--port", type=int, default=11599)
+    parser.add_argument("--stub-workers", type=int, default=4)
+    args = parser.parse_args()
+
+    host = f"http://127.0.0.1:{args.port}"
+    stub = subprocess.Popen(
+        [
+            sys.executable, "-m", "scripts.stub_ollama",
+            "--port", str(args.port),
+            "--workers", str(args.stub_workers),
+        ]
+    )
+    try:
+        wait_until_up(host)
+        asyncio.run(
+            measure(
+                "threadpool",
+                ThreadpoolOllamaProvider(host),
+                ThreadpoolOllamaEmbeddingProvider(host),
+                args.levels,
+            )
+        )
+        asyncio.run(
+            measure(
+                "async",
+                OllamaProvider(GENERATION_MODEL, host=host),
+                OllamaEmbeddingProvider(EMBEDDING_MODEL, host=host),
+                args.levels,
+            )
+        )
+    finally:
+        stub.terminate()
+        stub.wait()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,138 @@
+"""
+Latency of the score-only endpoint against the full LLM pipeline.
+
+Seeds one resume and one job in a throwaway database, then calls
+/api/v1/resumes/improve and /api/v1/scores/pair (with and without the
+compatibility verdict) one request at a time, in process. The LLM and the
+embedding model are a stub Ollama server with a fixed latency per
+generation, so /improve measures the pipeline's call overhead, not a
+model's. Every endpoint is warmed up once before it is timed:
+
+    cd apps/backend && python -m scripts.bench_score_pair
+"""
+
+import os
+import json
+import time
+import asyncio
+import argparse
+import tempfile
+
+# Settings are read at import time: no response cache, and a throwaway
+# database and cache directory.
+_WORK_DIR = tempfile.mkdtemp(prefix="bench-score-pair-")
+os.environ["CACHE_DIR"] = _WORK_DIR
+os.environ["RESPONSE_CACHE_ENABLED"] = "false"
+os.environ["OLLAMA_HOSTS"] = "[]"
+os.environ["SYNC_DATABASE_URL"] = f"sqlite:///{_WORK_DIR}/app.db"
+os.environ["ASYNC_DATABASE_URL"] = f"sqlite+aiosqlite:///{_WORK_DIR}/app.db"
+os.environ.setdefault("SESSION_SECRET_KEY", "bench")
+
+import httpx  # noqa: E402
+import numpy as np  # noqa: E402
+
+from typing import Any, Dict, List  # noqa: E402
+
+from app.base import create_app  # noqa: E402
+from app.core.database import AsyncSessionLocal  # noqa: E402
+from app.models import Resume, ProcessedResume, Job, ProcessedJob  # noqa: E402
+from scripts.stub_ollama import StubOllama, serve  # noqa: E402
+
+RESUME_ID = "11111111-1111-1111-1111-111111111111"
+JOB_ID = "22222222-2222-2222-2222-222222222222"
+RESUME = """# Jane Doe
+
+Senior software engineer: backend microservices in Python and Java, REST API
+design, PostgreSQL, Docker, code reviews and mentoring.
+"""
+JOB = """Backend software engineer. You will build Python microservices and REST
+APIs on PostgreSQL, ship them with Docker and review your colleagues' code.
+"""
+KEYWORDS = ["python", "microservices", "rest api", "postgresql", "docker", "code review"]
+
+
+async def seed() -> None:
+    async with AsyncSessionLocal() as db:
+        db.add(Resume(resume_id=RESUME_ID, content=RESUME, content_type="md"))
+        db.add(
+            ProcessedResume(
+                resume_id=RESUME_ID,
+                personal_data={"firstName": "Jane", "lastName": "Doe"},
+                extracted_keywords=json.dumps({"extracted_keywords": KEYWORDS}),
+            )
+        )
+        db.add(Job(job_id=JOB_ID, resume_id=RESUME_ID, content=JOB))
+        db.add(
+            ProcessedJob(
+                job_id=JOB_ID,
+                job_title="Backend software engineer",
+                job_summary=JOB,
+                extracted_keywords=json.dumps({"extracted_keywords": KEYWORDS}),
+            )
+        )
+        await db.commit()
+
+
+async def measure(client: httpx.AsyncClient, method: str, url: str, n: int, **kwargs: Any) -> List[float]:
+    async def call() -> None:
+        response = await client.request(method, url, **kwargs)
+        response.raise_for_status()
+
+    await call()
+    seconds = []
+    for _ in range(n):
+        start = time.perf_counter()
+        await call()
+        seconds.append(time.perf_counter() - start)
+    return seconds
+
+
+def report(label: str, seconds: List[float]) -> None:
+    ms = np.array(seconds) * 1000
+    print(
+        f"  {label:40s} p50 {np.percentile(ms, 50):6.1f}ms  "
+        f"p99 {np.percentile(ms, 99):6.1f}ms  (n={len(ms)})"
+    )
+
+
+async def bench(improve_runs: int, pair_runs: int) -> Dict[str, List[float]]:
+    app = create_app()
+    pair: Dict[str, Any] = {"resume_id": RESUME_ID, "job_id": JOB_ID}
+    async with app.router.lifespan_context(app):
+        await seed()
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+            return {
+                "/resumes/improve": await measure(
+                    client, "POST", "/api/v1/resumes/improve", improve_runs, json=pair
+                ),
+                "/scores/pair": await measure(
+                    client, "GET", "/api/v1/scores/pair", pair_runs, params=pair
+                ),
+                "/scores/pair?include_compatibility=true": await measure(
+                    client,
+                    "GET",
+                    "/api/v1/scores/pair",
+                    pair_runs,
+                    params={**pair, "include_compatibility": "true"},
+                ),
+            }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--llm-latency", type=float, default=0.2)
+    parser.add_argument("--improve-runs", type=int, default=15)
+    parser.add_argument("--pair-runs", type=int, default=500)
+    args = parser.parse_args()
+
+    with serve(StubOllama(generate_latency=args.llm_latency)) as host:
+        os.environ["OLLAMA_HOST"] = host
+        results = asyncio.run(bench(args.improve_runs, args.pair_runs))
+    print(f"Stub Ollama, {args.llm_latency}s per generation:")
+    for label, seconds in results.items():
+        report(label, seconds)
+
+
+if __name__ == "__main__":
+    main()
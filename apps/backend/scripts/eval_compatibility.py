@@ -0,0 +1,112 @@
+"""
+Accuracy and latency of the local compatibility pre-classifier.
+
+Runs every resume/job pair of scripts/data/compatibility_pairs.json through
+ProfessionalCompatibilityValidator, with the domain pre-classifier (keywords
+only, then keywords plus centroid embeddings) and without it. The LLM and
+the embedding model are a stub Ollama server with a fixed latency per
+generation, so the LLM column measures the call overhead, not a model's
+judgement. Each pair is labelled with the verdict the compatibility prompt
+asks for, or null where the texts are too vague and the pair should go to
+the LLM:
+
+    cd apps/backend && python -m scripts.eval_compatibility
+"""
+
+import os
+import json
+import time
+import asyncio
+import argparse
+import tempfile
+
+# Settings are read at import time: no caches, a throwaway database, and no
+# default pre-classifier, so the "LLM only" run (classifier=None) has none.
+_WORK_DIR = tempfile.mkdtemp(prefix="eval-compatibility-")
+os.environ["CACHE_DIR"] = _WORK_DIR
+os.environ["COMPATIBILITY_CACHE_ENABLED"] = "false"
+os.environ["COMPATIBILITY_PRECLASSIFIER_ENABLED"] = "false"
+os.environ["RESPONSE_CACHE_ENABLED"] = "false"
+os.environ["OLLAMA_HOSTS"] = "[]"
+os.environ.setdefault("SYNC_DATABASE_URL", f"sqlite:///{_WORK_DIR}/app.db")
+os.environ.setdefault("ASYNC_DATABASE_URL", f"sqlite+aiosqlite:///{_WORK_DIR}/app.db")
+os.environ.setdefault("SESSION_SECRET_KEY", "eval")
+
+from typing import Any, Dict, List, Optional  # noqa: E402
+
+from app.services.compatibility_validator import ProfessionalCompatibilityValidator  # noqa: E402
+from app.services.domain_classifier import DomainClassifier  # noqa: E402
+from scripts.stub_ollama import StubOllama, serve  # noqa: E402
+
+CORPUS = os.path.join(os.path.dirname(__file__), "data", "compatibility_pairs.json")
+
+
+async def run(corpus: Dict[str, Any], classifier: Optional[DomainClassifier]) -> List[Dict[str, Any]]:
+    results = []
+    for pair in corpus["pairs"]:
+        validator = ProfessionalCompatibilityValidator(classifier=classifier)
+        escalated = classifier.escalated if classifier else 0
+        start = time.perf_counter()
+        level, _, _ = await validator.analyze_compatibility_with_ai(
+            corpus["resumes"][pair["resume"]], corpus["jobs"][pair["job"]]
+        )
+        results.append(
+            {
+                **pair,
+                "level": level,
+                "local": classifier is not None and classifier.escalated == escalated,
+                "seconds": time.perf_counter() - start,
+            }
+        )
+    return results
+
+
+def report(label: str, results: List[Dict[str, Any]]) -> None:
+    local = [r for r in results if r["local"]]
+    llm = [r for r in results if not r["local"]]
+    labelled = [r for r in local if r["expected"] is not None]
+    agree = sum(1 for r in labelled if r["level"] == r["expected"])
+    total = sum(r["seconds"] for r in results)
+    print(f"{label}:")
+    print(f"  decided locally  {len(local)}/{len(results)} ({len(local) / len(results):.0%})")
+    if labelled:
+        print(f"  agreement        {agree}/{len(labelled)} locally decided pairs match the label")
+    print(f"  vague decided    {sum(1 for r in local if r['expected'] is None)} (should be 0)")
+    if local:
+        print(f"  local decision   {sum(r['seconds'] for r in local) / len(local) * 1000:.1f} ms/pair")
+    if llm:
+        print(f"  LLM call         {sum(r['seconds'] for r in llm) / len(llm) * 1000:.1f} ms/pair")
+    print(f"  total            {total:.2f} s")
+
+
+async def evaluate(corpus: Dict[str, Any], verbose: bool) -> None:
+    for use_embeddings in (False, True):
+        classifier = DomainClassifier(use_embeddings=use_embeddings)
+        await classifier.classify("warm up")
+        results = await run(corpus, classifier)
+        report(f"pre-classifier, embeddings={use_embeddings}", results)
+        if verbose:
+            for r in results:
+                mark = "local" if r["local"] else "llm"
+                print(
+                    f"    {r['resume']:8s} {r['job']:8s} {mark:5s} "
+                    f"{r['level']:12s} expected {r['expected']}"
+                )
+    report("LLM only", await run(corpus, None))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--llm-latency", type=float, default=0.2)
+    parser.add_argument("--verbose", action="store_true")
+    args = parser.parse_args()
+
+    with open(CORPUS, encoding="utf-8") as f:
+        corpus = json.load(f)
+    with serve(StubOllama(generate_latency=args.llm_latency)) as host:
+        os.environ["OLLAMA_HOST"] = host
+        asyncio.run(evaluate(corpus, args.verbose))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,168 @@
+import os
+import json
+import time
+import socket
+import asyncio
+import hashlib
+import argparse
+import threading
+import contextlib
+
+import numpy as np
+import uvicorn
+
+from typing import Iterator, Optional, Sequence
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import JSONResponse, StreamingResponse
+from starlette.routing import Route
+
+GENERATION_MODEL = "gemma3:4b"
+EMBEDDING_MODEL = "nomic-embed-text:137m-v1.5-fp16"
+
+DEFAULT_RESPONSE = '{"compatibility_level": "high", "score_multiplier": 0.95}'
+
+
+class StubOllama:
+    """
+    A stand-in for an Ollama server, for benchmarks and tests.
+
+    Serves /api/tags, /api/generate (plain and streamed) and /api/embed with a
+    fixed latency per call. Embeddings are deterministic per text. Setting
+    `down` makes every endpoint answer 503 and `fail_generate` makes
+    generations answer 500, so health probes and failover can be exercised.
+    `calls` counts the requests per endpoint.
+    """
+
+    def __init__(
+        self,
+        models: Sequence[str] = (GENERATION_MODEL, EMBEDDING_MODEL),
+        generate_latency: float = 0.0,
+        embed_latency: float = 0.0,
+        response: str = DEFAULT_RESPONSE,
+        dim: int = 8,
+        digest: str = "stub",
+    ) -> None:
+        self.models = list(models)
+        self.generate_latency = generate_latency
+        self.embed_latency = embed_latency
+        self.response = response
+        self.dim = dim
+        self.digest = digest
+        self.down = False
+        self.fail_generate = False
+        self.calls = {"tags": 0, "generate": 0, "embed": 0}
+        self.app = Starlette(
+            routes=[
+                Route("/api/tags", self._tags),
+                Route("/api/generate", self._generate, methods=["POST"]),
+                Route("/api/embed", self._embed, methods=["POST"]),
+            ]
+        )
+
+    def vector(self, text: str) -> list:
+        seed = int(hashlib.sha256(text.encode()).hexdigest()[:8], 16)
+        return np.random.default_rng(seed).normal(size=self.dim).tolist()
+
+    async def _tags(self, request: Request) -> JSONResponse:
+        self.calls["tags"] += 1
+        if self.down:
+            return JSONResponse({"error": "unavailable"}, status_code=503)
+        return JSONResponse(
+            {
+                "models": [
+                    {"name": model, "model": model, "digest": f"{self.digest}:{model}"}
+                    for model in self.models
+                ]
+            }
+        )
+
+    async def _generate(self, request: Request):
+        self.calls["generate"] += 1
+        body = await request.json()
+        if self.down:
+            return JSONResponse({"error": "unavailable"}, status_code=503)
+        if self.fail_generate:
+            return JSONResponse({"error": "generation failed"}, status_code=500)
+        if body.get("model") not in self.models:
+            return JSONResponse({"error": f"model '{body.get('model')}' not found"}, status_code=404)
+        if not body.get("stream"):
+            await asyncio.sleep(self.generate_latency)
+            return JSONResponse({"model": body["model"], "response": self.response, "done": True})
+
+        words = self.response.split(" ")
+
+        async def deltas():
+            for index, word in enumerate(words):
+                await asyncio.sleep(self.generate_latency / len(words))
+                delta = word if index == len(words) - 1 else word + " "
+                yield json.dumps({"model": body["model"], "response": delta, "done": False}) + "\n"
+            yield json.dumps({"model": body["model"], "response": "", "done": True}) + "\n"
+
+        return StreamingResponse(deltas(), media_type="application/x-ndjson")
+
+    async def _embed(self, request: Request) -> JSONResponse:
+        self.calls["embed"] += 1
+        body = await request.json()
+        if self.down:
+            return JSONResponse({"error": "unavailable"}, status_code=503)
+        if body.get("model") not in self.models:
+            return JSONResponse({"error": f"model '{body.get('model')}' not found"}, status_code=404)
+        texts = body["input"] if isinstance(body["input"], list) else [body["input"]]
+        await asyncio.sleep(self.embed_latency)
+        return JSONResponse({"model": body["model"], "embeddings": [self.vector(t) for t in texts]})
+
+
+@contextlib.contextmanager
+def serve(stub: StubOllama) -> Iterator[str]:
+    """
+    Run `stub` on a free local port in a background thread and yield its URL.
+    """
+    sock = socket.socket()
+    sock.bind(("127.0.0.1", 0))
+    server = uvicorn.Server(uvicorn.Config(stub.app, log_level="warning", lifespan="off"))
+    thread = threading.Thread(target=server.run, kwargs={"sockets": [sock]}, daemon=True)
+    thread.start()
+    deadline = time.monotonic() + 10
+    while not server.started:
+        if time.monotonic() > deadline:
+            raise RuntimeError("stub Ollama server did not start")
+        time.sleep(0.01)
+    try:
+        yield f"http://127.0.0.1:{sock.getsockname()[1]}"
+    finally:
+        server.should_exit = True
+        thread.join(timeout=10)
+        sock.close()
+
+
+def app_from_env() -> Starlette:
+    """
+    App factory for running the stub with several uvicorn workers.
+    """
+    return StubOllama(
+        generate_latency=float(os.getenv("STUB_GENERATE_LATENCY", "0.5")),
+        embed_latency=float(os.getenv("STUB_EMBED_LATENCY", "0.05")),
+    ).app
+
+
+def main(argv: Optional[Sequence[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Run a stub Ollama server.")
+    parser.add_argument("--port", type=int, default=11434)
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--generate-latency", type=float, default=0.5)
+    parser.add_argument("--embed-latency", type=float, default=0.05)
+    args = parser.parse_args(argv)
+    os.environ["STUB_GENERATE_LATENCY"] = str(args.generate_latency)
+    os.environ["STUB_EMBED_LATENCY"] = str(args.embed_latency)
+    uvicorn.run(
+        "scripts.stub_ollama:app_from_env",
+        factory=True,
+        port=args.port,
+        workers=args.workers,
+        log_level="warning",
+    )
+
+
+if __name__ == "__main__":
+    main()
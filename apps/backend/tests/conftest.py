@@ -0,0 +1,58 @@
+import os
+import tempfile
+
+# Settings are read at import time: keep the tests off the development
+# database and caches.
+_TEST_DIR = tempfile.mkdtemp(prefix="resume-matcher-tests-")
+os.environ["SYNC_DATABASE_URL"] = f"sqlite:///{_TEST_DIR}/app.db"
+os.environ["ASYNC_DATABASE_URL"] = f"sqlite+aiosqlite:///{_TEST_DIR}/app.db"
+os.environ["CACHE_DIR"] = os.path.join(_TEST_DIR, "cache")
+os.environ.setdefault("SESSION_SECRET_KEY", "test")
+
+import pytest  # noqa: E402
+
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine  # noqa: E402
+
+from app.models import Base, Resume, Job  # noqa: E402
+
+RESUME_ID = "11111111-1111-1111-1111-111111111111"
+JOB_ID = "22222222-2222-2222-2222-222222222222"
+
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
+
+
+@pytest.fixture
+async def sessions(tmp_path):
+    """
+    Session factory of a fresh database holding one resume and one job.
+    """
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path}/test.db")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    sessions = async_sessionmaker(bind=engine, expire_on_commit=False)
+    async with sessions() as db:
+        db.add(Resume(resume_id=RESUME_ID, content="Python developer", content_type="md"))
+        db.add(Job(job_id=JOB_ID, resume_id=RESUME_ID, content="Python backend role"))
+        await db.commit()
+    yield sessions
+    await engine.dispose()
+
+
+@pytest.fixture
+async def ollama(monkeypatch):
+    """
+    A stub Ollama server as the default host of the app's provider pool.
+    """
+    from app.agent.pool import provider_pool
+    from scripts.stub_ollama import StubOllama, serve
+
+    stub = StubOllama()
+    monkeypatch.delenv("OPENAI_API_KEY", raising=False)
+    with serve(stub) as host:
+        monkeypatch.setenv("OLLAMA_HOST", host)
+        await provider_pool.aclose()
+        yield stub
+        await provider_pool.aclose()
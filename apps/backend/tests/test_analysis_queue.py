@@ -0,0 +1,35 @@
+import asyncio
+
+import pytest
+
+from app.services.analysis_queue import AnalysisQueue
+
+from .conftest import RESUME_ID, JOB_ID
+
+pytestmark = pytest.mark.anyio
+
+
+async def test_a_task_submitted_while_claiming_is_not_left_waiting(sessions):
+    queue = AnalysisQueue(sessions, workers=1, poll_interval=30)
+    executed = asyncio.Event()
+    submitted = []
+    claim = queue._claim
+
+    async def claim_then_submit():
+        task = await claim()
+        if task is None and not submitted:
+            # The submit lands after the worker found the queue empty.
+            submitted.append(await queue.submit(RESUME_ID, JOB_ID))
+        return task
+
+    async def execute(task):
+        executed.set()
+
+    queue._claim = claim_then_submit
+    queue._execute = execute
+    await queue.start()
+    try:
+        await asyncio.wait_for(executed.wait(), 2)
+    finally:
+        await queue.stop()
+    assert submitted
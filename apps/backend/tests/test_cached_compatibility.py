@@ -0,0 +1,20 @@
+import pytest
+
+from app.services.compatibility_validator import ProfessionalCompatibilityValidator
+
+pytestmark = pytest.mark.anyio
+
+RESUME = (
+    "Senior software engineer: backend microservices in Python and Java, "
+    "REST API design, git, code reviews, programming."
+)
+JOB = "Backend software engineer: Python, microservices, REST API, git, programming."
+
+
+async def test_local_verdicts_are_found_by_the_cache_lookup(ollama):
+    verdict = await ProfessionalCompatibilityValidator().analyze_compatibility_with_ai(RESUME, JOB)
+    assert ollama.calls["generate"] == 0
+
+    cached = await ProfessionalCompatibilityValidator().cached_compatibility(RESUME, JOB)
+    assert cached is not None
+    assert tuple(cached) == tuple(verdict)
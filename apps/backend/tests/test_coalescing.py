@@ -0,0 +1,87 @@
+import time
+import asyncio
+
+import pytest
+
+from app.agent import AgentManager, Priority
+from app.agent.exceptions import DeadlineExceededError
+from app.agent.manager import generation_flight
+from app.agent.scheduler import provider_scheduler
+
+pytestmark = pytest.mark.anyio
+
+PROMPT = "Rate this pair."
+
+
+async def until_generating(stub) -> None:
+    while not stub.calls["generate"]:
+        await asyncio.sleep(0.01)
+
+
+@pytest.fixture
+def stub(ollama):
+    ollama.generate_latency = 0.3
+    return ollama
+
+
+async def test_identical_calls_share_one_provider_call(stub):
+    results = await asyncio.gather(*(AgentManager().run(PROMPT) for _ in range(5)))
+    assert stub.calls["generate"] == 1
+    assert all(result == results[0] for result in results)
+
+
+async def test_a_cancelled_waiter_leaves_the_call_running_for_the_others(stub):
+    first = asyncio.create_task(AgentManager().run(PROMPT))
+    second = asyncio.create_task(AgentManager().run(PROMPT))
+    await until_generating(stub)
+    first.cancel()
+
+    assert (await second)["compatibility_level"] == "high"
+    assert first.cancelled()
+    assert stub.calls["generate"] == 1
+
+
+async def test_cancelling_the_last_waiter_cancels_the_call(stub):
+    abandoned = generation_flight.abandoned
+    cancelled = provider_scheduler.cancellation_stats()["cancelled"]
+    waiter = asyncio.create_task(AgentManager().run(PROMPT))
+    await until_generating(stub)
+    waiter.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await waiter
+
+    assert generation_flight.abandoned == abandoned + 1
+    assert generation_flight.stats()["in_flight"] == 0
+    # The provider call is cancelled mid-flight, well before it would finish.
+    deadline = time.monotonic() + 0.2
+    while provider_scheduler.cancellation_stats()["cancelled"] == cancelled:
+        assert time.monotonic() < deadline
+        await asyncio.sleep(0.01)
+
+
+async def test_streamed_calls_are_not_coalesced(stub):
+    async def ignore(delta: str) -> None:
+        pass
+
+    await asyncio.gather(*(AgentManager().stream(PROMPT, ignore) for _ in range(3)))
+    assert stub.calls["generate"] == 3
+
+
+async def test_a_joiner_is_not_bound_by_the_first_callers_deadline(stub):
+    start = time.monotonic()
+    short = asyncio.create_task(AgentManager(deadline=start + 0.1).run(PROMPT))
+    await asyncio.sleep(0.01)
+    joiner = asyncio.create_task(AgentManager(deadline=start + 5).run(PROMPT))
+
+    with pytest.raises(DeadlineExceededError):
+        await short
+    assert (await joiner)["compatibility_level"] == "high"
+    assert stub.calls["generate"] == 1
+
+
+async def test_calls_of_different_priorities_are_not_coalesced(stub):
+    await asyncio.gather(
+        AgentManager(priority=Priority.BULK).run(PROMPT),
+        AgentManager(priority=Priority.INTERACTIVE).run(PROMPT),
+    )
+    assert stub.calls["generate"] == 2
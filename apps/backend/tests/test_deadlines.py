@@ -0,0 +1,121 @@
+import json
+import time
+
+from typing import Dict
+from uuid import uuid4
+
+import httpx
+import numpy as np
+import pytest
+
+from app.core.database import AsyncSessionLocal
+from app.models import Job, ProcessedJob, ProcessedResume, Resume
+from app.services import ScoreImprovementService
+from app.services.document_index import document_index
+from app.services.domain_classifier import DomainClassifier
+
+pytestmark = pytest.mark.anyio
+
+RESUME = (
+    "Senior software engineer: backend microservices in Python and Java, "
+    "REST API design, git, code reviews, programming."
+)
+JOB = "Backend software engineer: Python, microservices, REST API, git, programming."
+
+
+async def test_pre_classifier_embeddings_stop_at_the_deadline(ollama):
+    ollama.embed_latency = 2.0
+    classifier = DomainClassifier()
+
+    start = time.monotonic()
+    verdict = await classifier.pre_classify(RESUME, JOB, deadline=start + 0.3)
+
+    # The embeddings ran out of time; the keywords alone decide the pair.
+    assert time.monotonic() - start < 1.0
+    assert verdict is not None and verdict[0] == "excellent"
+
+
+async def test_scoring_an_improvement_attempt_stops_at_the_deadline(ollama, sessions):
+    ollama.embed_latency = 2.0
+    async with sessions() as db:
+        start = time.monotonic()
+        service = ScoreImprovementService(db, candidates=1, deadline=start + 1.0)
+        service.compatibility_validator.cache = None
+        service.compatibility_validator.classifier = None
+
+        resume, score, partial = await service.improve_score_with_llm(
+            resume=RESUME,
+            extracted_resume_keywords="python",
+            job=JOB,
+            extracted_job_keywords="python",
+            previous_cosine_similarity_score=0.1,
+            extracted_job_keywords_embedding=np.ones(8),
+        )
+
+    assert time.monotonic() - start < 1.0
+    assert (resume, score, partial) == (RESUME, 0.1, True)
+
+
+@pytest.fixture
+async def client(ollama):
+    from app.base import create_app
+
+    app = create_app()
+    async with app.router.lifespan_context(app):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            yield client
+
+
+async def seed_pair(keywords=("python", "git")) -> Dict[str, str]:
+    pair = {"resume_id": str(uuid4()), "job_id": str(uuid4())}
+    async with AsyncSessionLocal() as db:
+        db.add(Resume(resume_id=pair["resume_id"], content=RESUME, content_type="md"))
+        db.add(ProcessedResume(resume_id=pair["resume_id"], personal_data={"firstName": "Jane"}))
+        db.add(Job(job_id=pair["job_id"], resume_id=pair["resume_id"], content=JOB))
+        db.add(
+            ProcessedJob(
+                job_id=pair["job_id"],
+                job_title="Backend engineer",
+                job_summary=JOB,
+                extracted_keywords=json.dumps({"extracted_keywords": list(keywords)}),
+            )
+        )
+        await db.commit()
+    return pair
+
+
+# A job without keywords is indexed, and must be looked up, by its content.
+@pytest.mark.parametrize("keywords", [("python", "git"), ()])
+async def test_a_tiny_budget_returns_the_original_resume_as_partial(ollama, client, keywords):
+    pair = await seed_pair(keywords)
+    async with AsyncSessionLocal() as db:
+        await document_index.index(db, "resume", [pair["resume_id"]])
+        await document_index.index(db, "job", [pair["job_id"]])
+
+    ollama.embed_latency = 2.0
+    ollama.generate_latency = 2.0
+    start = time.monotonic()
+    response = await client.post(
+        "/api/v1/resumes/improve", json=pair, headers={"X-Request-Timeout": "0.001"}
+    )
+
+    assert time.monotonic() - start < 1.0
+    assert response.status_code == 200
+    data = response.json()["data"]
+    assert data["partial"] is True
+    assert data["new_score"] == data["original_score"]
+    assert "Senior software engineer" in data["updated_resume"]
+
+
+async def test_a_budget_too_small_to_score_the_resume_is_a_gateway_timeout(ollama, client):
+    pair = await seed_pair()
+    ollama.embed_latency = 2.0
+    start = time.monotonic()
+    response = await client.post(
+        "/api/v1/resumes/improve", json=pair, headers={"X-Request-Timeout": "0.001"}
+    )
+
+    assert time.monotonic() - start < 1.0
+    assert response.status_code == 504
+    assert "X-Request-Timeout" in response.json()["detail"]
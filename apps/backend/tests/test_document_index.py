@@ -0,0 +1,86 @@
+import asyncio
+
+import numpy as np
+import pytest
+
+from sqlalchemy import select
+
+from app.models import DocumentEmbedding, Resume
+from app.services.document_index import DocumentIndex
+
+from .conftest import RESUME_ID
+
+pytestmark = pytest.mark.anyio
+
+
+class FakeEmbeddingManager:
+    """
+    Deterministic embeddings that take a moment, so concurrent calls overlap.
+    """
+
+    def __init__(self, model: str = "fake-embed", version: str = "v1") -> None:
+        self.model = model
+        self.version = version
+        self.calls = 0
+
+    async def resolve_model(self, **kwargs) -> str:
+        return self.model
+
+    async def resolve_version(self, **kwargs) -> str:
+        return self.version
+
+    async def embed_many(self, texts, **kwargs):
+        self.calls += 1
+        await asyncio.sleep(0.05)
+        return [
+            np.random.default_rng(abs(hash(text)) % 2**32).normal(size=8).tolist()
+            for text in texts
+        ]
+
+
+@pytest.fixture
+def index(sessions):
+    index = DocumentIndex(sessions)
+    index._embedding_manager = FakeEmbeddingManager()
+    return index
+
+
+async def stored_rows(sessions):
+    async with sessions() as db:
+        result = await db.execute(select(DocumentEmbedding))
+        return result.scalars().all()
+
+
+async def test_concurrent_indexing_stores_one_row(sessions, index):
+    async def store() -> int:
+        async with sessions() as db:
+            return await index.index(db, "resume", [RESUME_ID])
+
+    # An upload task, an on-demand query and a rebuild embedding the same document.
+    assert all(await asyncio.gather(store(), store(), store()))
+
+    rows = await stored_rows(sessions)
+    assert [(row.doc_type, row.doc_id, row.model_version) for row in rows] == [
+        ("resume", RESUME_ID, "v1")
+    ]
+    async with sessions() as db:
+        hits = await index.top_k(db, "resume", RESUME_ID, "resume", k=1)
+    assert [hit["resume_id"] for hit in hits] == [RESUME_ID]
+
+
+async def test_changed_text_updates_the_stored_row(sessions, index):
+    async with sessions() as db:
+        await index.index(db, "resume", [RESUME_ID])
+        before = (await stored_rows(sessions))[0]
+
+        resume = await db.scalar(select(Resume).where(Resume.resume_id == RESUME_ID))
+        resume.content = "Go developer"
+        await db.commit()
+        index._embedding_manager.version = "v2"
+        assert await index.index(db, "resume", [RESUME_ID]) == 1
+
+    rows = await stored_rows(sessions)
+    assert len(rows) == 1
+    assert rows[0].id == before.id
+    assert rows[0].content_hash != before.content_hash
+    assert rows[0].model_version == "v2"
@@ -0,0 +1,24 @@
+import pytest
+
+from app.agent.cache import EmbeddingCache
+from app.agent.manager import EmbeddingManager
+from app.agent.pool import provider_pool
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.mark.parametrize("batch", [False, True])
+async def test_a_re_pulled_model_misses_the_cache(ollama, tmp_path, batch):
+    manager = EmbeddingManager(cache=EmbeddingCache(str(tmp_path / "embeddings.sqlite3")))
+    embed = manager.embed_many if batch else manager.embed
+    text = ["Python developer"] if batch else "Python developer"
+
+    await embed(text)
+    await embed(text)
+    assert ollama.calls["embed"] == 1
+
+    # Same model name, new weights.
+    ollama.digest = "re-pulled"
+    await provider_pool.get_installed_models(force_refresh=True)
+    await embed(text)
+    assert ollama.calls["embed"] == 2
@@ -0,0 +1,47 @@
+import pytest
+
+from app.services.keyword_matcher import KeywordMatcher, keyword_variants
+
+
+@pytest.mark.parametrize(
+    "keyword, variants",
+    [
+        ("Unit tests", ["unit test", "unit tests", "unittests"]),
+        ("Microservice", ["microservice", "microservices"]),
+        ("CI/CD", ["ci cd", "cicd"]),
+        ("node.js", ["node js", "nodejs"]),
+        ("c++", ["c++"]),
+        ("API", ["api"]),
+        ("", []),
+    ],
+)
+def test_keyword_variants(keyword, variants):
+    assert keyword_variants(keyword) == variants
+
+
+@pytest.mark.parametrize("keyword", ["news", "sass", "press", "status", "analysis"])
+def test_a_trailing_s_that_is_not_a_plural_is_kept(keyword):
+    assert keyword_variants(keyword) == [keyword]
+
+
+def test_coverage_matches_variants_on_word_boundaries():
+    matcher = KeywordMatcher(["Node.js", "unit tests", "Go", "Kubernetes", "SASS"])
+    coverage = matcher.coverage("Wrote NodeJS services and a unit test suite in Google's infra.")
+
+    assert [m["keyword"] for m in coverage["matched"]] == ["Node.js", "unit tests"]
+    assert coverage["missing"] == ["Go", "Kubernetes", "SASS"]
+    assert coverage["coverage"] == 0.4
+
+
+def test_invented_terms_do_not_count_as_present():
+    matcher = KeywordMatcher(["news", "press", "node.js"])
+    coverage = matcher.coverage("A new pres release about node j.")
+    assert coverage["matched"] == []
+
+
+def test_count_matches_the_listed_positions(monkeypatch):
+    matcher = KeywordMatcher(["CI/CD"])
+    # Two variants reporting the same span are one occurrence.
+    monkeypatch.setattr(matcher, "scan", lambda text: {0: [(6, 11), (6, 11), (16, 21)]})
+    (match,) = matcher.coverage("Built CI/CD and ci-cd pipelines")["matched"]
+    assert match["count"] == len(match["positions"]) == 2
@@ -0,0 +1,55 @@
+import asyncio
+
+import pytest
+
+from sqlalchemy import func, select
+
+from app.models import MatchResult
+from app.services import ScoreImprovementService
+
+from .conftest import RESUME_ID, JOB_ID
+
+pytestmark = pytest.mark.anyio
+
+
+def run_values(score: float) -> dict:
+    return {
+        "validated_original_score": 0.5,
+        "updated_score": score,
+        "updated_resume": f"# Resume {score}",
+        "resume_preview": {"personalInfo": {"name": "Test"}},
+        "detailed_analysis": {"details": "analysis"},
+        "section_match": {"coverage": 0.5},
+        "updated_section_match": {"coverage": score},
+    }
+
+
+async def test_overlapping_runs_store_one_result(sessions):
+    async def save(score: float) -> None:
+        async with sessions() as db:
+            await ScoreImprovementService(db)._save_match_result(RESUME_ID, JOB_ID, run_values(score))
+
+    await asyncio.gather(save(0.7), save(0.8), save(0.9))
+
+    async with sessions() as db:
+        count = await db.scalar(select(func.count()).select_from(MatchResult))
+        stored = await ScoreImprovementService(db).get_match_result(RESUME_ID, JOB_ID)
+    assert count == 1
+    assert stored["new_score"] in {0.7, 0.8, 0.9}
+    assert stored["updated_resume"] == f"<h1>Resume {stored['new_score']}</h1>"
+
+
+async def test_a_new_run_replaces_the_stored_result(sessions):
+    async with sessions() as db:
+        service = ScoreImprovementService(db)
+        await service._save_match_result(RESUME_ID, JOB_ID, run_values(0.7))
+        await service._save_match_result(RESUME_ID, JOB_ID, run_values(0.9))
+
+    async with sessions() as db:
+        stored = await ScoreImprovementService(db).get_match_result(RESUME_ID, JOB_ID)
+        other_language = await ScoreImprovementService(db, language="pt").get_match_result(
+            RESUME_ID, JOB_ID
+        )
+    assert stored["new_score"] == 0.9
+    assert stored["section_match"] == {"original": {"coverage": 0.5}, "updated": {"coverage": 0.9}}
+    assert other_language is None
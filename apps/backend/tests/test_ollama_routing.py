@@ -0,0 +1,237 @@
+import time
+import asyncio
+import contextlib
+
+import pytest
+
+from app.agent.exceptions import ProviderError
+from app.agent.providers.ollama import OllamaProvider, OllamaEmbeddingProvider
+from app.agent.routing import (
+    OllamaHostRouter,
+    RoutedOllamaProvider,
+    RoutedOllamaEmbeddingProvider,
+)
+from scripts.stub_ollama import StubOllama, serve, GENERATION_MODEL, EMBEDDING_MODEL
+
+pytestmark = pytest.mark.anyio
+
+COOLDOWN = 0.3
+
+
+@pytest.fixture
+def stubs():
+    """
+    Three stub hosts: a and b serve both models, c only the generation model.
+    """
+    hosts = {
+        "a": StubOllama(generate_latency=0.2),
+        "b": StubOllama(generate_latency=0.2),
+        "c": StubOllama(models=[GENERATION_MODEL], generate_latency=0.2),
+    }
+    with contextlib.ExitStack() as stack:
+        urls = {name: stack.enter_context(serve(stub)) for name, stub in hosts.items()}
+        yield hosts, urls
+
+
+@pytest.fixture
+def cooldown():
+    return COOLDOWN
+
+
+@pytest.fixture
+async def router(stubs, cooldown):
+    _, urls = stubs
+    router = OllamaHostRouter(
+        list(urls.values()), probe_interval=3600, failure_threshold=2, cooldown=cooldown
+    )
+    await router.probe_all()
+    yield router
+    await router.aclose()
+
+
+@pytest.fixture
+async def providers(router):
+    generators = {}
+    embedders = {}
+
+    def generator(host):
+        return generators.setdefault(host, OllamaProvider(GENERATION_MODEL, host=host))
+
+    def embedder(host):
+        return embedders.setdefault(host, OllamaEmbeddingProvider(EMBEDDING_MODEL, host=host))
+
+    yield (
+        RoutedOllamaProvider(router, generator, GENERATION_MODEL),
+        RoutedOllamaEmbeddingProvider(router, embedder, EMBEDDING_MODEL),
+    )
+    for provider in [*generators.values(), *embedders.values()]:
+        await provider.aclose()
+
+
+async def test_probe_records_installed_models(stubs, router):
+    _, urls = stubs
+    stats = router.stats()
+    assert stats[urls["a"]]["models"] == sorted([GENERATION_MODEL, EMBEDDING_MODEL])
+    assert stats[urls["c"]]["models"] == [GENERATION_MODEL]
+    assert all(host["circuit"] == "closed" for host in stats.values())
+
+
+async def test_least_outstanding_host_is_chosen(stubs, router):
+    _, urls = stubs
+    async with router.track(urls["a"]), router.track(urls["b"]):
+        assert router.choose(GENERATION_MODEL) == urls["c"]
+    async with router.track(urls["a"]):
+        assert router.choose(GENERATION_MODEL) in {urls["b"], urls["c"]}
+
+
+async def test_ties_are_broken_round_robin(stubs, router):
+    _, urls = stubs
+    chosen = [router.choose(GENERATION_MODEL) for _ in range(6)]
+    assert sorted(chosen) == sorted(list(urls.values()) * 2)
+
+
+async def test_concurrent_calls_spread_over_hosts(stubs, providers):
+    hosts, _ = stubs
+    generate, _ = providers
+    await asyncio.gather(*(generate("prompt") for _ in range(9)))
+    assert [stub.calls["generate"] for stub in hosts.values()] == [3, 3, 3]
+
+
+async def test_embeddings_only_reach_hosts_with_the_model(stubs, providers):
+    hosts, _ = stubs
+    _, embedding = providers
+    await asyncio.gather(*(embedding.embed_many(["text"]) for _ in range(6)))
+    assert hosts["c"].calls["embed"] == 0
+    assert hosts["a"].calls["embed"] + hosts["b"].calls["embed"] == 6
+
+
+async def test_unknown_model_raises(router):
+    with pytest.raises(ProviderError):
+        await router.ensure_model("missing:latest")
+
+
+async def test_failed_call_fails_over(stubs, router, providers):
+    hosts, urls = stubs
+    generate, _ = providers
+    hosts["b"].fail_generate = True
+    results = await asyncio.gather(*(generate("prompt") for _ in range(6)))
+    assert all(results)
+    assert hosts["b"].calls["generate"] >= 1
+    assert router.stats()[urls["b"]]["failures"] == hosts["b"].calls["generate"]
+
+
+async def test_failover_gives_up_after_a_second_failure(stubs, providers):
+    hosts, _ = stubs
+    generate, _ = providers
+    for stub in hosts.values():
+        stub.fail_generate = True
+    with pytest.raises(ProviderError):
+        await generate("prompt")
+    assert sum(stub.calls["generate"] for stub in hosts.values()) == 2
+
+
+@pytest.mark.parametrize("cooldown", [3600])
+async def test_circuit_opens_after_consecutive_failures(stubs, router, providers):
+    hosts, urls = stubs
+    generate, _ = providers
+    hosts["b"].fail_generate = True
+    while router.stats()[urls["b"]]["circuit"] == "closed":
+        await generate("prompt")
+    assert router.stats()[urls["b"]]["failures"] == 2
+
+    calls = hosts["b"].calls["generate"]
+    await asyncio.gather(*(generate("prompt") for _ in range(6)))
+    assert hosts["b"].calls["generate"] == calls
+    with pytest.raises(ProviderError):
+        router.choose(GENERATION_MODEL, exclude={urls["a"], urls["c"]})
+
+
+async def test_half_open_circuit_admits_one_trial_and_closes_on_success(stubs, router, providers):
+    hosts, urls = stubs
+    generate, _ = providers
+    hosts["b"].fail_generate = True
+    while router.stats()[urls["b"]]["circuit"] == "closed":
+        await generate("prompt")
+
+    hosts["b"].fail_generate = False
+    await asyncio.sleep(COOLDOWN)
+    assert router.stats()[urls["b"]]["circuit"] == "half-open"
+    others = {urls["a"], urls["c"]}
+    async with router.track(urls["b"]):
+        # The trial request is in flight, so no second one is admitted.
+        with pytest.raises(ProviderError):
+            router.choose(GENERATION_MODEL, exclude=others)
+    assert router.stats()[urls["b"]]["circuit"] == "closed"
+
+
+# Long enough that the circuit cannot go half-open again while the failed
+# trial request fails over to another host.
+@pytest.mark.parametrize("cooldown", [1.0])
+async def test_half_open_trial_failure_reopens_the_circuit(stubs, router, providers, cooldown):
+    hosts, urls = stubs
+    generate, _ = providers
+    hosts["b"].fail_generate = True
+    while router.stats()[urls["b"]]["circuit"] == "closed":
+        await generate("prompt")
+
+    await asyncio.sleep(cooldown)
+    calls = hosts["b"].calls["generate"]
+    while hosts["b"].calls["generate"] == calls:
+        await generate("prompt")
+    assert router.stats()[urls["b"]]["circuit"] == "open"
+
+
+async def test_failed_probes_eject_a_host_and_a_probe_recovers_it(stubs, router):
+    hosts, urls = stubs
+    hosts["b"].down = True
+    for _ in range(2):
+        assert not await router.probe(urls["b"])
+    assert router.stats()[urls["b"]]["circuit"] == "open"
+    assert urls["b"] not in {router.choose(GENERATION_MODEL) for _ in range(6)}
+
+    hosts["b"].down = False
+    hosts["b"].models = [GENERATION_MODEL]
+    assert await router.probe(urls["b"])
+    stats = router.stats()[urls["b"]]
+    assert stats["circuit"] == "closed"
+    assert stats["models"] == [GENERATION_MODEL]
+    assert urls["b"] in {router.choose(GENERATION_MODEL) for _ in range(6)}
+
+
+async def test_background_probe_loop_recovers_a_host(stubs):
+    hosts, urls = stubs
+    router = OllamaHostRouter(
+        list(urls.values()), probe_interval=0.05, failure_threshold=1, cooldown=3600
+    )
+    hosts["a"].down = True
+    await router.probe_all()
+    assert router.stats()[urls["a"]]["circuit"] == "open"
+
+    hosts["a"].down = False
+    router.start()
+    try:
+        deadline = time.monotonic() + 5
+        while router.stats()[urls["a"]]["circuit"] != "closed":
+            assert time.monotonic() < deadline
+            await asyncio.sleep(0.05)
+    finally:
+        await router.aclose()
+
+
+async def test_streams_hold_their_host_and_do_not_fail_over(stubs, router, providers):
+    hosts, urls = stubs
+    generate, _ = providers
+    deltas = []
+    async for delta in generate.stream("prompt"):
+        if not deltas:
+            assert sum(state["outstanding"] for state in router.stats().values()) == 1
+        deltas.append(delta)
+    assert "".join(deltas) == hosts["a"].response
+    assert all(state["outstanding"] == 0 for state in router.stats().values())
+
+    for stub in hosts.values():
+        stub.fail_generate = True
+    with pytest.raises(ProviderError):
+        async for _ in generate.stream("prompt"):
+            pass
+    assert sum(stub.calls["generate"] for stub in hosts.values()) == 2
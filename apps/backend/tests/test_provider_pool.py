@@ -0,0 +1,56 @@
+import asyncio
+import contextlib
+
+import pytest
+
+from app.agent.pool import ProviderPool
+from app.agent.routing import OllamaHostRouter
+from scripts.stub_ollama import StubOllama, serve, GENERATION_MODEL, EMBEDDING_MODEL
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture
+def stubs():
+    """
+    Two stub hosts serving both models under different digests.
+    """
+    hosts = {name: StubOllama(digest=name) for name in ("a", "b")}
+    with contextlib.ExitStack() as stack:
+        urls = {name: stack.enter_context(serve(stub)) for name, stub in hosts.items()}
+        yield hosts, urls
+
+
+@pytest.fixture
+async def pool(stubs):
+    _, urls = stubs
+    pool = ProviderPool(
+        router=OllamaHostRouter(
+            list(urls.values()), probe_interval=3600, failure_threshold=1, cooldown=3600
+        )
+    )
+    yield pool
+    await pool.aclose()
+
+
+async def test_routed_model_version_skips_an_unhealthy_first_host(stubs, pool):
+    hosts, _ = stubs
+    hosts["a"].down = True
+    assert await pool.get_model_version(EMBEDDING_MODEL) == f"b:{EMBEDDING_MODEL}"
+
+
+async def test_routed_model_version_of_an_unknown_model_is_none(pool):
+    assert await pool.get_model_version("missing:latest") is None
+
+
+async def test_concurrent_first_lookups_share_one_listing(stubs):
+    hosts, urls = stubs
+    pool = ProviderPool()
+    try:
+        versions = await asyncio.gather(
+            *(pool.get_model_version(GENERATION_MODEL, host=urls["a"]) for _ in range(10))
+        )
+    finally:
+        await pool.aclose()
+    assert versions == [f"a:{GENERATION_MODEL}"] * 10
+    assert hosts["a"].calls["tags"] == 1